@@ -7,10 +7,11 @@ import collections as cx
 import logging
 
 from ..anno.opts import AnnoOptions
+from ..anno.columns import AnnoColumns
 from ..base import logger
 from ..evidence_codes import EvidenceCodes
 from ..godag.consts import NAMESPACE2NS
-from ..gosubdag.go_tasks import get_go2parents_go2obj
+from ..gosubdag.go_tasks import get_go2parents_godag
 
 __copyright__ = (
     "Copyright (C) 2016-present, DV Klopfenstein, H Tang. All rights reserved."
@@ -45,10 +46,24 @@ class AnnoReaderBase(object):
         self.evobj = EvidenceCodes()
         self.hdr = None
         self.datobj = None
+        # stream: Do not store annotations; read them from the file each time they are used
+        self.stream = kws.get("stream", False)
         # pylint: disable=no-member
-        self.associations = self._init_associations(filename, **kws)
+        self._associations = self._init_associations(filename, **kws)
+        # columnar: Also store annotations as NumPy columns, which are used to get id2gos
+        self.columns = self._init_columns(kws.get("columnar", False))
         assert self.namespaces is None or isinstance(self.namespaces, set)
 
+    @property
+    def associations(self):
+        """List of annotation namedtuples. Not stored if streaming: use iter_associations()"""
+        if self.stream:
+            raise RuntimeError(
+                "{CLS}(stream=True) DOES NOT STORE ANNOTATIONS: USE iter_associations() "
+                "OR READ {F} WITH stream=False".format(
+                    CLS=type(self).__name__, F=self.filename))
+        return self._associations
+
     def get_desc(self):
         """Get description"""
         return "{NAME} {NSs} {GODAG}".format(
@@ -57,12 +72,35 @@ class AnnoReaderBase(object):
             GODAG="" if self.godag is None else "godag",
         )
 
+    def get_date(self):
+        """Get the date in the annotation file header (GAF, GPAD), or None"""
+        if not self.hdr:
+            return None
+        for line in self.hdr.split("\n"):
+            key, _, val = line.partition(":")
+            if key.strip().lower() in {"date-generated", "date"}:
+                return val.strip()
+        return None
+
     # pylint: disable=unused-argument
     def get_associations(self, taxid=None):
         """Get associations"""
         # taxid is for NCBI's gene2gos
         return self.associations
 
+    def iter_associations(self):
+        """Yield annotations. If streaming, read them from the annotation file as they are used"""
+        if self.stream:
+            # pylint: disable=no-member
+            return self._iter_associations()
+        return iter(self.associations)
+
+    def get_columns(self):
+        """Get the annotations as NumPy columns (AnnoColumns), which may be saved to a file"""
+        if self.columns is None:
+            self.columns = AnnoColumns(self.iter_associations(), self.evobj)
+        return self.columns
+
     def prt_summary_anno2ev(self, prt=sys.stdout):
         """Print annotation/evidence code summary."""
         self.evobj.prt_summary_anno2ev(self.associations, prt)
@@ -79,6 +117,10 @@ class AnnoReaderBase(object):
     # Arg, taxid, is used by NCBI's annotations, but not by gpad, gaf, etc.
     def get_ns2assc(self, taxid=None, **kws):
         """Return given associations into 3 (BP, MF, CC) dicts, id2gos"""
+        if self.columns is not None:
+            return self.columns.get_ns2assc(self.godag, **kws)
+        if self.stream:
+            return self._get_ns2assc_stream(**kws)
         return {
             ns: self._get_id2gos(nts, **kws)
             for ns, nts in self.get_ns2ntsanno().items()
@@ -112,14 +154,20 @@ class AnnoReaderBase(object):
 
     def get_id2gos_nss(self, **kws):
         """Return all associations in a dict, id2gos, regardless of namespace"""
-        return self._get_id2gos(self.associations, **kws)
+        if self.columns is not None:
+            return self.columns.get_id2gos(None, self.godag, **kws)
+        return self._get_id2gos(self.iter_associations(), **kws)
 
     def get_id2gos(self, namespace=None, prt=sys.stdout, **kws):
         """Return associations from specified namespace in a dict, id2gos"""
         # pylint: disable=superfluous-parens
         if self.has_ns():  # Anno namedtuple has NS field
-            nspc, assoc = self._get_1ns_assn(namespace)
-            id2gos = self._get_id2gos(assoc, **kws)
+            if self.columns is not None:
+                nspc, nspc_sel = self._get_1ns(namespace)
+                id2gos = self.columns.get_id2gos(nspc_sel, self.godag, **kws)
+            else:
+                nspc, assoc = self._get_1ns_assn(namespace)
+                id2gos = self._get_id2gos(assoc, **kws)
             if prt:
                 prt.write(f"{len(id2gos)} IDs in loaded association branch, {nspc}\n")
             return id2gos
@@ -129,34 +177,44 @@ class AnnoReaderBase(object):
                 type(self).__name__,
                 namespace,
             )
-        id2gos = self._get_id2gos(self.associations, **kws)
+        if self.columns is not None:
+            id2gos = self.columns.get_id2gos(None, self.godag, **kws)
+        else:
+            id2gos = self._get_id2gos(self.iter_associations(), **kws)
         if prt:
             prt.write(f"{len(id2gos)} IDs in all associations\n")
         return id2gos
 
     def _get_1ns_assn(self, namespace_usr):
         """Get one namespace, given a user-provided namespace or a default"""
+        nspc, nspc_sel = self._get_1ns(namespace_usr)
+        if nspc_sel is not None:
+            return nspc, (nt for nt in self.iter_associations() if nt.NS == nspc_sel)
+        return nspc, self.iter_associations()
+
+    def _get_1ns(self, namespace_usr):
+        """Get one namespace and the namespace to select annotations, if any"""
         # If all namespaces were loaded
         if self.namespaces is None:
             # Return user-specified namespace, if provided. Otherwise BP
             nspc = namespace_usr or self._get_biggest_namespace()
             # Return one namespace
             if nspc in set(NAMESPACE2NS.values()):
-                return nspc, [nt for nt in self.associations if nt.NS == nspc]
+                return nspc, nspc
             # Return all namespaces
-            return nspc, self.associations
+            return nspc, None
         # If one namespace was loaded, use that regardless of what user specfies
         if len(self.namespaces) == 1:
             nspc = next(iter(self.namespaces))
             if namespace_usr is not None and nspc != namespace_usr:
                 logger.warning("IGNORING %s; ONLY %s WAS LOADED", namespace_usr, nspc)
-            return nspc, self.associations
+            return nspc, None
         if namespace_usr is None:
             logger.error(
                 "get_id2gos: GODAG NOT LOADED. USING: %s",
                 " ".join(sorted(self.namespaces)),
             )
-        return namespace_usr, self.associations
+        return namespace_usr, None
 
     def _get_biggest_namespace(self):
         """Get the namespace with the most ontology terms"""
@@ -183,8 +241,9 @@ class AnnoReaderBase(object):
         # Default reduction is to remove. For all options, see goatools/anno/opts.py:
         #   * Evidence_Code == ND -> No biological data No biological Data available
         #   * Qualifiers contain NOT
+        # Annotations are used once, as they are read, so they may be streamed
         ntannos_indag = self._get_anno_in_dag(ntannos_usr)
-        ntannos_m = self.reduce_annotations(ntannos_indag, options)
+        ntannos_m = self._iter_reduced(ntannos_indag, options)
         dbid2goids = self.get_dbid2goids(
             ntannos_m, propagate_counts, relationships, prt
         )
@@ -192,10 +251,31 @@ class AnnoReaderBase(object):
             return dbid2goids
         return self._get_goid2dbids(dbid2goids)
 
+    def _get_ns2assc_stream(self, propagate_counts=False, relationships=None, prt=sys.stdout, **kws):
+        """Return annotations as 3 (BP, MF, CC) dicts, id2gos, reading the annotations once"""
+        options = AnnoOptions(self.evobj, **kws)
+        ns2dbid2goids = cx.defaultdict(lambda: cx.defaultdict(set))
+        ntannos_indag = self._get_anno_in_dag(self.iter_associations())
+        for ntd in self._iter_reduced(ntannos_indag, options):
+            ns2dbid2goids[ntd.NS][ntd.DB_ID].add(ntd.GO_ID)
+        ns2assc = {}
+        for nspc, dbid2goids in ns2dbid2goids.items():
+            dbid2goids = dict(dbid2goids)
+            if propagate_counts:
+                self._add_ancestors(dbid2goids, relationships, prt)
+            ns2assc[nspc] = dbid2goids if options.b_geneid2gos else self._get_goid2dbids(dbid2goids)
+        return ns2assc
+
+    def _init_columns(self, columnar):
+        """Store annotations as NumPy columns, if requested"""
+        if not columnar or self.stream or not self.associations:
+            return None
+        return AnnoColumns(self.associations, self.evobj)
+
     def _get_anno_in_dag(self, ntsanno):
         """Return annotations that are in the GODAG"""
         s_godag = self.godag
-        return [nt for nt in ntsanno if nt.GO_ID in s_godag] if s_godag else ntsanno
+        return (nt for nt in ntsanno if nt.GO_ID in s_godag) if s_godag else ntsanno
 
     @staticmethod
     def _get_goid2dbids(dbid2goids):
@@ -239,10 +319,15 @@ class AnnoReaderBase(object):
 
     def reduce_annotations(self, annotations, options):
         """Reduce annotations to ones used to identify enrichment (normally exclude ND and NOT)."""
+        return list(self._iter_reduced(annotations, options))
+
+    @staticmethod
+    def _iter_reduced(annotations, options):
+        """Yield annotations used to identify enrichment (normally exclude ND and NOT)."""
         getfnc_qual_ev = options.getfnc_qual_ev()
-        return [
+        return (
             nt for nt in annotations if getfnc_qual_ev(nt.Qualifier, nt.Evidence_Code)
-        ]
+        )
 
     @staticmethod
     def update_association(assc_goidsets, go2ancestors, prt=sys.stdout):
@@ -263,9 +348,7 @@ class AnnoReaderBase(object):
         goids_avail = set(_godag)
         goids_missing = self._rpt_goids_notfound(goids_assoc_usr, goids_avail)
         goids_assoc_cur = goids_assoc_usr & goids_avail - goids_missing
-        # Get GO Term for each current GO ID in the annotations
-        _go2obj_assc = {go: _godag[go] for go in goids_assoc_cur}
-        go2ancestors = get_go2parents_go2obj(_go2obj_assc, relationships, prt)
+        go2ancestors = get_go2parents_godag(_godag, goids_assoc_cur, relationships, prt)
         if prt:
             prt.write("{len(goids_avail)} GO IDs -> {len(go2ancestors)} go2ancestors\n")
         return go2ancestors
@@ -300,18 +383,18 @@ class AnnoReaderBase(object):
 
     def _get_dbid2goids_p1(self, ntannos, relationships=None, prt=sys.stdout):
         """Return gene2goids with propagate_counts == True"""
-        id2gos = cx.defaultdict(set)
-        goids_annos = set(nt.GO_ID for nt in ntannos)
-        go2ancestors = self._get_go2ancestors(goids_annos, relationships, prt)
+        # Read the annotations once, so they may be streamed
+        id2gos = self._get_dbid2goids_p0(ntannos)
         # https://github.com/geneontology/go-annotation/issues/3523
         ## exclude = {'GO:2000325', 'GO:2000327'}
-        for ntd in ntannos:
-            goid = ntd.GO_ID
-            goids = id2gos[ntd.DB_ID]
-            goids.add(goid)
-            if goid in go2ancestors:
-                goids.update(go2ancestors[goid])
-        return dict(id2gos)
+        self._add_ancestors(id2gos, relationships, prt)
+        return id2gos
+
+    def _add_ancestors(self, id2gos, relationships=None, prt=sys.stdout):
+        """Add the ancestors of the annotated GO IDs to each set of GO IDs"""
+        goids_annos = set.union(set(), *id2gos.values())
+        go2ancestors = self._get_go2ancestors(goids_annos, relationships, prt)
+        self.update_association(id2gos.values(), go2ancestors)
 
     @staticmethod
     def get_goid2dbids(associations):
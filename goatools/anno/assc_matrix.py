@@ -0,0 +1,248 @@
+"""Gene-by-GO sparse incidence matrix for an association (gene2gos)."""
+
+__copyright__ = "Copyright (C) 2016-present, DV Klopfenstein, H Tang. All rights reserved."
+__author__ = "DV Klopfenstein"
+
+from collections.abc import Mapping
+
+import numpy as np
+from scipy import sparse
+
+from goatools.godag.closure import ClosureIndex
+from goatools.godag.closure import get_closure
+from goatools.godag.compact import CompactGODag
+
+
+def get_assc_matrix(assoc, godag, genes=None):
+    """Get the gene-by-GO matrix of an association.
+
+    An AsscView is read-only and holds its matrix, which is reused. Any other association
+    (e.g., a dict of sets, which may be changed by the caller) gets a new matrix of the genes.
+    """
+    if isinstance(assoc, AsscView):
+        return assoc.assc_mtx
+    return AsscMatrix(assoc, godag, genes)
+
+
+class AsscMatrix:
+    """Gene-by-GO sparse incidence matrix for an association (gene2gos).
+
+    Rows are genes and columns are main GO IDs. Alternate GO IDs are resolved to
+    their main GO ID and GO IDs not found in the GO DAG are ignored, as in ratio.get_terms.
+    """
+
+    def __init__(self, assoc, godag, genes=None):
+        # genes: Optional. Only include these genes (e.g., population genes)
+        self.genes, self.goids, self.csr = self._init_csr(assoc, godag, genes)
+        self.gene2idx = {g: i for i, g in enumerate(self.genes)}
+        self.go2idx = {go: i for i, go in enumerate(self.goids)}
+
+    @classmethod
+    def from_csr(cls, genes, goids, csr):
+        """Make an AsscMatrix from genes (rows), main GO IDs (columns) and a CSR matrix."""
+        obj = cls.__new__(cls)
+        obj.genes = genes
+        obj.goids = goids
+        obj.csr = csr
+        obj.gene2idx = {g: i for i, g in enumerate(genes)}
+        obj.go2idx = {go: i for i, go in enumerate(goids)}
+        return obj
+
+    def get_propagated(self, godag, relationships=None):
+        """Get an AsscMatrix where genes are also annotated to all ancestors of their GO IDs.
+
+        Propagates with one sparse product against the ancestor closure of the GO DAG.
+        """
+        objclo = get_closure(godag, relationships)
+        if objclo is None:
+            objclo = ClosureIndex(CompactGODag(godag), relationships)
+        objcmp = objclo.objcmp
+        idxs = objcmp.get_idxs(self.goids)
+        num = len(objcmp.goids)
+        # Each GO column, and the ancestors of each GO column, as compact GO DAG columns
+        upper = objclo.anc[idxs].astype(np.int32) + sparse.csr_matrix(
+            (np.ones(idxs.size, dtype=np.int32), (np.arange(idxs.size), idxs)),
+            shape=(idxs.size, num))
+        mtx = (self.csr.astype(np.int32) @ upper).tocsc()
+        cols = np.flatnonzero(np.diff(mtx.indptr))
+        mtx = mtx[:, cols].tocsr()
+        mtx.sort_indices()
+        csr = sparse.csr_matrix(
+            (np.ones(mtx.indices.size, dtype=np.int8), mtx.indices, mtx.indptr),
+            shape=mtx.shape)
+        return self.from_csr(self.genes, [objcmp.goids[i] for i in cols.tolist()], csr)
+
+    def get_subset(self, genes):
+        """Get an AsscMatrix of only these genes and the GO IDs annotated to them."""
+        rows = self.get_rows(genes)
+        csc = self.csr[rows].tocsc()
+        cols = np.flatnonzero(np.diff(csc.indptr))
+        csr = csc[:, cols].tocsr()
+        csr.sort_indices()
+        return self.from_csr(
+            [self.genes[i] for i in rows.tolist()], [self.goids[i] for i in cols.tolist()], csr)
+
+    def get_id2gos(self, genes=None):
+        """Get a dict of genes to the set of GO IDs annotated to them."""
+        rows = range(len(self.genes)) if genes is None else self.get_rows(genes).tolist()
+        indptr = self.csr.indptr
+        indices = self.csr.indices
+        goids = self.goids
+        genes_all = self.genes
+        return {genes_all[r]: set(goids[i] for i in indices[indptr[r]:indptr[r + 1]].tolist())
+                for r in rows}
+
+    def get_rows(self, genes):
+        """Get the row indices of the genes found in the association."""
+        gene2idx = self.gene2idx
+        return np.array(
+            [gene2idx[g] for g in dict.fromkeys(genes) if g in gene2idx], dtype=np.int64)
+
+    def get_counts(self, genes):
+        """Get the number of genes annotated to each GO ID column."""
+        rows = self.get_rows(genes)
+        return np.asarray(self.csr[rows].sum(axis=0)).ravel().astype(np.int64)
+
+    def get_counts_multi(self, genesets):
+        """Get GO counts for many gene sets with one sparse matrix product.
+
+        Returns a sparse (gene sets x GO IDs) matrix of counts.
+        """
+        return self.get_selector(genesets).dot(self.csr).tocsr()
+
+    def get_selector(self, genesets):
+        """Get a sparse (gene sets x genes) indicator matrix."""
+        rows_all = [self.get_rows(genes) for genes in genesets]
+        indptr = np.zeros(len(rows_all) + 1, dtype=np.int64)
+        np.cumsum([len(rows) for rows in rows_all], out=indptr[1:])
+        indices = np.concatenate(rows_all) if rows_all else np.zeros(0, dtype=np.int64)
+        data = np.ones(indices.size, dtype=np.int32)
+        return sparse.csr_matrix(
+            (data, indices, indptr), shape=(len(rows_all), len(self.genes)))
+
+    def get_goitems(self, genes=None, rows=None):
+        """Get a read-only GO ID to genes mapping (GoItems); gene sets are made when used."""
+        if rows is None:
+            rows = self.get_rows(genes)
+        return GoItems(self, rows)
+
+    def get_go2items(self, genes):
+        """Get a dict of GO IDs to the set of genes annotated to them."""
+        rows = self.get_rows(genes)
+        csc = self.csr[rows].tocsc()
+        genes_rows = [self.genes[i] for i in rows]
+        indptr = csc.indptr
+        indices = csc.indices
+        goids = self.goids
+        return {
+            goids[col]: set(genes_rows[i] for i in indices[indptr[col]:indptr[col + 1]])
+            for col in np.flatnonzero(np.diff(indptr))}
+
+    @staticmethod
+    def _init_csr(assoc, godag, genes):
+        """Build a boolean CSR matrix from gene2gos."""
+        genes_mtx = []
+        go2idx = {}
+        goids = []
+        indptr = [0]
+        indices = []
+        if genes is None:
+            itr = assoc.items()
+        else:
+            itr = ((g, assoc[g]) for g in dict.fromkeys(genes) if g in assoc)
+        for gene, goids_gene in itr:
+            cols = set()
+            for goid in goids_gene:
+                if goid in godag:
+                    goid_main = godag[goid].id
+                    if goid_main not in go2idx:
+                        go2idx[goid_main] = len(goids)
+                        goids.append(goid_main)
+                    cols.add(go2idx[goid_main])
+            genes_mtx.append(gene)
+            indices.extend(sorted(cols))
+            indptr.append(len(indices))
+        csr = sparse.csr_matrix(
+            (np.ones(len(indices), dtype=np.int8), indices, indptr),
+            shape=(len(genes_mtx), len(goids)))
+        return genes_mtx, goids, csr
+
+
+class GoItems(Mapping):
+    """Read-only mapping of GO IDs to the set of genes annotated to them, for some genes.
+
+    Holds the rows of the genes in an AsscMatrix. The number of genes of each GO ID
+    is a column sum. A set of genes is made the first time a GO ID is looked up.
+    """
+
+    def __init__(self, assc_mtx, rows):
+        # rows: Rows of assc_mtx; A row repeated is counted again, as in ratio.count_terms
+        self.assc_mtx = assc_mtx
+        self.rows = np.asarray(rows, dtype=np.int64)
+        self.csc = assc_mtx.csr[self.rows].tocsc()
+        # Number of genes annotated to each GO ID column of assc_mtx
+        self.counts = np.diff(self.csc.indptr)
+        goids = assc_mtx.goids
+        self.go2col = {goids[c]: c for c in np.flatnonzero(self.counts).tolist()}
+        self._go2items = {}
+
+    def __getitem__(self, goid):
+        items = self._go2items.get(goid)
+        if items is None:
+            col = self.go2col[goid]
+            genes = self.assc_mtx.genes
+            rows = self.rows[self.csc.indices[self.csc.indptr[col]:self.csc.indptr[col + 1]]]
+            items = set(genes[r] for r in rows.tolist())
+            self._go2items[goid] = items
+        return items
+
+    def __contains__(self, goid):
+        return goid in self.go2col
+
+    def __iter__(self):
+        return iter(self.go2col)
+
+    def __len__(self):
+        return len(self.go2col)
+
+    def get_counts(self, goids):
+        """Get the number of genes annotated to each GO ID, as an array"""
+        go2idx = self.assc_mtx.go2idx
+        counts = np.append(self.counts, 0)
+        return counts[np.array([go2idx.get(go, -1) for go in goids], dtype=np.int64)]
+
+    def get_go2cnt(self):
+        """Get the number of genes annotated to each GO ID, as a dict"""
+        counts = self.counts
+        return {go: int(counts[c]) for go, c in self.go2col.items()}
+
+
+class AsscView(Mapping):
+    """Read-only gene2gos view of an AsscMatrix; each gene's GO IDs are a frozenset.
+
+    Used in place of a dict of sets, so one association (e.g., a propagated association)
+    can be shared by many objects without copies and without being changed by any of them.
+    """
+
+    def __init__(self, assc_mtx):
+        self.assc_mtx = assc_mtx
+
+    def __getitem__(self, gene):
+        assc_mtx = self.assc_mtx
+        row = assc_mtx.gene2idx[gene]
+        indptr = assc_mtx.csr.indptr
+        goids = assc_mtx.goids
+        return frozenset(
+            goids[i] for i in assc_mtx.csr.indices[indptr[row]:indptr[row + 1]].tolist())
+
+    def __contains__(self, gene):
+        return gene in self.assc_mtx.gene2idx
+
+    def __iter__(self):
+        return iter(self.assc_mtx.genes)
+
+    def __len__(self):
+        return len(self.assc_mtx.genes)
+
+
+# Copyright (C) 2016-present, DV Klopfenstein, H Tang. All rights reserved.
@@ -0,0 +1,179 @@
+"""Annotations stored as NumPy columns, which may be saved to and loaded from one file."""
+
+__copyright__ = "Copyright (C) 2016-present, DV Klopfenstein, H Tang. All rights reserved."
+__author__ = "DV Klopfenstein"
+
+import sys
+import collections as cx
+
+import numpy as np
+
+from goatools.anno.opts import AnnoOptions
+from goatools.evidence_codes import EvidenceCodes
+from goatools.gosubdag.go_tasks import get_go2parents_godag
+
+
+class AnnoColumns:
+    """Annotations stored as NumPy arrays (columns), one row per annotation.
+
+    Repeated values (DB_ID, Evidence_Code, NS) are dictionary-encoded: each column
+    holds integer codes into a list of the distinct values. GO IDs are stored as ints
+    (GO:0008150 -> 8150). Qualifiers are reduced to a boolean column: contains NOT.
+    Selecting annotations with AnnoOptions (evidence codes, ND, NOT) and a namespace
+    is done with boolean masks rather than by looping over namedtuples.
+    """
+
+    def __init__(self, associations=None, evobj=None):
+        # associations: Annotation namedtuples, e.g., AnnoReaderBase.associations
+        self.evobj = evobj if evobj is not None else EvidenceCodes()
+        self.dbids, self.dbid = [], np.zeros(0, dtype=np.int32)
+        self.goid = np.zeros(0, dtype=np.int32)
+        self.evcodes, self.evcode = [], np.zeros(0, dtype=np.int32)
+        self.namespaces, self.namespace = [], np.zeros(0, dtype=np.int16)
+        self.has_not = np.zeros(0, dtype=bool)
+        # Annotations without Evidence_Code and Qualifier (id2gos) are always kept
+        self.has_evidence = False
+        if associations is not None:
+            self._init_columns(associations)
+
+    def __len__(self):
+        return len(self.goid)
+
+    def get_mask(self, options=None, namespace=None, godag=None):
+        """Get a boolean array of annotations selected by AnnoOptions, namespace and GO DAG."""
+        mask = np.ones(len(self.goid), dtype=bool)
+        if options is not None and self.has_evidence:
+            mask &= options.get_mask(self.evcode, self.evcodes, self.has_not)
+        if namespace is not None:
+            mask &= self.namespace == self._get_code(self.namespaces, namespace)
+        if godag is not None:
+            mask &= self._get_mask_godag(godag)
+        return mask
+
+    def get_id2gos(self, namespace=None, godag=None, propagate_counts=False,
+                   relationships=None, prt=sys.stdout, **kws):
+        """Return associations in a dict, id2gos. Same kws as AnnoReaderBase.get_id2gos."""
+        options = AnnoOptions(self.evobj, **kws)
+        dbid2goids = self.get_dbid2goids(self.get_mask(options, namespace, godag))
+        if propagate_counts:
+            self._add_ancestors(dbid2goids, godag, relationships, prt)
+        if options.b_geneid2gos:
+            return dbid2goids
+        return self._get_goid2dbids(dbid2goids)
+
+    def get_ns2assc(self, godag=None, **kws):
+        """Return associations as 3 (BP, MF, CC) dicts, id2gos"""
+        mask = self.get_mask(godag=godag)
+        return {self.namespaces[code]: self.get_id2gos(self.namespaces[code], godag, **kws)
+                for code in np.unique(self.namespace[mask]).tolist() if code >= 0}
+
+    def get_dbid2goids(self, mask):
+        """Get a dict of DB_ID to the set of GO IDs for the selected annotations"""
+        # One int64 key per annotation: DB_ID code in the upper bits, GO ID in the lower bits
+        keys = np.unique((self.dbid[mask].astype(np.int64) << 32) | self.goid[mask])
+        dbidx = keys >> 32
+        goints, goidx = np.unique(keys & 0xFFFFFFFF, return_inverse=True)
+        goids = ["GO:{N:07}".format(N=n) for n in goints.tolist()]
+        begs = np.flatnonzero(np.r_[True, dbidx[1:] != dbidx[:-1]])
+        ends = np.r_[begs[1:], len(keys)]
+        dbids = self.dbids
+        goidx = goidx.tolist()
+        return {dbids[i]: set(goids[j] for j in goidx[b:e])
+                for i, b, e in zip(dbidx[begs].tolist(), begs.tolist(), ends.tolist())}
+
+    def save(self, fout_npz):
+        """Write the annotation columns to a NumPy .npz file."""
+        # Write to an open file so NumPy does not add an .npz extension
+        with open(fout_npz, "wb") as prt:
+            np.savez(
+                prt,
+                dbids=np.array(self.dbids), dbid=self.dbid,
+                goid=self.goid,
+                evcodes=np.array(self.evcodes, dtype=str), evcode=self.evcode,
+                namespaces=np.array(self.namespaces, dtype=str), namespace=self.namespace,
+                has_not=self.has_not,
+                has_evidence=np.array(self.has_evidence),
+            )
+
+    @classmethod
+    def load(cls, fin_npz, evobj=None):
+        """Read annotation columns from a NumPy .npz file written by save."""
+        obj = cls(evobj=evobj)
+        with np.load(fin_npz) as dat:
+            obj.dbids = dat["dbids"].tolist()
+            obj.dbid = dat["dbid"]
+            obj.goid = dat["goid"]
+            obj.evcodes = dat["evcodes"].tolist()
+            obj.evcode = dat["evcode"]
+            obj.namespaces = dat["namespaces"].tolist()
+            obj.namespace = dat["namespace"]
+            obj.has_not = dat["has_not"]
+            obj.has_evidence = bool(dat["has_evidence"])
+        return obj
+
+    def _init_columns(self, associations):
+        """Dictionary-encode the annotation fields used to select annotations"""
+        # Annotations may be an iterator, e.g., streamed from an annotation file
+        dbid2code = {}
+        ev2code = {}
+        ns2code = {}
+        dbid = []
+        goid = []
+        evcode = []
+        namespace = []
+        has_not = []
+        has_ns = None
+        for ntd in associations:
+            if has_ns is None:
+                self.has_evidence = hasattr(ntd, "Evidence_Code") and hasattr(ntd, "Qualifier")
+                has_ns = hasattr(ntd, "NS")
+            dbid.append(dbid2code.setdefault(ntd.DB_ID, len(dbid2code)))
+            goid.append(int(ntd.GO_ID[3:]))
+            if self.has_evidence:
+                evcode.append(ev2code.setdefault(ntd.Evidence_Code, len(ev2code)))
+                has_not.append('NOT' in ntd.Qualifier)
+            if has_ns:
+                namespace.append(ns2code.setdefault(ntd.NS, len(ns2code)))
+        num = len(goid)
+        self.dbids = list(dbid2code)
+        self.dbid = np.array(dbid, dtype=np.int32)
+        self.goid = np.array(goid, dtype=np.int32)
+        self.evcodes = list(ev2code)
+        self.evcode = np.array(evcode, dtype=np.int32) if evcode else np.zeros(num, np.int32)
+        self.namespaces = list(ns2code)
+        self.namespace = np.array(namespace, dtype=np.int16) if namespace else \
+            np.full(num, -1, dtype=np.int16)
+        self.has_not = np.array(has_not, dtype=bool) if has_not else np.zeros(num, bool)
+
+    def _get_mask_godag(self, godag):
+        """Get a boolean array of annotations whose GO IDs are in the GO DAG"""
+        goints = np.unique(self.goid)
+        indag = np.array(["GO:{N:07}".format(N=n) in godag for n in goints.tolist()], dtype=bool)
+        return indag[np.searchsorted(goints, self.goid)]
+
+    @staticmethod
+    def _add_ancestors(dbid2goids, godag, relationships, prt):
+        """Add the ancestors of the annotated GO IDs to each set of GO IDs"""
+        assert godag is not None, "A GODag IS NEEDED TO PROPAGATE COUNTS"
+        goids = set(go for go in set.union(set(), *dbid2goids.values()) if go in godag)
+        go2ancestors = get_go2parents_godag(godag, goids, relationships, prt)
+        for goids_cur in dbid2goids.values():
+            ancestors = [go2ancestors[go] for go in goids_cur if go in go2ancestors]
+            goids_cur.update(*ancestors)
+
+    @staticmethod
+    def _get_goid2dbids(dbid2goids):
+        """Return dict of GO ID keys and a set of gene products as values"""
+        goid2dbids = cx.defaultdict(set)
+        for dbid, goids in dbid2goids.items():
+            for goid in goids:
+                goid2dbids[goid].add(dbid)
+        return dict(goid2dbids)
+
+    @staticmethod
+    def _get_code(values, value):
+        """Get the integer code of a value, or -2 (matching no rows) if it was not seen"""
+        return values.index(value) if value in values else -2
+
+
+# Copyright (C) 2016-present, DV Klopfenstein, H Tang. All rights reserved.
@@ -53,6 +53,9 @@ def get_anno_desc(fin_anno, anno_type):
     """Indicate annotation format: gaf, gpad, NCBI gene2go, or id2gos."""
     if anno_type is not None:
         return anno_type
+    # Compressed annotation files are read directly: goa_human.gaf.gz
+    if fin_anno[-3:] == '.gz':
+        fin_anno = fin_anno[:-3]
     if fin_anno[-7:] == 'gene2go':
         return 'gene2go'
     if fin_anno[-3:] == 'gaf':
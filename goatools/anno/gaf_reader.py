@@ -17,17 +17,26 @@ __author__ = "DV Klopfenstein"
 class GafReader(AnnoReaderBase):
     """Reads a Gene Annotation File (GAF). Returns a Python object."""
 
-    exp_kws = {"hdr_only", "prt", "namespaces", "allow_missing_symbol", "godag"}
+    exp_kws = {"hdr_only", "prt", "namespaces", "allow_missing_symbol", "godag", "taxids", "stream", "columnar"}
 
     def __init__(self, filename=None, **kws):
+        # kws taxids: Keep annotations only for gene products in these taxids
+        # kws stream: Read annotations as they are used, rather than storing them all
+        # kws columnar: Store annotations as NumPy columns to quickly get id2gos
+        self.kws_rd = {
+            "namespaces": kws.get("namespaces"),
+            "allow_missing_symbol": kws.get("allow_missing_symbol", False),
+            "taxids": kws.get("taxids"),
+        }
         super().__init__(
             "gaf",
             filename,
             godag=kws.get("godag"),
             hdr_only=kws.get("hdr_only", False),
             prt=kws.get("prt", sys.stdout),
-            namespaces=kws.get("namespaces"),
-            allow_missing_symbol=kws.get("allow_missing_symbol", False),
+            stream=kws.get("stream", False),
+            columnar=kws.get("columnar", False),
+            **self.kws_rd,
         )
 
     def read_gaf(self, namespace="BP", **kws):
@@ -77,11 +86,22 @@ class GafReader(AnnoReaderBase):
     def _init_associations(self, fin_gaf, **kws):
         """Read annotation file and store a list of namedtuples."""
         ini = InitAssc(fin_gaf)
-        nts = ini.init_associations(
-            kws["hdr_only"], kws["prt"], kws["namespaces"], kws["allow_missing_symbol"]
-        )
+        if self.stream:
+            # Read only the header now
+            nts = list(ini.iter_gaf_nts(hdr_only=True))
+        else:
+            nts = ini.init_associations(
+                kws["hdr_only"], kws["prt"], kws["namespaces"], kws["allow_missing_symbol"],
+                kws["taxids"],
+            )
         self.hdr = ini.hdr
         return nts
 
+    def _iter_associations(self):
+        """Read the annotation file, yielding one namedtuple at a time."""
+        ini = InitAssc(self.filename)
+        yield from ini.iter_gaf_nts(**self.kws_rd)
+        ini.prt_error_summary()
+
 
 # Copyright (C) 2016-2019, DV Klopfenstein, H Tang. All rights reserved."
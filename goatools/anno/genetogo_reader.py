@@ -24,10 +24,11 @@ __author__ = "DV Klopfenstein"
 class Gene2GoReader(AnnoReaderBase):
     """Reads a Gene Annotation File (GAF). Returns a Python object."""
 
-    exp_kws = {"taxids", "taxid", "namespaces", "godag"}
+    exp_kws = {"taxids", "taxid", "namespaces", "godag", "workers"}
 
     def __init__(self, filename=None, **kws):
         # kws: taxids or taxid
+        # workers: Parse the gene2go file in this many processes (default 1)
         super().__init__("gene2go", filename, **kws)
         # Each taxid has a list of namedtuples - one for each line in the annotations
         self.taxid2asscs = self._init_taxid2asscs()
@@ -181,9 +182,9 @@ class Gene2GoReader(AnnoReaderBase):
     # -- initialization -----------------------------------------------------------------------
     # pylint: disable=unused-argument
     @staticmethod
-    def _init_associations(fin_anno, taxid=None, taxids=None, namespaces=None, **kws):
+    def _init_associations(fin_anno, taxid=None, taxids=None, namespaces=None, workers=1, **kws):
         """Read annotation file and store a list of namedtuples."""
-        return InitAssc(taxid, taxids).init_associations(fin_anno, taxids, namespaces)
+        return InitAssc(taxid, taxids).init_associations(fin_anno, taxids, namespaces, workers)
 
     def _init_taxid2asscs(self):
         """Create dict with taxid keys and annotation namedtuple list."""
@@ -18,17 +18,22 @@ __author__ = "DV Klopfenstein"
 class GpadReader(AnnoReaderBase):
     """dRead a Gene Product Association Data (GPAD) and store the data in a Python object."""
 
-    exp_kws = {"hdr_only", "godag", "namespaces"}
+    exp_kws = {"hdr_only", "godag", "namespaces", "stream", "columnar"}
 
     def __init__(self, filename=None, **kws):
+        # kws stream: Read annotations as they are used, rather than storing them all
+        # kws columnar: Store annotations as NumPy columns to quickly get id2gos
         super().__init__(
             "gpad",
             filename,
             hdr_only=kws.get("hdr_only", False),
             godag=kws.get("godag"),
             namespaces=kws.get("namespaces"),
+            stream=kws.get("stream", False),
+            columnar=kws.get("columnar", False),
         )
-        self.qty = len(self.associations)
+        # Number of annotations; unknown (None) if streaming, since they are not stored
+        self.qty = None if self.stream else len(self.associations)
 
     def get_relation_cnt(self):
         """Return a Counter containing all relations contained in the Annotation Extensions."""
@@ -38,12 +43,25 @@ class GpadReader(AnnoReaderBase):
                 ctr += ntgpad.Extension.get_relations_cnt()
         return ctr
 
+    def has_ns(self):
+        """Return True if namespace field, NS exists on annotation namedtuples"""
+        if self.stream:
+            # Namespaces are added to GPAD annotations if a GODag is loaded
+            return self.godag is not None
+        return super().has_ns()
+
     def _init_associations(self, fin_gpad, **kws):
         """Read annotation file and store a list of namedtuples."""
         ini = InitAssc(fin_gpad, kws["godag"])
-        nts = ini.init_associations(kws["hdr_only"], kws["namespaces"])
+        # If streaming, read only the header now
+        nts = ini.init_associations(kws["hdr_only"] or self.stream, kws["namespaces"])
         self.hdr = ini.hdr
         return nts
 
+    def _iter_associations(self):
+        """Read the annotation file, yielding one namedtuple at a time."""
+        ini = InitAssc(self.filename, self.godag)
+        return ini.iter_associations(namespaces=self.namespaces)
+
 
 # Copyright (C) 2016-2019, DV Klopfenstein, H Tang. All rights reserved."
@@ -44,6 +44,11 @@ class IdToGosReader(AnnoReaderBase):
         """Return full annotations due to lack of Evidence_code or Qualifier in this format"""
         return associations
 
+    @staticmethod
+    def _iter_reduced(annotations, options):
+        """Yield full annotations due to lack of Evidence_code or Qualifier in this format"""
+        return iter(annotations)
+
     def nts_ev_nd(self):
         """Get annotations where Evidence_code == 'ND' (No biological data)"""
         return []
@@ -11,6 +11,7 @@ import collections as cx
 import datetime
 import logging
 
+from goatools.base import nopen
 from goatools.anno.annoreader_base import AnnoReaderBase
 from goatools.anno.init.utils import get_date_yyyymmdd
 from goatools.anno.extensions.factory import get_extensions
@@ -31,28 +32,35 @@ class InitAssc:
         self.datobj = None
 
     # pylint: disable=too-many-arguments
-    def init_associations(self, hdr_only, prt, namespaces, allow_missing_symbol):
+    def init_associations(self, hdr_only, prt, namespaces, allow_missing_symbol, taxids=None):
         """Read GAF file. Store annotation data in a list of namedtuples."""
         import timeit
         tic = timeit.default_timer()
-        nts = self._read_gaf_nts(hdr_only, namespaces, allow_missing_symbol)
+        nts = list(self.iter_gaf_nts(hdr_only, namespaces, allow_missing_symbol, taxids))
         # GAF file has been read
         if prt:
             prt.write('HMS:{HMS} {N:7,} annotations READ: {ANNO} {NSs}\n'.format(
                 N=len(nts), ANNO=self.fin_gaf,
                 NSs=','.join(namespaces) if namespaces else '',
                 HMS=str(datetime.timedelta(seconds=(timeit.default_timer()-tic)))))
-        # If there are illegal GAF lines ...
+        self.prt_error_summary()
+        return nts
+        #### return self.evobj.sort_nts(nts, 'Evidence_Code')
+
+    def prt_error_summary(self):
+        """If there are illegal GAF lines, print a summary"""
         if self.datobj:
             if self.datobj.ignored or self.datobj.illegal_lines:
                 self.datobj.prt_error_summary(self.fin_gaf)
-        return nts
-        #### return self.evobj.sort_nts(nts, 'Evidence_Code')
 
-    # pylint: disable=too-many-locals
-    def _read_gaf_nts(self, hdr_only, namespaces, allow_missing_symbol):
-        """Read GAF file. Store annotation data in a list of namedtuples."""
-        nts = []
+    # pylint: disable=too-many-locals,too-many-branches
+    def iter_gaf_nts(self, hdr_only=False, namespaces=None, allow_missing_symbol=False,
+                     taxids=None):
+        """Read GAF file, which may be gzipped. Yield annotation data as namedtuples.
+
+        namespaces: Yield only annotations in these namespaces (BP, MF, CC)
+        taxids: Yield only annotations for gene products of these taxids (GAF column 13)
+        """
         ver = None
         header = GafHdr()
         datobj = None
@@ -62,13 +70,17 @@ class InitAssc:
         lnum = -1
         line = ''
         get_all_nss = namespaces is None or namespaces == {'BP', 'MF', 'CC'}
+        # Compare the first taxon string in the GAF line before converting any fields
+        taxons = None if taxids is None else {'taxon:{T}'.format(T=t) for t in taxids}
         try:
-            with open(self.fin_gaf) as ifstrm:
+            with nopen(self.fin_gaf) as ifstrm:
                 for lnum, line in enumerate(ifstrm, 1):
                     # Read data
                     if get_gafvals:
                         # print(lnum, line)
                         flds = line.split('\t')
+                        if taxons is not None and flds[12].split('|', 1)[0] not in taxons:
+                            continue
                         try:
                             nspc = GafData.aspect2ns[flds[8]]  # 8 GAF Aspect -> BP, MF, or CC
                         except KeyError:
@@ -76,7 +88,7 @@ class InitAssc:
                         if get_all_nss or nspc in namespaces:
                             gafvals = get_gafvals(flds, nspc)
                             if gafvals:
-                                nts.append(ntobj_make(gafvals))
+                                yield ntobj_make(gafvals)
                             else:
                                 datobj.ignored.append((lnum, line))
                     # Read header
@@ -90,13 +102,16 @@ class InitAssc:
                             if hdr_only:
                                 break
                             datobj = GafData(ver, allow_missing_symbol)
+                            self.datobj = datobj
                             get_gafvals = datobj.get_gafvals
                             ntobj_make = datobj.get_ntobj()._make
-                            self._add_data0(nts, lnum, line, get_all_nss, namespaces, datobj)
+                            if taxons is None or line.split('\t')[12].split('|', 1)[0] in taxons:
+                                ntd = self._get_data0(
+                                    lnum, line, get_all_nss, namespaces, datobj, ntobj_make)
+                                if ntd is not None:
+                                    yield ntd
 
             self.hdr = header.get_hdr()
-            if hdr_only:
-                return nts
         # pylint: disable=broad-except
         except Exception as inst:
             import traceback
@@ -107,11 +122,9 @@ class InitAssc:
             if datobj is not None:
                 datobj.prt_line_detail(sys.stdout, line)
             sys.exit(1)
-        self.datobj = datobj
-        return nts
 
     @staticmethod
-    def _add_data0(nts, lnum, line, get_all_nss, namespaces, datobj):
+    def _get_data0(lnum, line, get_all_nss, namespaces, datobj, ntobj_make):
         """Do tasks upon finding the end of the header"""
         flds = line.split('\t')
         try:
@@ -121,9 +134,9 @@ class InitAssc:
         if get_all_nss or nspc in namespaces:
             gafvals = datobj.get_gafvals(flds, nspc)
             if gafvals:
-                nts.append(datobj.get_ntobj()._make(gafvals))
-            else:
-                datobj.ignored.append((lnum, line))
+                return ntobj_make(gafvals)
+            datobj.ignored.append((lnum, line))
+        return None
 
 
 class GafData:
@@ -6,9 +6,12 @@
 """
 
 import sys
+import gc
+import gzip
 import collections as cx
 import timeit
 import datetime
+from goatools.forkpool import iter_forked
 
 __copyright__ = "Copyright (C) 2016-present, DV Klopfenstein, H Tang. All rights reserved."
 __author__ = "DV Klopfenstein"
@@ -49,78 +52,87 @@ class InitAssc(object):
             print('**NOTE: DEFAULT TAXID STORED FROM gene2go IS 9606 (human)\n')
         return ret
 
-    # pylint: disable=too-many-locals
-    def init_associations(self, fin_anno, taxids=None, namespaces=None):
-        """Read annotation file. Store annotation data in a list of namedtuples."""
+    # Bytes read from the file for each chunk parsed by a worker process
+    chunk_size = 64*1024*1024
+
+    def init_associations(self, fin_anno, taxids=None, namespaces=None, workers=1):
+        """Read annotation file. Store annotation data in a list of namedtuples.
+
+        The file (plain or gzipped) is read in chunks which end at line boundaries.
+        Lines for other taxids are skipped by their first bytes before they are split.
+        workers: Parse the chunks in this many processes (default 1: no process pool)
+        """
         nts = []
         if fin_anno is None:
             return nts
         tic = timeit.default_timer()
-        lnum = -1
-        line = "\t"*len(self.flds)
-        cnts = {'taxids':set(), 'genes':set(), 'goids':set()}
+        # Get: 1) Specified taxids, default taxid(human), or all taxids
+        prefixes = None if taxids is True or self.taxids is True else tuple(
+            '{T}\t'.format(T=t).encode() for t in sorted(self.taxids))
+        get_all_nss = namespaces is None or namespaces == {'BP', 'MF', 'CC'}
+        args = (prefixes, None if get_all_nss else namespaces)
+        ntobj = cx.namedtuple('ntanno', self.flds)
+        # Many small objects are created; garbage collection passes would find no garbage
+        gc_enabled = gc.isenabled()
+        gc.disable()
         try:
-            with open(fin_anno) as ifstrm:
-                category2ns = {'Process':'BP', 'Function':'MF', 'Component':'CC'}
-                ntobj = cx.namedtuple('ntanno', self.flds)
-                # Get: 1) Specified taxids, default taxid(human), or all taxids
-                get_all_taxids = taxids is True
-                get_all_nss = namespaces is None or namespaces == {'BP', 'MF', 'CC'}
-                taxids = self.taxids
-                for lnum, line in enumerate(ifstrm, 1):
-                    # Read data
-                    if line[0] != '#':
-                        vals = line.split('\t')
-                        taxid = int(vals[0])
-                        nspc = category2ns[vals[7].rstrip()]
-                        if (get_all_taxids or taxid in taxids) and (get_all_nss or nspc in namespaces):
-                            # assert len(vals) == 8
-                            cnts['taxids'].add(taxid)
-                            geneid = int(vals[1])
-                            cnts['genes'].add(geneid)
-                            goid = vals[2]
-                            cnts['goids'].add(goid)
-                            ntd = ntobj(
-                                tax_id=taxid,
-                                DB_ID=geneid,
-                                GO_ID=goid,
-                                Evidence_Code=vals[3],
-                                Qualifier=self._get_qualifiers(vals[4]),
-                                GO_term=vals[5],
-                                DB_Reference=self._get_pmids(vals[6]),
-                                NS=nspc)
-                            #self._chk_qualifiers(qualifiers, lnum, ntd)
-                            nts.append(ntd)
-                    # Read header
-                    elif line[0] == '#':
-                        assert line[1:-1].split('\t') == self.hdrs
+            for vals in self._iter_chunk_vals(fin_anno, args, workers):
+                nts.extend(ntobj._make(v) for v in vals)
         # pylint: disable=broad-except
         except Exception as inst:
             import traceback
             traceback.print_exc()
             sys.stderr.write("\n  **FATAL: {MSG}\n\n".format(MSG=str(inst)))
-            sys.stderr.write("**FATAL: {FIN}[{LNUM}]:\n{L}".format(FIN=fin_anno, L=line, LNUM=lnum))
-            self._prt_line_detail(sys.stdout, line, lnum)
+            if isinstance(inst, LineError):
+                _, lnum, line = inst.args
+                sys.stderr.write("**FATAL: {FIN}[{LNUM}]:\n{L}\n".format(FIN=fin_anno, L=line, LNUM=lnum))
+                self._prt_line_detail(sys.stdout, line, lnum)
+            else:
+                sys.stderr.write("**FATAL: {FIN}\n".format(FIN=fin_anno))
             sys.exit(1)
+        finally:
+            if gc_enabled:
+                gc.enable()
         print('HMS:{HMS} {N:7,} annotations, {G:6,} genes, {GOs:6,} GOs, {T} taxids READ: {ANNO} {NSs}'.format(
             N=len(nts), ANNO=fin_anno,
-            G=len(cnts['genes']), GOs=len(cnts['goids']), T=len(cnts['taxids']),
-            ## N=len(nts), ANNO=fin_anno, G=-1, T=-1,
+            G=len(set(nt.DB_ID for nt in nts)),
+            GOs=len(set(nt.GO_ID for nt in nts)),
+            T=len(set(nt.tax_id for nt in nts)),
             NSs=','.join(namespaces) if namespaces else '',
             HMS=str(datetime.timedelta(seconds=(timeit.default_timer()-tic)))))
         return nts
 
-    @staticmethod
-    def _get_qualifiers(qualifier):
-        """Return a list of qualifiers if they exist."""
-        return set(qualifier.split(' ')) if qualifier != '-' else set()
-
-    @staticmethod
-    def _get_pmids(pmidstr):
-        """Return a list of PMIDs if they exist."""
-        if pmidstr == '-':
-            return []
-        return ['PMID:{N}'.format(N=n) for n in pmidstr.split('|')]
+    def _iter_chunk_vals(self, fin_anno, args, workers):
+        """Parse the annotation file in chunks. Yield a list of field values for each chunk."""
+        # Chunks are parsed in parallel, but returned in the same order as in the file.
+        # Only a few chunks are read ahead so the whole file is never held in memory.
+        tasks = ((lnum, chunk, args) for lnum, chunk in self._iter_chunks(fin_anno))
+        return iter_forked(_get_chunk_vals, tasks, workers, initializer=gc.disable)
+
+    def _iter_chunks(self, fin_anno):
+        """Read the annotation file in chunks of bytes which end at line boundaries.
+
+        Yields the line number of the first line in the chunk and the chunk.
+        """
+        with (gzip.open(fin_anno, 'rb') if fin_anno.endswith('.gz') else open(fin_anno, 'rb')) as ifstrm:
+            # Read header
+            line = ifstrm.readline()
+            if line[:1] == b'#':
+                hdrs = line[1:].decode().rstrip('\r\n').split('\t')
+                assert hdrs == self.hdrs, 'UNEXPECTED gene2go HEADER: {L}'.format(L=line)
+                line = b''
+                lnum = 2
+            else:
+                lnum = 1
+            while True:
+                chunk = line + ifstrm.read(self.chunk_size)
+                line = b''
+                if not chunk:
+                    break
+                if chunk[-1:] != b'\n':
+                    chunk += ifstrm.readline()
+                yield lnum, chunk
+                lnum += chunk.count(b'\n')
 
     def _prt_line_detail(self, prt, line, lnum=""):
         """Print each field and its value."""
@@ -139,4 +151,56 @@ class InitAssc(object):
     ##             # self.illegal_lines[errname].append((lnum, "\t".join(flds)))
 
 
+class LineError(ValueError):
+    """An annotation line which could not be parsed: (message, line number, line)"""
+
+
+def _get_chunk_vals(chunk_args):
+    """Parse the annotation lines in a chunk of bytes. Return a list of field values."""
+    lnum, chunk, (prefixes, namespaces) = chunk_args
+    lines = chunk.split(b'\n')
+    # Keep lines for the requested taxids without splitting or decoding the other lines
+    if prefixes is not None:
+        lines = [ln for ln in lines if ln.startswith(prefixes)]
+    else:
+        lines = [ln for ln in lines if ln and ln[:1] != b'#']
+    if not lines:
+        return []
+    category2ns = {'Process':'BP', 'Function':'MF', 'Component':'CC'}
+    vals_all = []
+    line = ''
+    try:
+        for line in b'\n'.join(lines).decode().split('\n'):
+            vals = line.rstrip('\r').split('\t')
+            nspc = category2ns[vals[7]]
+            if namespaces is None or nspc in namespaces:
+                vals_all.append((
+                    int(vals[0]),                   # tax_id
+                    int(vals[1]),                   # DB_ID
+                    vals[2],                        # GO_ID
+                    vals[3],                        # Evidence_Code
+                    _get_qualifiers(vals[4]),       # Qualifier
+                    vals[5],                        # GO_term
+                    _get_pmids(vals[6]),            # DB_Reference
+                    nspc))                          # NS
+    # pylint: disable=broad-except
+    except Exception as inst:
+        # Line number in the file: lines before the first copy of this line in the chunk
+        lnum += chunk[:chunk.find(line.encode())].count(b'\n')
+        raise LineError('{E}: {MSG}'.format(E=type(inst).__name__, MSG=inst), lnum, line) from inst
+    return vals_all
+
+
+def _get_qualifiers(qualifier):
+    """Return a list of qualifiers if they exist."""
+    return set(qualifier.split(' ')) if qualifier != '-' else set()
+
+
+def _get_pmids(pmidstr):
+    """Return a list of PMIDs if they exist."""
+    if pmidstr == '-':
+        return []
+    return ['PMID:{N}'.format(N=n) for n in pmidstr.split('|')]
+
+
 # Copyright (C) 2016-present, DV Klopfenstein, H Tang. All rights reserved."
@@ -193,64 +193,71 @@ class InitAssc:
             prop2val['go_evidence'] = go_evidence
         return prop2val
 
-    # pylint: disable=too-many-locals
     def init_associations(self, hdr_only=False, namespaces=None, prt=sys.stdout):
         """Read GPAD file. HTTP address okay. GZIPPED/BZIPPED file okay."""
         import timeit
         import datetime
-        associations = []
         tic = timeit.default_timer()
         if self.filename is None:
+            return []
+        associations = list(self.iter_associations(hdr_only, namespaces))
+        if hdr_only:
             return associations
+        # GPAD file has been read
+        prt.write('HMS:{HMS} {N:7,} annotations READ: {ANNO} {NSs}\n'.format(
+            N=len(associations), ANNO=self.filename,
+            NSs=','.join(namespaces) if namespaces else '',
+            HMS=str(datetime.timedelta(seconds=(timeit.default_timer()-tic)))))
+        return associations
+
+    # pylint: disable=too-many-locals
+    def iter_associations(self, hdr_only=False, namespaces=None):
+        """Read GPAD file, which may be gzipped. Yield annotation data as namedtuples."""
         ver = None
         ntgpadobj_make = None
         hdrobj = GpadHdr()
-        ifstrm = nopen(self.filename)
         _add_ns = self.godag is not None
         _get_ntgpadvals = self._get_ntgpadvals
         get_all_nss = self._get_b_all_nss(namespaces)
-        for lnum, line in enumerate(ifstrm, 1):
-            # Read data
-            if ntgpadobj_make:
-                flds = self._split_line(line)
-                try:
-                    # pylint: disable=not-callable
-                    goid = flds[3]
-                    assert flds[5][:4] == 'ECO:', 'UNRECOGNIZED ECO({ECO})'.format(ECO=flds[5])
-                    nspc = self._get_namespace(goid) if _add_ns else None
-                    if get_all_nss or nspc in namespaces:
-                        ntgpad = ntgpadobj_make(_get_ntgpadvals(flds, goid, nspc, _add_ns))
-                        associations.append(ntgpad)
-                # pylint: disable=broad-except
-                except Exception as inst:
-                    import traceback
-                    traceback.print_exc()
-                    sys.stdout.write("\n  **FATAL: {MSG}\n\n".format(MSG=str(inst)))
-                    sys.stdout.write("**FATAL: {FIN}[{LNUM}]:\n{L}\n".format(
-                        FIN=self.filename, L=line, LNUM=lnum))
-                    flds.insert(6, ECO2GRP.get(flds[5], '???'))
-                    for idx, (key, val) in enumerate(zip(self.gpadhdr, flds)):
-                        sys.stdout.write('{I:2} {KEY:13} {VAL}\n'.format(I=idx, KEY=key, VAL=val))
-                    ## if datobj is not None:
-                    ##     datobj.prt_line_detail(sys.stdout, line)
-                    sys.exit(1)
-            # Read header
-            else:
-                if line[0] == '!':
-                    if ver is None and line[1:13] == 'gpa-version:':
-                        ver = line[13:].strip()
-                    hdrobj.chkaddhdr(line)
+        with nopen(self.filename) as ifstrm:
+            for lnum, line in enumerate(ifstrm, 1):
+                # Read data
+                if ntgpadobj_make:
+                    flds = self._split_line(line)
+                    try:
+                        # pylint: disable=not-callable
+                        goid = flds[3]
+                        assert flds[5][:4] == 'ECO:', 'UNRECOGNIZED ECO({ECO})'.format(ECO=flds[5])
+                        nspc = self._get_namespace(goid) if _add_ns else None
+                        if get_all_nss or nspc in namespaces:
+                            ntgpad = ntgpadobj_make(_get_ntgpadvals(flds, goid, nspc, _add_ns))
+                        else:
+                            continue
+                    # pylint: disable=broad-except
+                    except Exception as inst:
+                        import traceback
+                        traceback.print_exc()
+                        sys.stdout.write("\n  **FATAL: {MSG}\n\n".format(MSG=str(inst)))
+                        sys.stdout.write("**FATAL: {FIN}[{LNUM}]:\n{L}\n".format(
+                            FIN=self.filename, L=line, LNUM=lnum))
+                        flds.insert(6, ECO2GRP.get(flds[5], '???'))
+                        for idx, (key, val) in enumerate(zip(self.gpadhdr, flds)):
+                            sys.stdout.write('{I:2} {KEY:13} {VAL}\n'.format(I=idx, KEY=key, VAL=val))
+                        ## if datobj is not None:
+                        ##     datobj.prt_line_detail(sys.stdout, line)
+                        sys.exit(1)
+                    yield ntgpad
+                # Read header
                 else:
-                    self.hdr = hdrobj.get_hdr()
-                    if hdr_only:
-                        return associations
-                    ntgpadobj_make = self._get_ntgpadnt(ver, _add_ns)._make
-        # GPAD file has been read
-        prt.write('HMS:{HMS} {N:7,} annotations READ: {ANNO} {NSs}\n'.format(
-            N=len(associations), ANNO=self.filename,
-            NSs=','.join(namespaces) if namespaces else '',
-            HMS=str(datetime.timedelta(seconds=(timeit.default_timer()-tic)))))
-        return associations
+                    if line[0] == '!':
+                        if ver is None and line[1:13] == 'gpa-version:':
+                            ver = line[13:].strip()
+                        hdrobj.chkaddhdr(line)
+                    else:
+                        self.hdr = hdrobj.get_hdr()
+                        if hdr_only:
+                            return
+                        ntgpadobj_make = self._get_ntgpadnt(ver, _add_ns)._make
 
     def _get_b_all_nss(self, namespaces):
         """Get all namespaces"""
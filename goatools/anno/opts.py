@@ -3,6 +3,8 @@
 __copyright__ = "Copyright (C) 2016-2019, DV Klopfenstein, H Tang. All rights reserved."
 __author__ = "DV Klopfenstein"
 
+import numpy as np
+
 
 # pylint: disable=too-few-public-methods
 class AnnoOptions(object):
@@ -86,6 +88,26 @@ class AnnoOptions(object):
         )
         return self.param2fnc[fnc_key]
 
+    def get_mask(self, ev_codes, evcodes, has_not):
+        """Get a boolean array of annotations to keep; same selection as getfnc_qual_ev.
+
+        ev_codes: Index into evcodes of the Evidence_Code of each annotation
+        evcodes:  Evidence codes seen in the annotations
+        has_not:  Boolean array. True if the Qualifiers of an annotation contain NOT
+        """
+        evcodes = np.array(evcodes, dtype=str)
+        keep_ev = np.ones(len(evcodes), dtype=bool)
+        if not self._keep_nd:
+            keep_ev &= evcodes != 'ND'
+        if self.include_evcodes is not None:
+            keep_ev &= np.isin(evcodes, list(self.include_evcodes))
+        if self.exclude_evcodes is not None:
+            keep_ev &= ~np.isin(evcodes, list(self.exclude_evcodes))
+        mask = keep_ev[ev_codes]
+        if not self._keep_not:
+            mask &= ~has_not
+        return mask
+
     def _get_desc(self):
         """Get desc: qualified, unqualified; ND and NOT"""
         return self.nd_not2desc[(self._keep_nd, self._keep_not)]
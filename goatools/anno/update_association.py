@@ -4,8 +4,12 @@ __copyright__ = "Copyright (C) 2016-2019, DV Klopfenstein, H Tang, All rights re
 __author__ = "DV Klopfenstein"
 
 import sys
+import hashlib
 from collections import defaultdict
-from goatools.gosubdag.go_tasks import get_go2parents_go2obj
+from goatools.gosubdag.go_tasks import get_go2parents_godag
+from goatools.godag.go_tasks import prt_relationships
+from goatools.anno.assc_matrix import AsscMatrix
+from goatools.anno.assc_matrix import AsscView
 from goatools.anno.broad_gos import NS2GOS_SHORT
 from goatools.anno.broad_gos import NS2GOS
 
@@ -24,10 +28,9 @@ def update_association(assc_gene2gos, go2obj, relationships=None, prt=sys.stdout
     assc_goid_sets = assc_gene2gos.values()
     goids_assoc_all = set.union(*assc_goid_sets)
     _chk_goids_notfound(goids_assoc_all, goids_avail, prt)
-    # Get the subset of GO objects in the association
+    # Get the ancestors of the GO IDs in the association
     _goids_assoc_cur = goids_assoc_all.intersection(goids_avail)
-    _go2obj_assc = {go:go2obj[go] for go in _goids_assoc_cur}
-    go2ancestors = get_go2parents_go2obj(_go2obj_assc, relationships, prt)
+    go2ancestors = get_go2parents_godag(go2obj, _goids_assoc_cur, relationships, prt)
     # Update the GO sets in assc_gene2gos to include all GO ancestors
     for assc_goids_cur in assc_goid_sets:
         parents = set()
@@ -36,6 +39,49 @@ def update_association(assc_gene2gos, go2obj, relationships=None, prt=sys.stdout
                 parents.update(go2ancestors[goid])
         assc_goids_cur.update(parents)
 
+
+def get_assc_propagated(assc_gene2gos, go2obj, relationships=None, prt=sys.stdout):
+    """Get the association with all GO ancestors as a gene-by-GO sparse matrix (AsscMatrix).
+
+    The association is not changed. Alternate GO IDs become main GO IDs.
+    Use AsscMatrix.get_id2gos() to get the propagated association as a dict of sets.
+    """
+    if prt:
+        prt.write("Propagating term counts ")
+        prt_relationships(prt, "up", relationships)
+    if assc_gene2gos:
+        _chk_goids_notfound(set.union(*assc_gene2gos.values()), set(go2obj), prt)
+    return AsscMatrix(assc_gene2gos, go2obj).get_propagated(go2obj, relationships)
+
+
+def get_assc_propagated_view(assc_gene2gos, go2obj, relationships=None, prt=sys.stdout):
+    """Get a read-only propagated association (AsscView), shared by all who ask for it.
+
+    The association is not changed. On a GODag, the view is cached for each association
+    content (a hash of its sorted gene-GO pairs), GO DAG version and set of relationships,
+    so many GOEAs on one association propagate it once. An association changed in place
+    is propagated again. Alternate GO IDs become main GO IDs.
+    """
+    if not hasattr(go2obj, "get_compact"):
+        return AsscView(get_assc_propagated(assc_gene2gos, go2obj, relationships, prt))
+    # pylint: disable=protected-access
+    key = (_get_assc_hash(assc_gene2gos), getattr(go2obj, "data_version", None),
+           go2obj.get_compact()._get_rels(relationships))
+    key2view = go2obj.__dict__.setdefault("_propagated", {})
+    view = key2view.get(key)
+    if view is None:
+        view = AsscView(get_assc_propagated(assc_gene2gos, go2obj, relationships, prt))
+        key2view[key] = view
+    elif prt:
+        prt.write("Propagated term counts: {N:,} genes, from cache\n".format(N=len(view)))
+    return view
+
+def _get_assc_hash(assc_gene2gos):
+    """Get a hash of the sorted (gene, GO ID) pairs of an association"""
+    txt = "\n".join(sorted("{!r}\t{}".format(gene, "\t".join(sorted(map(str, goids))))
+                           for gene, goids in assc_gene2gos.items()))
+    return hashlib.sha1(txt.encode("utf-8")).hexdigest()
+
 def _chk_goids_notfound(goids_assoc_all, goids_avail, prt=sys.stderr):
     """Report the number of GO IDs in the association, but not in the GODAG"""
     goids_bad = goids_assoc_all.difference(goids_avail)
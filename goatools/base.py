@@ -155,12 +155,12 @@ def gunzip(gzip_file, file_gunzip=None):
         return file_gunzip
 
 
-def get_godag(fin_obo="go-basic.obo", prt=sys.stdout, optional_attrs=None):
+def get_godag(fin_obo="go-basic.obo", prt=sys.stdout, optional_attrs=None, cache=False):
     """Return GODag object. Initialize, if necessary."""
     from .obo_parser import GODag
 
     download_go_basic_obo(fin_obo, prt)
-    return GODag(fin_obo, optional_attrs, load_obsolete=False, prt=prt)
+    return GODag(fin_obo, optional_attrs, load_obsolete=False, prt=prt, cache=cache)
 
 
 def dnld_gaf(species_txt, prt=sys.stdout):
@@ -73,7 +73,10 @@ class GoeaCliArgs:
             "filenames",
             type=str,
             nargs=3,
-            help="data/study data/population data/association",
+            help=(
+                "data/study data/population data/association. "
+                "Run many studies by separating study files with commas"
+            ),
         )
         p.add_argument(
             "--annofmt",
@@ -242,6 +245,12 @@ class GoeaCliArgs:
             choices=FisherFactory.options.keys(),
             help=str(FisherFactory()),
         )
+        p.add_argument(
+            "--workers",
+            default=1,
+            type=int,
+            help="Run the GOEAs of each namespace and study file in this many processes",
+        )
         p.add_argument(
             "--min_overlap",
             default=0.7,
@@ -300,6 +309,8 @@ class GoeaCliArgs:
         nspc = p.parse_args(argv)  # Namespace object from argparse
         self._adjust_relationships(nspc)
         self._check_input_files(nspc, p)
+        if nspc.workers < 1:
+            p.error("--workers must be 1 or more: {N}".format(N=nspc.workers))
         return nspc
 
     @staticmethod
@@ -369,20 +380,57 @@ class GoeaCliFnc:
         )
         # GET: Gene2GoReader, GafReader, GpadReader, or IdToGosReader
         self.objanno = self._get_objanno(self.args.filenames[2])
-        _study, _pop = self.rd_files(*self.args.filenames[:2])
-        if not self.args.compare:
-            # Compare population and study gene product sets
-            self.chk_genes(_study, _pop, self.objanno.associations)
+        _fin2study, _pop = self._rd_studies(*self.args.filenames[:2])
         self.methods = self.args.method.split(",")
         self.itemid2name = self._init_itemid2name()
         # Get GOEnrichmentStudyNS
         self.objgoeans = self._init_objgoeans(_pop)
         # Run GOEA
         _run_kws = self._get_run_kws()
-        self.results_all = self.objgoeans.run_study(_study, **_run_kws)
+        self.study2results = self._run_studies(_fin2study, _run_kws)
+        self.fin_study = next(iter(self.study2results))
+        self.results_all = self.study2results[self.fin_study]
         # Prepare for grouping, if user-specified. Create GroupItems
         self.prepgrp = GroupItems(self, self.godag.version) if self.sections else None
 
+    def _rd_studies(self, study_fns, pop_fn):
+        """Read one or more comma-separated study files and the population file."""
+        fin2study = {}
+        fins_study = study_fns.split(",")
+        if self.args.compare and len(fins_study) != 1:
+            sys.exit("\nERROR: ONLY ONE STUDY FILE CAN BE RUN WITH --compare\n")
+        # The population file is read once for all study files
+        pop_all = self._read_pop(pop_fn)
+        for fin_study in fins_study:
+            study, pop = self._read_study(fin_study, pop_all)
+            print(f"Study: {len(study)} vs. Population {len(pop)}\n")
+            if not self.args.compare:
+                # Compare population and study gene product sets
+                self.chk_genes(study, pop, self.objanno.associations)
+            fin2study[fin_study] = study
+        return fin2study, pop
+
+    def _run_studies(self, fin2study, run_kws):
+        """Run GOEAs on all studies, using a process pool if workers were requested."""
+        workers = getattr(self.args, "workers", 1)
+        if len(fin2study) == 1:
+            fin_study, study = next(iter(fin2study.items()))
+            return {fin_study: self.objgoeans.run_study(study, workers=workers, **run_kws)}
+        return dict(self.objgoeans.run_studies(fin2study, workers=workers, **run_kws))
+
+    def set_study(self, fin_study):
+        """Set the study whose GOEA results are returned by get_results and printed."""
+        self.fin_study = fin_study
+        self.results_all = self.study2results[fin_study]
+
+    def get_outfiles(self):
+        """Get the output files for the current study. Add the study name if many studies."""
+        outfiles = self.args.outfile.split(",")
+        if len(self.study2results) == 1:
+            return outfiles
+        study = os.path.splitext(os.path.basename(self.fin_study))[0]
+        return ["{B}_{S}{E}".format(B=b, S=study, E=e) for b, e in map(os.path.splitext, outfiles)]
+
     def _get_objanno(self, assoc_fn):
         """Get an annotation object"""
         # Determine annotation file format from filename, if possible
@@ -434,7 +482,7 @@ class GoeaCliFnc:
             self._prt_results(goea_results)
         else:
             # Users can print to both tab-separated file and xlsx file in one run.
-            outfiles = self.args.outfile.split(",")
+            outfiles = self.get_outfiles()
             grpwr = self.prepgrp.get_objgrpwr(goea_results) if self.prepgrp else None
             if grpwr is None:
                 self.prt_outfiles_flat(goea_results, outfiles)
@@ -593,19 +641,29 @@ class GoeaCliFnc:
 
     def _read_geneset(self, study_fn: str, pop_fn: str):
         """Open files containing genes. Return study genes and population genes."""
+        return self._read_study(study_fn, self._read_pop(pop_fn))
+
+    @staticmethod
+    def _read_pop(pop_fn: str):
+        """Open the population file. Return population genes."""
         pop = set(_.strip() for _ in open(pop_fn, encoding="utf-8") if _.strip())
+        if next(iter(pop)).isdigit():
+            pop = set(int(g) for g in pop)
+        return pop
+
+    def _read_study(self, study_fn: str, pop: set):
+        """Open a study file. Return study genes and population genes."""
         study = frozenset(
             _.strip() for _ in open(study_fn, encoding="utf-8") if _.strip()
         )
-        if next(iter(pop)).isdigit():
-            pop = set(int(g) for g in pop)
+        if isinstance(next(iter(pop)), int):
             study = frozenset(int(g) for g in study)
         # some times the pop is a second group to compare, rather than the
         # population in that case, we need to make sure the overlapping terms
         # are removed first
         if self.args.compare:
             common = pop & study
-            pop |= study
+            pop = pop | study
             pop -= common
             study -= common
             sys.stderr.write(f"removed {len(common)} overlapping items\n")
@@ -647,7 +705,7 @@ class GroupItems:
 
     def __init__(self, objcli, godag_version):
         # _goids = set(o.id for o in godag.values() if not o.children)
-        _goids = set(r.GO for r in objcli.results_all)
+        _goids = set(r.GO for rs in objcli.study2results.values() for r in rs)
         _tobj = TermCounts(objcli.godag, objcli.objgoeans.get_assoc())
         # pylint: disable=line-too-long
         self.gosubdag = GoSubDag(
@@ -801,8 +859,10 @@ class GrpWr:
 def main(args=None):
     """Run gene enrichment analysis from the command line."""
     obj = GoeaCliFnc(GoeaCliArgs(args).args)
-    results_specified = obj.get_results()
-    obj.prt_results(results_specified)
+    for fin_study in obj.study2results:
+        obj.set_study(fin_study)
+        results_specified = obj.get_results()
+        obj.prt_results(results_specified)
 
 
 # Copyright (C) 2010-present, H Tang et al. All rights reserved.
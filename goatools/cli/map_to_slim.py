@@ -11,6 +11,7 @@ import sys
 
 from ..associations import read_associations
 from ..mapslim import mapslim
+from ..mapslim import get_slimmapper
 from ..obo_parser import GODag
 
 
@@ -71,16 +72,9 @@ def _write_associations(fin_assc, go_dag, goslim_dag, only_direct, prt):
         sys.stderr.write("file %s not found!\n" % fin_assc)
         raise SystemExit(1)
     assocs = read_associations(fin_assc, "id2gos")
-    for protein_product, go_terms in assocs.items():
-        all_covered_anc = set()
-        all_all_anc = set()
-        for go_term in go_terms:
-            if go_term not in go_dag:
-                continue
-            direct_anc, all_anc = mapslim(go_term, go_dag, goslim_dag)
-            all_all_anc |= all_anc
-            all_covered_anc |= all_anc - direct_anc
-        slim_terms = all_all_anc - all_covered_anc if only_direct else all_all_anc
+    # GO slim terms of every GO term are found once, not once per gene
+    id2slims = get_slimmapper(go_dag, goslim_dag).get_id2slims(assocs, only_direct)
+    for protein_product, slim_terms in id2slims.items():
         prt.write(
             "{PROD}\t{SLIMS}\n".format(
                 PROD=protein_product, SLIMS=";".join(sorted(slim_terms))
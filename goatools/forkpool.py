@@ -0,0 +1,64 @@
+"""Run tasks in a pool of forked processes which inherit large objects instead of pickling them.
+
+Objects used by the tasks (e.g., a GO DAG and its associations) are put in FORKED in the
+parent, just before the worker processes are forked. Worker functions read them from FORKED.
+Tasks run in this process if fork is not available on this platform (e.g., Windows).
+"""
+
+__copyright__ = "Copyright (C) 2010-present, DV Klopfenstein, H Tang, All rights reserved."
+__author__ = "DV Klopfenstein"
+
+import collections as cx
+import multiprocessing
+
+# Objects shared with worker processes, which inherit them through fork
+FORKED = {}
+
+
+def get_fork_context(workers):
+    """Get the 'fork' multiprocessing context or None if tasks should run in this process.
+
+    None if fewer than 2 workers, this is a worker process (which can not have children),
+    or fork is not available on this platform.
+    """
+    if workers < 2 or multiprocessing.current_process().daemon:
+        return None
+    try:
+        return multiprocessing.get_context('fork')
+    except ValueError:
+        return None
+
+
+def iter_forked(fnc, tasks, workers, shared=None, initializer=None):
+    """Yield fnc(task) for each task, in the order of the tasks.
+
+    fnc: A module-level function which reads the shared objects from FORKED
+    tasks: Tasks are sent to workers a few at a time, so tasks may be a long generator
+    shared: dict of objects put in FORKED while the tasks run
+    initializer: Run by each worker process when it starts
+    """
+    if hasattr(tasks, '__len__'):
+        workers = min(workers, len(tasks))
+    ctx = get_fork_context(workers)
+    # Restored when done; a task running in a worker may itself run tasks (serially)
+    forked_prev = dict(FORKED)
+    FORKED.update(shared or {})
+    try:
+        if ctx is None:
+            for task in tasks:
+                yield fnc(task)
+        else:
+            with ctx.Pool(workers, initializer=initializer) as pool:
+                pending = cx.deque()
+                for task in tasks:
+                    pending.append(pool.apply_async(fnc, (task,)))
+                    if len(pending) > 2*workers:
+                        yield pending.popleft().get()
+                while pending:
+                    yield pending.popleft().get()
+    finally:
+        FORKED.clear()
+        FORKED.update(forked_prev)
+
+
+# Copyright (C) 2010-present, DV Klopfenstein, H Tang, All rights reserved.
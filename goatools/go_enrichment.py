@@ -15,14 +15,19 @@ __author__ = "various"
 import sys
 import collections as cx
 
+import numpy as np
+
 import goatools.wr_tbl as RPT
 
-from .anno.update_association import remove_assc_goids, update_association
+from .anno.assc_matrix import AsscMatrix, AsscView
+from .anno.update_association import remove_assc_goids, get_assc_propagated_view
 from .base import logger
 from .godag.prtfncs import GoeaPrintFunctions
 from .multiple_testing import Bonferroni, FDR, HolmBonferroni, Methods, Sidak, calc_qval
+from .multiple_testing import get_tarone_testable
+from .multiple_testing_np import get_corrected_pvals
 from .pvalcalc import FisherFactory
-from .ratio import get_terms, count_terms, is_ratio_different
+from .ratio import chk_gene2go, get_goitems, is_ratio_different
 from .rpt.goea_nt_xfrm import MgrNtGOEAs
 from .rpt.prtfmt import PrtFmt
 
@@ -287,6 +292,180 @@ class GOEnrichmentRecord(object):
         raise Exception("\n".join(msg))
 
 
+class GoeaResultRow(GOEnrichmentRecord):
+    """Record-like view of one GO term in GoeaResults; values are read from its columns."""
+
+    # pylint: disable=super-init-not-called
+    def __init__(self, results, idx):
+        self._results = results
+        self._idx = idx
+
+    def __getattr__(self, fld):
+        # Only called for fields not set on the row (e.g., by update_remaining_fldsdefprt)
+        if fld.startswith("_"):
+            raise AttributeError(fld)
+        return self._results.get_value(self._idx, fld)
+
+    def __repr__(self):
+        return "GoeaResultRow({GO})".format(GO=self.GO)
+
+    def get_prtflds_all(self):
+        """When converting to a namedtuple, get all possible fields in their original order."""
+        flds = []
+        dont_add = {"_parents", "method_flds", "relationship_rev", "relationship"}
+        self._flds_append(flds, self.get_prtflds_default(), dont_add)
+        self._flds_append(flds, GoeaResults.flds_extra, dont_add)
+        self._flds_append(flds, vars(self.goterm).keys(), dont_add)
+        return flds
+
+
+class GoeaResults(object):
+    """GOEA results of one study stored as columns (NumPy arrays), not one object per GO term.
+
+    Counts and p-values (uncorrected and corrected) are arrays. Study and population items
+    are looked up by GO ID in go2studyitems and go2popitems, which are shared, not copied.
+    Iterating gives record-like rows (GoeaResultRow), which may be used wherever
+    GOEnrichmentRecords are, e.g., wr_tsv, wr_xlsx and MgrNtGOEAs.
+    get_records() makes GOEnrichmentRecords when they are needed.
+    """
+
+    # Fields of a GOEnrichmentRecord that are not printed by default
+    flds_extra = ["pop_items", "study_n", "pop_count", "pop_n", "goterm"]
+
+    _fld2fnc = {
+        "GO": lambda o, i: o.goids[i],
+        "NS": lambda o, i: o.get_nspc(i),
+        "name": lambda o, i: o.go2obj[o.goids[i]].name if o.goids[i] in o.go2obj else "n.a",
+        "depth": lambda o, i: o.go2obj[o.goids[i]].depth if o.goids[i] in o.go2obj else "n.a",
+        "goterm": lambda o, i: o.go2obj.get(o.goids[i]),
+        "enrichment": lambda o, i: "e" if o.enriched[i] else "p",
+        "p_uncorrected": lambda o, i: float(o.p_uncorrected[i]),
+        "study_count": lambda o, i: int(o.study_counts[i]),
+        "pop_count": lambda o, i: int(o.pop_counts[i]),
+        "study_n": lambda o, i: o.study_n,
+        "pop_n": lambda o, i: o.pop_n,
+        "ratio_in_study": lambda o, i: (int(o.study_counts[i]), o.study_n),
+        "ratio_in_pop": lambda o, i: (int(o.pop_counts[i]), o.pop_n),
+        "study_items": lambda o, i: o.go2studyitems.get(o.goids[i], set()),
+        "pop_items": lambda o, i: o.go2popitems.get(o.goids[i], set()),
+        "method_flds": lambda o, i: o.method_flds,
+    }
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, goids, study_counts, pop_counts, pvals, study_n, pop_n,
+                 go2studyitems, go2popitems, go2obj):
+        self.goids = list(goids)
+        self.study_counts = np.asarray(study_counts, dtype=np.int64)
+        self.pop_counts = np.asarray(pop_counts, dtype=np.int64)
+        self.p_uncorrected = np.asarray(pvals, dtype=float)
+        self.study_n = study_n
+        self.pop_n = pop_n
+        self.go2studyitems = go2studyitems
+        self.go2popitems = go2popitems
+        self.go2obj = go2obj
+        # Corrected p-values: One array per multiple-test method field name
+        self.method_flds = []
+        self.fld2pvals = {}
+        # Enriched ('e') if the study ratio is larger than the population ratio, else 'p'
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.enriched = (self.study_counts/study_n > self.pop_counts/pop_n) if study_n else \
+                np.zeros(len(self.goids), dtype=bool)
+
+    def __len__(self):
+        return len(self.goids)
+
+    def __iter__(self):
+        for idx in range(len(self.goids)):
+            yield GoeaResultRow(self, idx)
+
+    def __getitem__(self, idx):
+        if idx < 0:
+            idx += len(self.goids)
+        if not 0 <= idx < len(self.goids):
+            raise IndexError(idx)
+        return GoeaResultRow(self, idx)
+
+    def __repr__(self):
+        return "GoeaResults({N} GO IDs)".format(N=len(self.goids))
+
+    def get_value(self, idx, fld):
+        """Get the value of one field of one GO term, as in a GOEnrichmentRecord"""
+        fnc = self._fld2fnc.get(fld)
+        if fnc is not None:
+            return fnc(self, idx)
+        if fld[:2] == "p_" and fld[2:] in self.fld2pvals:
+            return float(self.fld2pvals[fld[2:]][idx])
+        goterm = self.go2obj.get(self.goids[idx])
+        if goterm is not None and hasattr(goterm, fld):
+            return getattr(goterm, fld)
+        raise AttributeError("GOEA RESULTS HAVE NO FIELD({F})".format(F=fld))
+
+    def get_nspc(self, idx):
+        """Get the namespace (BP, MF, CC) of one GO term"""
+        goterm = self.go2obj.get(self.goids[idx])
+        if goterm is None:
+            return "XX"
+        return GOEnrichmentRecord.namespace2NS.get(goterm.namespace, goterm.namespace)
+
+    def get_pvals(self, fieldname=None):
+        """Get the corrected p-values of a method field name (default: uncorrected p-values)"""
+        return self.p_uncorrected if fieldname is None else self.fld2pvals[fieldname]
+
+    def set_corrected_pvals(self, nt_method, pvals):
+        """Add the corrected p-values of a multiple-test method"""
+        self.method_flds.append(nt_method)
+        self.fld2pvals[nt_method.fieldname] = np.asarray(pvals, dtype=float)
+
+    def get_study_items(self, idxs=None):
+        """Get the study items (e.g., geneids) of some (default all) GO terms"""
+        go2studyitems = self.go2studyitems
+        goids = self.goids if idxs is None else [self.goids[i] for i in idxs]
+        return set().union(*(go2studyitems.get(go, ()) for go in goids))
+
+    def keep_if(self, keep_if):
+        """Keep only GO terms whose rows pass the keep_if function"""
+        self._take(np.array([i for i, row in enumerate(self) if keep_if(row)], dtype=np.int64))
+
+    def sort(self):
+        """Sort as GOEnrichmentRecords are: by enrichment, namespace and uncorrected p-value"""
+        nspcs = np.array([self.get_nspc(i) for i in range(len(self.goids))], dtype=str)
+        self._take(np.lexsort((self.p_uncorrected, nspcs, ~self.enriched)))
+
+    def get_records(self):
+        """Get one GOEnrichmentRecord for each GO term"""
+        records = []
+        study_n = self.study_n
+        pop_n = self.pop_n
+        go2studyitems = self.go2studyitems
+        go2popitems = self.go2popitems
+        fld2pvals = {f: a.tolist() for f, a in self.fld2pvals.items()}
+        itr = zip(self.goids, self.study_counts.tolist(), self.pop_counts.tolist(),
+                  self.p_uncorrected.tolist())
+        for idx, (goid, study_count, pop_count, pval) in enumerate(itr):
+            rec = GOEnrichmentRecord(
+                goid,
+                p_uncorrected=pval,
+                study_items=go2studyitems.get(goid, set()),
+                pop_items=go2popitems.get(goid, set()),
+                ratio_in_study=(study_count, study_n),
+                ratio_in_pop=(pop_count, pop_n),
+            )
+            for nt_method in self.method_flds:
+                rec.set_corrected_pval(nt_method, fld2pvals[nt_method.fieldname][idx])
+            rec.set_goterm(self.go2obj)
+            records.append(rec)
+        return records
+
+    def _take(self, idxs):
+        """Keep these rows, in this order"""
+        self.goids = [self.goids[i] for i in idxs.tolist()]
+        self.study_counts = self.study_counts[idxs]
+        self.pop_counts = self.pop_counts[idxs]
+        self.p_uncorrected = self.p_uncorrected[idxs]
+        self.enriched = self.enriched[idxs]
+        self.fld2pvals = {f: a[idxs] for f, a in self.fld2pvals.items()}
+
+
 class GOEnrichmentStudy(object):
     """Runs Fisher's exact test, as well as multiple corrections"""
 
@@ -313,25 +492,39 @@ class GOEnrichmentStudy(object):
         self._run_multitest = {
             "local": self._run_multitest_local,
             "statsmodels": self._run_multitest_statsmodels,
+            "numpy": self._run_multitest_numpy,
         }
         self.pop = set(pop)
         self.pop_n = len(pop)
-        self.assoc = assoc
         self.obo_dag = obo_dag
         self.alpha = alpha
         if methods is None:
             methods = ["bonferroni", "sidak", "holm"]
         self.methods = Methods(methods)
         self.pval_obj = FisherFactory(**kws).pval_obj
+        # Tarone: Do not test GO terms which can never be significant at alpha
+        self.prune_untestable = kws.get("prune_untestable", False)
+        # Resampling used by the 'fdr' method: number of samples, random seed, processes
+        self.kws_fdr = {
+            "T": kws.get("fdr_nsamples", 500),
+            "seed": kws.get("fdr_seed"),
+            "workers": kws.get("fdr_workers", 1),
+        }
 
+        # The caller's association is not changed. A read-only propagated association is
+        # shared by all GOEAs on the same association, GO DAG and relationships
         if propagate_counts:
-            update_association(
+            assoc = get_assc_propagated_view(
                 assoc, obo_dag, kws.get("relationships"), prt=self.log
             )
+        self.assoc = assoc
         # BROAD broad_goids = get_goids_to_remove(kws.get('remove_goids'))
         # BROAD if broad_goids:
         # BROAD     assoc = self._remove_assc_goids(assoc, broad_goids)
-        self.go2popitems = get_terms("population", pop, assoc, obo_dag, self.log)
+        chk_gene2go(assoc)
+        # Gene-by-GO incidence matrix of the population; Study items are rows of it
+        self.assc_mtx = None
+        self.go2popitems = get_goitems("population", pop, self.get_assc_matrix(), self.log)
 
     def _remove_assc_goids(self, assoc, broad_goids):
         """Remove broad GO IDs"""
@@ -344,7 +537,10 @@ class GOEnrichmentStudy(object):
         return ret["assoc_reduced"]
 
     def run_study(self, study, **kws):
-        """Run Gene Ontology Enrichment Study (GOEA) on study ids."""
+        """Run Gene Ontology Enrichment Study (GOEA) on study ids.
+
+        Returns a list of GOEnrichmentRecords or, if columnar=True, GoeaResults.
+        """
         study_name = kws.get("name", "current")
         log = self._get_log_or_prt(kws)
         if log:
@@ -353,16 +549,80 @@ class GOEnrichmentStudy(object):
                     OBJNAME=self.name, N=len(study), STU=study_name
                 )
             )
-        if len(study) == 0:
-            return []
+        results = None
+        if len(study) != 0:
+            # Calculate uncorrected pvalues
+            results = self._get_pval_uncorr(study, log, kws)
+        if results:
+            results = self._run_study_corr(results, study, log, kws)
+        return self._get_results_fmt(results, kws)
+
+    def run_studies(self, studies, **kws):
+        """Run GOEAs on many study sets (e.g., one per cluster) against this population.
+
+        studies: dict of study names to study items (e.g., geneids)
+
+        The population's gene-by-GO incidence matrix is built once. The study GO
+        counts of all studies are calculated with one sparse matrix product.
+        Results are yielded lazily as (study name, list of GOEnrichmentRecord)
+        in the order of the study names. Keyword arguments are the same as run_study;
+        use columnar=True to get GoeaResults, which take much less memory for many studies.
+        """
+        log = self._get_log_or_prt(kws)
+        names = list(studies)
+        studies_in_pop = [self.pop.intersection(studies[name]) for name in names]
+        assc_mtx = self.get_assc_matrix()
+        study_counts_all = assc_mtx.get_counts_multi(studies_in_pop)
+        pop_counts = np.asarray(assc_mtx.csr.sum(axis=0)).ravel()
+        cols = np.arange(len(assc_mtx.goids))
+        selected_goids = kws.get("selected_goids")
+        if selected_goids is not None:
+            cols = np.array(
+                [i for i, go in enumerate(assc_mtx.goids) if go in selected_goids],
+                dtype=np.int64,
+            )
+        goids = [assc_mtx.goids[i] for i in cols]
+        pop_counts = pop_counts[cols]
+        for idx, name in enumerate(names):
+            study = studies[name]
+            study_in_pop = studies_in_pop[idx]
+            if log:
+                log.write(
+                    "\nRuning {OBJNAME} Ontology Analysis: {STU} study set of {N} IDs.\n".format(
+                        OBJNAME=self.name, N=len(study), STU=name
+                    )
+                )
+                self._prt_log_items_found(log, study, study_in_pop, goids)
+            if len(study) == 0 or not study_in_pop:
+                yield name, self._get_results_fmt(None, kws)
+                continue
+            study_counts = study_counts_all[idx].toarray().ravel()[cols]
+            results = self._get_results(
+                goids,
+                assc_mtx.get_goitems(study_in_pop),
+                (study_counts, pop_counts),
+                len(study_in_pop),
+                log,
+                kws,
+            )
+            if results:
+                results = self._run_study_corr(results, study, log, kws)
+            yield name, self._get_results_fmt(results, kws)
+
+    def get_assc_matrix(self):
+        """Get the population's gene-by-GO incidence matrix. Built once, when first needed."""
+        if self.assc_mtx is None:
+            if isinstance(self.assoc, AsscView):
+                self.assc_mtx = self.assoc.assc_mtx.get_subset(self.pop)
+            else:
+                self.assc_mtx = AsscMatrix(self.assoc, self.obo_dag, self.pop)
+        return self.assc_mtx
+
+    def _run_study_corr(self, results, study, log, kws):
+        """Run multiple-test corrections on uncorrected GOEA results. Sort results."""
         # Key-word arguments:
         methods = Methods(kws["methods"]) if "methods" in kws else self.methods
         alpha = kws["alpha"] if "alpha" in kws else self.alpha
-        # Calculate uncorrected pvalues
-        results = self.get_pval_uncorr(study, log, kws.get("selected_goids"))
-        if not results:
-            return []
-
         if log is not None:
             log.write(
                 "  {MSG}\n".format(
@@ -373,20 +633,24 @@ class GOEnrichmentStudy(object):
         # Do multipletest corrections on uncorrected pvalues and update results
         self._run_multitest_corr(results, methods, alpha, study, log)
 
-        for rec in results:
-            # get go term for name and level
-            rec.set_goterm(self.obo_dag)
-
         # 'keep_if' can be used to keep only significant GO terms. Example:
         #     >>> keep_if = lambda nt: nt.p_fdr_bh < 0.05 # if results are significant
         #     >>> goea_results = goeaobj.run_study(geneids_study, keep_if=keep_if)
         if "keep_if" in kws:
-            keep_if = kws["keep_if"]
-            results = [r for r in results if keep_if(r)]
+            results.keep_if(kws["keep_if"])
+
+        # Default sort order: enrichment, NS, p_uncorrected
+        results.sort()
+        return results  # GoeaResults
 
-        # Default sort order:
-        results.sort(key=lambda r: [r.enrichment, r.NS, r.p_uncorrected])
-        return results  # list of GOEnrichmentRecord objects
+    def _get_results_fmt(self, results, kws):
+        """Return GoeaResults if columnar=True. Otherwise a list of GOEnrichmentRecords"""
+        if kws.get("columnar"):
+            if results is None:
+                results = GoeaResults(
+                    [], [], [], [], 0, self.pop_n, {}, self.go2popitems, self.obo_dag)
+            return results
+        return results.get_records() if results else []
 
     def _get_log_or_prt(self, kws):
         """Allow either keyword, 'log', or 'prt' to be used to suppress or redirect printing"""
@@ -417,10 +681,15 @@ class GOEnrichmentStudy(object):
 
     def get_pval_uncorr(self, study, log=sys.stdout, selected_goids=None):
         """Calculate the uncorrected pvalues for study items."""
-        results = []
+        results = self._get_pval_uncorr(study, log, {"selected_goids": selected_goids})
+        return results.get_records() if results is not None else []
+
+    def _get_pval_uncorr(self, study, log, kws):
+        """Calculate the uncorrected pvalues for study items. Return GoeaResults or None"""
+        selected_goids = kws.get("selected_goids")
         study_in_pop = self.pop.intersection(study)
         # " 99%    378 of    382 study items found in population"
-        go2studyitems = get_terms("study", study_in_pop, self.assoc, self.obo_dag, log)
+        go2studyitems = get_goitems("study", study_in_pop, self.get_assc_matrix(), log)
         pop_n, study_n = self.pop_n, len(study_in_pop)
         allterms = set(go2studyitems).union(set(self.go2popitems))
         if selected_goids is not None:
@@ -429,27 +698,45 @@ class GOEnrichmentStudy(object):
             self._prt_log_items_found(log, study, study_in_pop, allterms)
         # If no study genes were found in the population, return empty GOEA results
         if not study_in_pop:
-            return []
-        calc_pvalue = self.pval_obj.calc_pvalue
-
-        for goid in allterms:
-            study_items = go2studyitems.get(goid, set())
-            study_count = len(study_items)
-            pop_items = self.go2popitems.get(goid, set())
-            pop_count = len(pop_items)
-
-            one_record = GOEnrichmentRecord(
-                goid,
-                p_uncorrected=calc_pvalue(study_count, study_n, pop_count, pop_n),
-                study_items=study_items,
-                pop_items=pop_items,
-                ratio_in_study=(study_count, study_n),
-                ratio_in_pop=(pop_count, pop_n),
+            return None
+        goids = list(allterms)
+        study_counts = go2studyitems.get_counts(goids)
+        pop_counts = self.go2popitems.get_counts(goids)
+        return self._get_results(
+            goids, go2studyitems, (study_counts, pop_counts), study_n, log, kws)
+
+    # pylint: disable=too-many-arguments
+    def _get_results(self, goids, go2studyitems, counts, study_n, log, kws):
+        """Calculate uncorrected p-values. Return GoeaResults with one row per GO ID."""
+        study_counts, pop_counts = counts
+        if kws.get("prune_untestable", self.prune_untestable):
+            goids, study_counts, pop_counts = self._prune_untestable(
+                goids, study_counts, pop_counts, study_n, log, kws)
+        # Calculate all uncorrected p-values at once; vectorized if pvalcalc supports it
+        pvals = self.pval_obj.calc_pvalues(study_counts, study_n, pop_counts, self.pop_n)
+        return GoeaResults(goids, study_counts, pop_counts, pvals, study_n, self.pop_n,
+                           go2studyitems, self.go2popitems, self.obo_dag)
+
+    def _prune_untestable(self, goids, study_counts, pop_counts, study_n, log, kws):
+        """Remove GO terms which can not be significant for any study count (Tarone).
+
+        The smallest p-value a GO term can reach depends only on the study size and its
+        population count. Multiple-test corrections count only the GO terms kept.
+        """
+        alpha = kws["alpha"] if "alpha" in kws else self.alpha
+        pop_counts = np.asarray(pop_counts, dtype=np.int64)
+        min_pvals = self.pval_obj.calc_min_pvalues(study_n, pop_counts, self.pop_n)
+        tarone_k, testable = get_tarone_testable(min_pvals, alpha)
+        if log is not None:
+            log.write(
+                "{N:,} of {M:,} GO terms pruned: p < {A}/{K} (alpha/Tarone k) "
+                "is not possible\n".format(
+                    N=int(testable.size - testable.sum()), M=testable.size, A=alpha, K=tarone_k
+                )
             )
-
-            results.append(one_record)
-
-        return results
+        idxs = np.flatnonzero(testable)
+        return ([goids[i] for i in idxs.tolist()],
+                np.asarray(study_counts, dtype=np.int64)[idxs], pop_counts[idxs])
 
     def _prt_log_items_found(self, log, study, study_in_pop, allterms):
         """2 GO terms found significant (< 0.05=alpha) (  2 enriched +   0 purified): local bonferroni"""
@@ -472,7 +759,7 @@ class GOEnrichmentStudy(object):
     def _run_multitest_corr(self, results, usrmethod_flds, alpha, study, log):
         """Do multiple-test corrections on uncorrected pvalues."""
         assert 0 < alpha < 1, "Test-wise alpha must fall between (0, 1)"
-        pvals = [r.p_uncorrected for r in results]
+        pvals = results.p_uncorrected
         ntobj = cx.namedtuple("ntobj", "results pvals alpha nt_method study")
         for nt_method in usrmethod_flds:
             ntmt = ntobj(results, pvals, alpha, nt_method, study)
@@ -483,26 +770,26 @@ class GOEnrichmentStudy(object):
     def _log_multitest_corr(self, log, results, ntmt, alpha):
         """Print information regarding multitest correction results."""
         ntm = ntmt.nt_method
-        attr_mult = "p_{M}".format(M=self.methods.get_fieldname(ntm.source, ntm.method))
-        eps = [r for r in results if getattr(r, attr_mult) < alpha]
-        sig_cnt = len(eps)
-        ctr = cx.Counter([r.enrichment for r in eps])
+        fieldname = self.methods.get_fieldname(ntm.source, ntm.method)
+        sig = results.get_pvals(fieldname) < alpha
+        sig_e = np.flatnonzero(sig & results.enriched)
+        sig_p = np.flatnonzero(sig & ~results.enriched)
         log.write("  METHOD {M}:\n".format(M=ntm.method))
         log.write(
             "{N:8,} GO terms found significant (< {A}=alpha) ".format(
-                N=sig_cnt, A=alpha
+                N=sig_e.size + sig_p.size, A=alpha
             )
         )
-        log.write("({E:3} enriched + {P:3} purified): ".format(E=ctr["e"], P=ctr["p"]))
+        log.write("({E:3} enriched + {P:3} purified): ".format(E=sig_e.size, P=sig_p.size))
         log.write("{MSRC} {METHOD}\n".format(MSRC=ntm.source, METHOD=ntm.method))
         log.write(
             "{N:8,} study items associated with significant GO IDs (enriched)\n".format(
-                N=len(self.get_study_items(r for r in eps if r.enrichment == "e"))
+                N=len(results.get_study_items(sig_e.tolist()))
             )
         )
         log.write(
             "{N:8,} study items associated with significant GO IDs (purified)\n".format(
-                N=len(self.get_study_items(r for r in eps if r.enrichment == "p"))
+                N=len(results.get_study_items(sig_p.tolist()))
             )
         )
 
@@ -524,6 +811,10 @@ class GOEnrichmentStudy(object):
         ]  # reject_lst, pvals_corrected, alphacSidak, alphacBonf
         self._update_pvalcorr(ntmt, pvals_corrected)
 
+    def _run_multitest_numpy(self, ntmt):
+        """Use multitest methods vectorized with NumPy; Same p-values as statsmodels."""
+        self._update_pvalcorr(ntmt, get_corrected_pvals(ntmt.pvals, ntmt.nt_method.method))
+
     def _run_multitest_local(self, ntmt):
         """Use multitest mthods that have been implemented locally."""
         corrected_pvals = None
@@ -536,16 +827,15 @@ class GOEnrichmentStudy(object):
             corrected_pvals = HolmBonferroni(ntmt.pvals, ntmt.alpha).corrected_pvals
         elif method == "fdr":
             # get the empirical p-value distributions for FDR
-            term_pop = getattr(self, "term_pop", None)
-            if term_pop is None:
-                term_pop = count_terms(self.pop, self.assoc, self.obo_dag)
             p_val_distribution = calc_qval(
                 len(ntmt.study),
                 self.pop_n,
                 self.pop,
                 self.assoc,
-                term_pop,
+                getattr(self, "term_pop", None),
                 self.obo_dag,
+                assc_mtx=self.get_assc_matrix(),
+                **self.kws_fdr
             )
             corrected_pvals = FDR(
                 p_val_distribution, ntmt.results, ntmt.alpha
@@ -558,8 +848,7 @@ class GOEnrichmentStudy(object):
         """Add data members to store multiple test corrections."""
         if corrected_pvals is None:
             return
-        for rec, val in zip(ntmt.results, corrected_pvals):
-            rec.set_corrected_pval(ntmt.nt_method, val)
+        ntmt.results.set_corrected_pvals(ntmt.nt_method, corrected_pvals)
 
     def print_results(self, results, min_ratio=None, indent=False, pval=0.05, prt=sys.stdout):
         """Print GOEA results with some additional statistics calculated."""
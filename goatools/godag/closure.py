@@ -0,0 +1,131 @@
+"""Transitive closure of a GO DAG: all ancestors and descendants of every GO term."""
+
+__copyright__ = "Copyright (C) 2010-present, DV Klopfenstein, H Tang, All rights reserved."
+__author__ = "DV Klopfenstein"
+
+import os
+
+import numpy as np
+from scipy import sparse
+
+
+def get_closure(go2obj, relationships=None):
+    """Get the closure index cached on a GODag. Return None if go2obj is not a GODag."""
+    # A subset dict of GOTerms (e.g., from GoSubDag) does not hold all ancestors
+    fnc = getattr(go2obj, "get_closure", None)
+    return fnc(relationships) if fnc is not None else None
+
+
+class ClosureIndex:
+    """All ancestors of every GO term for one set of relationships, as a sparse matrix.
+
+    Row i of the ancestor matrix holds the indices of all ancestors of GO i in a
+    CompactGODag. The descendant matrix is its transpose. Sets of ancestors or
+    descendants are created once per GO ID and returned as frozensets.
+    """
+
+    def __init__(self, objcmp, relationships=None, anc=None):
+        # objcmp: CompactGODag
+        self.objcmp = objcmp
+        # pylint: disable=protected-access
+        self.relationships = objcmp._get_rels(relationships)
+        self.anc = self._init_anc(objcmp.get_matrix(relationships)) if anc is None else anc
+        self.desc = self.anc.T.tocsr()
+        self.desc.sort_indices()
+        self._idx2anc = {}
+        self._idx2desc = {}
+
+    def __contains__(self, goid):
+        return goid in self.objcmp.go2idx
+
+    def get_ancestors(self, goid):
+        """Get the GO IDs of all ancestors of a GO ID (main or alternate)."""
+        return self._get_goids(self.objcmp.go2idx[goid], self.anc, self._idx2anc)
+
+    def get_descendants(self, goid):
+        """Get the GO IDs of all descendants of a GO ID (main or alternate)."""
+        return self._get_goids(self.objcmp.go2idx[goid], self.desc, self._idx2desc)
+
+    def get_go2ancestors(self, goids=None, reachable=False):
+        """Get GO-to- ancestors for GO IDs, which may be alternate GO IDs. Omit empty sets.
+
+        reachable: Also include all ancestors of the GO IDs as keys, as go_tasks does.
+        """
+        return self._get_go2relatives(goids, reachable, self.anc, self._idx2anc)
+
+    def get_go2descendants(self, goids=None, reachable=False):
+        """Get GO-to- descendants for GO IDs, which may be alternate GO IDs. Omit empty sets.
+
+        reachable: Also include all descendants of the GO IDs as keys, as go_tasks does.
+        """
+        return self._get_go2relatives(goids, reachable, self.desc, self._idx2desc)
+
+    def save(self, fout_npz):
+        """Write the ancestor matrix to a NumPy .npz file."""
+        # Write to an open file so NumPy does not add an .npz extension
+        with open(fout_npz, "wb") as prt:
+            np.savez(
+                prt,
+                goids=np.array(self.objcmp.goids),
+                relationships=np.array(self.relationships, dtype=str),
+                indptr=self.anc.indptr,
+                indices=self.anc.indices,
+            )
+
+    @classmethod
+    def load(cls, fin_npz, objcmp, relationships=None):
+        """Read the ancestor matrix from a .npz file. Return None if it is for another DAG."""
+        if not os.path.exists(fin_npz):
+            return None
+        with np.load(fin_npz) as dat:
+            # pylint: disable=protected-access
+            if dat["goids"].tolist() != objcmp.goids or \
+                tuple(dat["relationships"].tolist()) != objcmp._get_rels(relationships):
+                return None
+            num = len(objcmp.goids)
+            anc = sparse.csr_matrix(
+                (np.ones(dat["indices"].size, dtype=bool), dat["indices"], dat["indptr"]),
+                shape=(num, num))
+        return cls(objcmp, relationships, anc)
+
+    def _get_go2relatives(self, goids, reachable, mtx, idx2goids):
+        """Get GO-to- ancestors or descendants for GO IDs."""
+        objcmp = self.objcmp
+        if goids is None:
+            goids = objcmp.goids
+        elif reachable:
+            idxs = objcmp.get_idxs(goids)
+            goids = [objcmp.goids[i] for i in np.union1d(idxs, mtx[idxs].indices)]
+        go2idx = objcmp.go2idx
+        go2relatives = {}
+        for goid in goids:
+            relatives = self._get_goids(go2idx[goid], mtx, idx2goids)
+            if relatives:
+                go2relatives[goid] = set(relatives)
+        return go2relatives
+
+    def _get_goids(self, idx, mtx, idx2goids):
+        """Get the GO IDs in one row of the ancestor or descendant matrix."""
+        goids = idx2goids.get(idx)
+        if goids is None:
+            goids_all = self.objcmp.goids
+            goids = frozenset(goids_all[i] for i in mtx.indices[mtx.indptr[idx]:mtx.indptr[idx + 1]])
+            idx2goids[idx] = goids
+        return goids
+
+    @staticmethod
+    def _init_anc(parents):
+        """Get all ancestors by squaring the matrix of reachable GO terms until it is unchanged."""
+        reach = sparse.csr_matrix(parents, dtype=np.int32)
+        while True:
+            reach_nxt = (reach + reach.dot(reach)).tocsr()
+            reach_nxt.data[:] = 1
+            if reach_nxt.nnz == reach.nnz:
+                break
+            reach = reach_nxt
+        anc = sparse.csr_matrix(reach, dtype=bool)
+        anc.sort_indices()
+        return anc
+
+
+# Copyright (C) 2010-present, DV Klopfenstein, H Tang, All rights reserved.
@@ -0,0 +1,257 @@
+"""Compact GO DAG: GO IDs are dense ints; edges are stored as sparse (CSR) matrices."""
+
+__copyright__ = "Copyright (C) 2010-present, DV Klopfenstein, H Tang, All rights reserved."
+__author__ = "DV Klopfenstein"
+
+import numpy as np
+from scipy import sparse
+
+from goatools.godag.consts import RELATIONSHIP_SET
+
+
+class CompactGODag:
+    """Compact, integer-indexed view of a GO DAG.
+
+    Main GO IDs are numbered 0..N-1, sorted by depth, then by GO ID, so parents (is_a)
+    are numbered before their children. Alternate GO IDs map to the index of their main
+    GO ID. The edges of each relationship (is_a, part_of, ...) are stored as a boolean
+    CSR matrix where row i holds the parents of GO i. Namespace, level and depth are
+    NumPy arrays.
+
+    Ancestor and descendant queries take 'relationships' as in godag.go_tasks:
+    None or False (is_a only), True (is_a and all relationships) or a set.
+    As in go_tasks, True or RELATIONSHIP_SET follows all relationships in the DAG.
+    """
+
+    def __init__(self, godag):
+        # godag: A GODag or any dict of GO IDs to GOTerms with parents
+        recs = {rec.item_id: rec for rec in godag.values()}.values()
+        self._init_arrays(
+            [(r.item_id, r.namespace, r.is_obsolete, r.alt_ids, r.level, r.depth)
+             for r in recs],
+            {r.item_id: {o.item_id for o in r.parents} for r in recs},
+            self._get_rel2go2parents(
+                (r.item_id, getattr(r, 'relationship', {})) for r in recs),
+        )
+
+    @classmethod
+    def from_obo(cls, obo_file, optional_attrs=None, load_obsolete=False):
+        """Read an obo file directly into a CompactGODag; GOTerm objects are not linked."""
+        from goatools.obo_parser import OBOReader
+        reader = OBOReader(obo_file, optional_attrs)
+        recs = [r for r in reader if load_obsolete or not r.is_obsolete]
+        obj = cls.__new__(cls)
+        # pylint: disable=protected-access
+        obj._init_arrays(
+            [(r.item_id, r.namespace, r.is_obsolete, r.alt_ids, None, None) for r in recs],
+            {r.item_id: set(r._parents) for r in recs},
+            cls._get_rel2go2parents((r.item_id, getattr(r, 'relationship', {})) for r in recs),
+        )
+        return obj
+
+    def __len__(self):
+        return len(self.goids)
+
+    def __contains__(self, goid):
+        return goid in self.go2idx
+
+    def get_idxs(self, goids):
+        """Get the integer indices of GO IDs. Alternate GO IDs map to their main GO ID."""
+        go2idx = self.go2idx
+        return np.array([go2idx[go] for go in goids], dtype=np.int64)
+
+    def get_goids(self, idxs):
+        """Get the main GO IDs of integer indices."""
+        goids = self.goids
+        return set(goids[i] for i in idxs)
+
+    def get_parents(self, goid, relationships=None):
+        """Get the GO IDs of the parents of a GO ID."""
+        return self.get_goids(self.get_matrix(relationships)[self.go2idx[goid]].indices)
+
+    def get_children(self, goid, relationships=None):
+        """Get the GO IDs of the children of a GO ID."""
+        return self.get_goids(
+            self.get_matrix(relationships, reverse=True)[self.go2idx[goid]].indices)
+
+    def get_ancestors(self, goid, relationships=None):
+        """Get the GO IDs of all ancestors of a GO ID."""
+        return self.get_goids(self._get_reachable(
+            self.get_idxs([goid]), self.get_matrix(relationships)))
+
+    def get_descendants(self, goid, relationships=None):
+        """Get the GO IDs of all descendants of a GO ID."""
+        return self.get_goids(self._get_reachable(
+            self.get_idxs([goid]), self.get_matrix(relationships, reverse=True)))
+
+    def get_go2ancestors(self, relationships=None):
+        """Get GO-to- ancestors (all parents); Same as godag.go_tasks.get_go2ancestors"""
+        return self._get_go2reachable(self.get_matrix(relationships))
+
+    def get_go2descendants(self, relationships=None):
+        """Get GO-to- descendants; Same as godag.go_tasks.get_go2descendants"""
+        return self._get_go2reachable(self.get_matrix(relationships, reverse=True))
+
+    def get_matrix(self, relationships=None, reverse=False):
+        """Get a CSR matrix of GO to parents (or children, if reverse) for is_a and relationships."""
+        rels = self._get_rels(relationships)
+        key = (rels, reverse)
+        if key not in self._matrices:
+            if reverse:
+                mtx = self.get_matrix(relationships).T.tocsr()
+            else:
+                mtx = self.rel2csr['is_a']
+                for rel in rels:
+                    if rel in self.rel2csr:
+                        mtx = mtx + self.rel2csr[rel]
+                mtx = sparse.csr_matrix(mtx, dtype=bool)
+            mtx.sort_indices()
+            self._matrices[key] = mtx
+        return self._matrices[key]
+
+    def get_topological_order(self, relationships=None):
+        """Get GO indices ordered so each GO comes after all of its parents."""
+        if not self._get_rels(relationships):
+            return np.arange(len(self.goids))
+        mtx = self.get_matrix(relationships)
+        children = self.get_matrix(relationships, reverse=True)
+        num_parents = np.diff(mtx.indptr)
+        order = []
+        frontier = np.flatnonzero(num_parents == 0)
+        while frontier.size:
+            order.append(frontier)
+            nxt = children[frontier].indices
+            np.subtract.at(num_parents, nxt, 1)
+            nxt = np.unique(nxt)
+            frontier = nxt[num_parents[nxt] == 0]
+        return np.concatenate(order) if order else np.zeros(0, dtype=np.int64)
+
+    def _get_rels(self, relationships):
+        """Get the relationships to follow, in addition to is_a, as a sorted tuple."""
+        if not relationships:
+            return ()
+        if relationships is True or relationships == RELATIONSHIP_SET:
+            return tuple(r for r in self.rel2csr if r != 'is_a')
+        return tuple(sorted(relationships))
+
+    def _get_reachable(self, idxs, mtx):
+        """Get the indices of all GO terms reachable from the given GO indices."""
+        seen = np.zeros(len(self.goids), dtype=bool)
+        frontier = idxs
+        while frontier.size:
+            nxt = np.unique(mtx[frontier].indices)
+            frontier = nxt[~seen[nxt]]
+            seen[frontier] = True
+        return np.flatnonzero(seen)
+
+    def _get_go2reachable(self, mtx):
+        """Get all GO IDs reachable from each GO ID, visiting each GO ID once."""
+        # Visit GO IDs in topological order of the matrix edges
+        num_edges = np.diff(mtx.indptr)
+        rev = mtx.T.tocsr()
+        indptr = mtx.indptr
+        indices = mtx.indices
+        idx2reach = {}
+        frontier = np.flatnonzero(num_edges == 0)
+        while frontier.size:
+            for idx in frontier.tolist():
+                reach = set()
+                for nxt in indices[indptr[idx]:indptr[idx + 1]].tolist():
+                    reach.add(nxt)
+                    reach |= idx2reach[nxt]
+                idx2reach[idx] = reach
+            nxt = rev[frontier].indices
+            np.subtract.at(num_edges, nxt, 1)
+            nxt = np.unique(nxt)
+            frontier = nxt[num_edges[nxt] == 0]
+        goids = self.goids
+        return {goids[i]: set(goids[j] for j in s) for i, s in idx2reach.items() if s}
+
+    def _init_arrays(self, nts, go2parents, rel2go2parents):
+        """Number the GO IDs and store edges, namespaces, levels and depths as arrays."""
+        # nts: (GO ID, namespace, is_obsolete, alt_ids, level, depth)
+        # Number GO IDs by depth so parents are numbered before their children
+        go2depth = self._get_go2depth(nts, go2parents)
+        nts = sorted(nts, key=lambda nt: (go2depth[nt[0]], nt[0]))
+        self.goids = [nt[0] for nt in nts]
+        self.go2idx = {go: i for i, go in enumerate(self.goids)}
+        for idx, ntd in enumerate(nts):
+            for alt in ntd[3]:
+                self.go2idx.setdefault(alt, idx)
+        self.namespaces = sorted(set(nt[1] for nt in nts))
+        ns2code = {ns: i for i, ns in enumerate(self.namespaces)}
+        self.namespace = np.array([ns2code[nt[1]] for nt in nts], dtype=np.int8)
+        self.is_obsolete = np.array([nt[2] for nt in nts], dtype=bool)
+        self.depth = np.array([go2depth[go] for go in self.goids], dtype=np.int32)
+        self.rel2csr = {'is_a': self._get_csr(go2parents)}
+        for rel, go2relparents in sorted(rel2go2parents.items()):
+            self.rel2csr[rel] = self._get_csr(go2relparents)
+        # Matrices of combined relationships, created as needed
+        self._matrices = {}
+        self.level = self._init_level(nts)
+
+    def _init_level(self, nts):
+        """Get the level (shortest is_a path to a top term) of each GO ID."""
+        if nts and nts[0][4] is not None:
+            return np.array([nt[4] for nt in nts], dtype=np.int32)
+        mtx = self.rel2csr['is_a']
+        level = np.zeros(len(self.goids), dtype=np.int32)
+        indptr = mtx.indptr
+        indices = mtx.indices
+        # Parents are numbered before children
+        for idx in range(len(self.goids)):
+            parents = indices[indptr[idx]:indptr[idx + 1]]
+            if parents.size:
+                level[idx] = level[parents].min() + 1
+        return level
+
+    def _get_csr(self, go2parents):
+        """Get a boolean CSR matrix of child GO indices (rows) to parent GO indices (columns)."""
+        go2idx = self.go2idx
+        rows = []
+        cols = []
+        for goid, parents in go2parents.items():
+            if goid in go2idx:
+                idx = go2idx[goid]
+                for parent in parents:
+                    if parent in go2idx:
+                        rows.append(idx)
+                        cols.append(go2idx[parent])
+        num = len(self.goids)
+        return sparse.csr_matrix(
+            (np.ones(len(rows), dtype=bool), (rows, cols)), shape=(num, num))
+
+    @staticmethod
+    def _get_go2depth(nts, go2parents):
+        """Get the depth (longest is_a path to a top term) of each GO ID."""
+        if nts and nts[0][5] is not None:
+            return {nt[0]: nt[5] for nt in nts}
+        go2depth = {}
+        for goid in go2parents:
+            if goid in go2depth:
+                continue
+            # Iterative depth-first search; a GO's depth is set after all of its parents
+            stack = [goid]
+            while stack:
+                cur = stack[-1]
+                parents = [p for p in go2parents[cur] if p in go2parents]
+                todo = [p for p in parents if p not in go2depth]
+                if todo:
+                    stack.extend(todo)
+                else:
+                    stack.pop()
+                    go2depth[cur] = max((go2depth[p] for p in parents), default=-1) + 1
+        return go2depth
+
+    @staticmethod
+    def _get_rel2go2parents(go_relationship):
+        """Get relationship-to-GO-to-parent GO IDs. Relationship targets may be GOTerms."""
+        rel2go2parents = {}
+        for goid, rel2parents in go_relationship:
+            for rel, parents in rel2parents.items():
+                rel2go2parents.setdefault(rel, {})[goid] = {
+                    p if isinstance(p, str) else p.item_id for p in parents}
+        return rel2go2parents
+
+
+# Copyright (C) 2010-present, DV Klopfenstein, H Tang, All rights reserved.
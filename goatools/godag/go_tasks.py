@@ -68,38 +68,36 @@ def get_go2children_isa(go2obj):
 
 def get_go2ancestors(terms, relationships, prt=None):
     """Get GO-to- ancestors (all parents)"""
+    if prt is not None:
+        prt_relationships(prt, "up", relationships)
     if not relationships:
-        if prt is not None:
-            prt.write("up: is_a\n")
         return get_id2parents(terms)
     if relationships == RELATIONSHIP_SET or relationships is True:
-        if prt is not None:
-            prt.write(
-                "up: is_a and {Rs}\n".format(Rs=" ".join(sorted(RELATIONSHIP_SET)))
-            )
         return get_id2upper(terms)
-    if prt is not None:
-        prt.write("up: is_a and {Rs}\n".format(Rs=" ".join(sorted(relationships))))
     return get_id2upperselect(terms, relationships)
 
 
 def get_go2descendants(terms, relationships, prt=None):
     """Get GO-to- descendants"""
+    if prt is not None:
+        prt_relationships(prt, "down", relationships)
     if not relationships:
-        if prt is not None:
-            prt.write("down: is_a\n")
         return get_id2children(terms)
     if relationships == RELATIONSHIP_SET or relationships is True:
-        if prt is not None:
-            prt.write(
-                "down: is_a and {Rs}\n".format(Rs=" ".join(sorted(RELATIONSHIP_SET)))
-            )
         return get_id2lower(terms)
-    if prt is not None:
-        prt.write("down: is_a and {Rs}\n".format(Rs=" ".join(sorted(relationships))))
     return get_id2lowerselect(terms, relationships)
 
 
+def prt_relationships(prt, direction, relationships):
+    """Print the relationships followed up or down the DAG"""
+    if not relationships:
+        prt.write("{DIR}: is_a\n".format(DIR=direction))
+        return
+    if relationships == RELATIONSHIP_SET or relationships is True:
+        relationships = RELATIONSHIP_SET
+    prt.write("{DIR}: is_a and {Rs}\n".format(DIR=direction, Rs=" ".join(sorted(relationships))))
+
+
 def get_go2depth(goobjs, relationships):
     """Get depth of each object"""
     if not relationships:
@@ -0,0 +1,89 @@
+"""Memoized traversals of a GO DAG: all ancestors, descendants or edges of a GO term."""
+
+__copyright__ = "Copyright (C) 2010-present, DV Klopfenstein, H Tang, All rights reserved."
+__author__ = "DV Klopfenstein"
+
+import collections as cx
+
+
+class TraversalMemo:
+    """Sets of all ancestors or descendants of GO terms, found once and reused.
+
+    Each GO term is visited once per traversal kind: the set for a GO term is the union
+    of the sets of its next GO terms (e.g., parents), so shared ancestors are not walked
+    again for each path. Sets are stored as frozensets.
+
+    maxsize: Store at most this many sets, dropping the least-recently used (None: no limit)
+    """
+
+    # Traversal kind: (Get the next GO terms, Get the item stored for an edge rec->nxt)
+    kind2fncs = {
+        "parents": (lambda rec: rec.parents, lambda rec, nxt: nxt.item_id),
+        "children": (lambda rec: rec.children, lambda rec, nxt: nxt.item_id),
+        "upper": (lambda rec: rec.get_goterms_upper(), lambda rec, nxt: nxt.item_id),
+        "lower": (lambda rec: rec.get_goterms_lower(), lambda rec, nxt: nxt.item_id),
+        "parent_edges": (lambda rec: rec.parents, lambda rec, nxt: (rec.item_id, nxt.item_id)),
+        "child_edges": (lambda rec: rec.children, lambda rec, nxt: (nxt.item_id, rec.item_id)),
+    }
+
+    def __init__(self, maxsize=None):
+        self.maxsize = maxsize
+        # (kind, GOTerm) -> frozenset of GO IDs or edges
+        self.key2items = cx.OrderedDict()
+
+    def __len__(self):
+        return len(self.key2items)
+
+    def clear(self):
+        """Clear all stored sets. Call this after the GO DAG's edges are changed."""
+        self.key2items.clear()
+
+    def get(self, rec, kind):
+        """Get the frozenset of all GO IDs (or edges) reached from a GO term."""
+        key = (kind, rec)
+        items = self.key2items.get(key)
+        if items is not None:
+            if self.maxsize is not None:
+                self.key2items.move_to_end(key)
+            return items
+        rec2items = self._get_rec2items(rec, kind)
+        for rec_cur, items_cur in rec2items.items():
+            self._add((kind, rec_cur), items_cur)
+        return rec2items[rec]
+
+    def _get_rec2items(self, rec_top, kind):
+        """Visit each GO term once, after all of its next GO terms (post-order)."""
+        get_nexts, get_item = self.kind2fncs[kind]
+        rec2items = {}
+        stack = [(rec_top, False)]
+        while stack:
+            rec, nexts_done = stack.pop()
+            if rec in rec2items:
+                continue
+            nexts = get_nexts(rec)
+            if nexts_done:
+                items = set(get_item(rec, nxt) for nxt in nexts)
+                for nxt in nexts:
+                    items.update(rec2items[nxt])
+                rec2items[rec] = frozenset(items)
+                continue
+            stack.append((rec, True))
+            for nxt in nexts:
+                if nxt not in rec2items:
+                    items = self.key2items.get((kind, nxt))
+                    if items is not None:
+                        rec2items[nxt] = items
+                    else:
+                        stack.append((nxt, False))
+        return rec2items
+
+    def _add(self, key, items):
+        """Store one set, dropping the least-recently used set if the memo is full."""
+        self.key2items[key] = items
+        if self.maxsize is not None:
+            self.key2items.move_to_end(key)
+            while len(self.key2items) > self.maxsize:
+                self.key2items.popitem(last=False)
+
+
+# Copyright (C) 2010-present, DV Klopfenstein, H Tang, All rights reserved.
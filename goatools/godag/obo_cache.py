@@ -0,0 +1,390 @@
+"""Binary cache (sidecar file) of a parsed obo file, read with mmap.
+
+The cache file is written next to the obo file. It is used only if the obo file
+path, modification time and size, optional_attrs, and load_obsolete all match.
+
+    MAGIC | header length (uint32) | JSON header | NumPy arrays
+
+GO term data members are stored by column, one column per data member:
+    int, bool:   NumPy arrays (e.g., level, depth, is_obsolete)
+    str:         Newline-separated UTF-8 string tables (e.g., item_id, name), or
+                 codes into a small string table (e.g., namespace)
+    set of str:  String tables with CSR indptr arrays (e.g., alt_ids, xref)
+    synonym:     One JSON list of [text, scope, typename, dbxrefs] lists per GO term
+    other:       One JSON list per column; sets and tuples are stored
+                 as {"__set__": [...]} and {"__tuple__": [...]}
+The is_a and relationship edges are stored as CSR (indptr, indices) arrays of GO term indices.
+The cache holds only data, so loading a cache file never runs code from the file.
+"""
+
+__copyright__ = "Copyright (C) 2010-present, DV Klopfenstein, H Tang, All rights reserved."
+__author__ = "DV Klopfenstein"
+
+import gc
+import os
+import json
+import mmap
+import hashlib
+import itertools
+import collections as cx
+
+import numpy as np
+
+from goatools.base import logger
+from goatools.godag.obo_optional_attributes import OboOptionalAttrs
+from goatools.godag.typedef import TypeDef
+
+
+class OboCache:
+    """Read and write a binary cache of a parsed obo file."""
+
+    version = 3
+    magic = b"GOATOOLS_OBO_CACHE"
+    # GOTerm data members which hold GOTerm objects; rebuilt from the edge arrays
+    refs = ("parents", "children", "relationship", "relationship_rev")
+    ntsynonym = cx.namedtuple("synonym", "text scope typename dbxrefs")
+    # A str column with at most this many different values is stored as uint8 codes
+    maxcodes = 256
+
+    def __init__(self, obo_file, optional_attrs=None, load_obsolete=False):
+        self.obo_file = os.path.abspath(obo_file)
+        self.key = self._init_key(optional_attrs, load_obsolete)
+        self.cache_file = self._init_cache_file()
+
+    def load(self, godag):
+        """Load a GODag from the cache. Return (version, data_version) or None if stale."""
+        if not os.path.exists(self.cache_file):
+            return None
+        # Many linked objects are created; garbage collection passes would find no garbage
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            with open(self.cache_file, "rb") as ifstrm:
+                # Unmapped when the arrays read from it are released
+                mmp = mmap.mmap(ifstrm.fileno(), 0, access=mmap.ACCESS_READ)
+            return self._rd_mmap(godag, mmp)
+        except (OSError, ValueError, KeyError, TypeError, IndexError) as err:
+            logger.warning("IGNORING OBO CACHE(%s): %s", self.cache_file, err)
+            return None
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+    def save(self, godag):
+        """Write a GODag to the cache file, if all of its GO term data can be stored."""
+        try:
+            arrays, hdr = self._get_arrays(godag)
+        except (KeyError, OverflowError, TypeError, ValueError) as err:
+            logger.warning("NOT WRITING OBO CACHE(%s): %s", self.cache_file, err)
+            return
+        self._wr_file(arrays, hdr)
+
+    def _get_arrays(self, godag):
+        """Get the arrays and header data which store a GODag."""
+        recs = list({rec.item_id: rec for rec in godag.values()}.values())
+        go2idx = {rec.item_id: idx for idx, rec in enumerate(recs)}
+        # Data members of each GO term, in the order they were set
+        layout2idx = {}
+        arrays = {"layout": np.array(
+            [layout2idx.setdefault(tuple(rec.__dict__), len(layout2idx)) for rec in recs],
+            dtype=np.int32)}
+        layouts = list(layout2idx)
+        columns = []
+        attr2vals = {}
+        for attr in dict.fromkeys(a for layout in layouts for a in layout):
+            if attr not in self.refs:
+                if all(attr in layout for layout in layouts):
+                    vals = [rec.__dict__[attr] for rec in recs]
+                else:
+                    vals = [rec.__dict__[attr] for rec in recs if attr in rec.__dict__]
+                columns.append([attr] + self._add_column(arrays, attr, vals, attr2vals))
+        self._add_csr(arrays, "is_a", [[go2idx[o.item_id] for o in rec.parents] for rec in recs])
+        rels = sorted(set(r for rec in recs for r in getattr(rec, "relationship", {})))
+        for rel in rels:
+            self._add_csr(arrays, "rel." + rel, [
+                [go2idx[o.item_id] for o in getattr(rec, "relationship", {}).get(rel, ())]
+                for rec in recs])
+        altkeys = [go for go in godag if go not in go2idx]
+        self._add_strs(arrays, "altkeys", altkeys)
+        arrays["altkeys.idx"] = np.array(
+            [go2idx[godag[go].item_id] for go in altkeys], dtype=np.int32)
+        hdr = {
+            "nterms": len(recs),
+            "layouts": layouts,
+            "columns": columns,
+            "relationships": rels,
+            "naltkeys": len(altkeys),
+            "typedefs": {k: self._encode(vars(o)) for k, o in godag.typedefs.items()},
+            "version": godag.version,
+            "data_version": godag.data_version,
+        }
+        return arrays, hdr
+
+    def _add_column(self, arrays, attr, vals, attr2vals):
+        """Add the values of one GO term data member. Return [kind, string table length]"""
+        name = "col." + attr
+        types = set(map(type, vals))
+        if types <= {bool}:
+            arrays[name] = np.array(vals, dtype=np.uint8)
+            return ["bool", 0]
+        if types == {int}:
+            arrays[name] = np.array(vals, dtype=np.int64)
+            return ["int", 0]
+        if types == {str}:
+            for attr_prev, vals_prev in attr2vals.items():
+                if vals_prev == vals:
+                    return ["copy", attr_prev]
+            attr2vals[attr] = vals
+            table = list(dict.fromkeys(vals))
+            if len(table) <= self.maxcodes:
+                str2code = {s: i for i, s in enumerate(table)}
+                arrays[name] = np.array([str2code[s] for s in vals], dtype=np.uint8)
+                self._add_strs(arrays, name + ".strs", table)
+                return ["codes", len(table)]
+            self._add_strs(arrays, name + ".strs", vals)
+            return ["str", len(vals)]
+        if types == {set} and all(type(s) is str for val in vals for s in val):
+            indptr = np.zeros(len(vals) + 1, dtype=np.int64)
+            np.cumsum([len(val) for val in vals], out=indptr[1:])
+            arrays[name + ".indptr"] = indptr
+            self._add_strs(arrays, name + ".strs", [s for val in vals for s in sorted(val)])
+            return ["strset", 0]
+        if attr == "synonym":
+            # Lists of synonym namedtuples: text scope typename dbxrefs
+            vals = [[[txt, scope, typename, sorted(dbxrefs)] for txt, scope, typename, dbxrefs in val]
+                    for val in vals]
+            arrays[name + ".json"] = self._get_bytes(json.dumps(vals, separators=(",", ":")))
+            return ["synonym", 0]
+        arrays[name + ".json"] = self._get_bytes(json.dumps(self._encode(vals), separators=(",", ":")))
+        return ["json", 0]
+
+    def _rd_mmap(self, godag, mmp):
+        """Load a GODag from a memory-mapped cache file."""
+        beg = len(self.magic)
+        if mmp[:beg] != self.magic:
+            return None
+        hdrlen = int(np.frombuffer(mmp, dtype=np.uint32, count=1, offset=beg)[0])
+        hdr = json.loads(mmp[beg + 4:beg + 4 + hdrlen].decode("utf-8"), object_hook=self._decode)
+        if hdr["key"] != self.key:
+            return None
+        arrays = {
+            nm: np.frombuffer(mmp, dtype=dtype, count=cnt, offset=offset)
+            for nm, (offset, dtype, cnt) in hdr["arrays"].items()}
+        recs = self._get_goterms(hdr, arrays)
+        # Plain dict inserts: GO terms are linked to the GODag's memo after loading
+        dict.update(godag, ((rec.item_id, rec) for rec in recs))
+        altkeys = self._get_strs(arrays["altkeys"], hdr["naltkeys"])
+        dict.update(godag, zip(altkeys, np.array(recs, dtype=object)[arrays["altkeys.idx"]]))
+        godag.typedefs = {}
+        for key, attrs in hdr["typedefs"].items():
+            typedef = TypeDef.__new__(TypeDef)
+            typedef.__dict__.update(attrs)
+            godag.typedefs[key] = typedef
+        return hdr["version"], hdr["data_version"]
+
+    def _get_goterms(self, hdr, arrays):
+        """Create GOTerms and link parents, children, and relationships."""
+        from goatools.obo_parser import GOTerm
+        num = hdr["nterms"]
+        layout = arrays["layout"]
+        attr2vals = {attr: itertools.repeat(None) for attr in self.refs}
+        for attr, kind, cnt in hdr["columns"]:
+            attr2vals[attr] = self._get_column(arrays, "col." + attr, kind, cnt, attr2vals)
+        recs = [GOTerm.__new__(GOTerm) for _ in range(num)]
+        layouts = hdr["layouts"]
+        for lidx, keys in enumerate(layouts):
+            if len(layouts) == 1:
+                recs_layout = recs
+                cols = [attr2vals[attr] for attr in keys]
+            else:
+                recs_layout, cols = self._get_layout_cols(recs, layouts, lidx, layout, attr2vals)
+            for rec, row in zip(recs_layout, zip(*cols)):
+                rec.__dict__.update(zip(keys, row))
+        recs_np = np.array(recs, dtype=object)
+        bounds, srcs, tgts = self._get_edges(arrays, "is_a", recs_np)
+        for rec, beg, end in zip(recs, bounds, bounds[1:]):
+            rec.parents = set(tgts[beg:end])
+            rec.children = set()
+        for src, tgt in zip(srcs, tgts):
+            tgt.children.add(src)
+        for rec in recs:
+            if "relationship" in rec.__dict__:
+                rec.relationship = {}
+                rec.relationship_rev = {}
+        for rel in hdr["relationships"]:
+            bounds, srcs, tgts = self._get_edges(arrays, "rel." + rel, recs_np)
+            for rec, beg, end in zip(recs, bounds, bounds[1:]):
+                if beg != end:
+                    rec.relationship[rel] = set(tgts[beg:end])
+            for src, tgt in zip(srcs, tgts):
+                tgt.relationship_rev.setdefault(rel, set()).add(src)
+        return recs
+
+    @staticmethod
+    def _get_layout_cols(recs, layouts, lidx, layout, attr2vals):
+        """Get the GO terms having one layout of data members and their values"""
+        idxs = np.flatnonzero(layout == lidx).tolist()
+        cols = []
+        for attr in layouts[lidx]:
+            vals = attr2vals[attr]
+            if not isinstance(vals, list):
+                cols.append(vals)
+                continue
+            # Values are stored for the GO terms which have the data member
+            lidxs_attr = [i for i, keys in enumerate(layouts) if attr in keys]
+            rank = np.cumsum(np.isin(layout, lidxs_attr)) - 1
+            cols.append([vals[i] for i in rank[idxs].tolist()])
+        return [recs[i] for i in idxs], cols
+
+    def _get_column(self, arrays, name, kind, cnt, attr2vals):
+        """Get the values of one GO term data member."""
+        if kind == "bool":
+            return arrays[name].astype(bool).tolist()
+        if kind == "int":
+            return arrays[name].tolist()
+        if kind == "copy":
+            return attr2vals[cnt]
+        if kind == "codes":
+            table = np.array(self._get_strs(arrays[name + ".strs"], cnt), dtype=object)
+            return table[arrays[name]].tolist()
+        if kind == "str":
+            return self._get_strs(arrays[name + ".strs"], cnt)
+        if kind == "strset":
+            indptr = arrays[name + ".indptr"]
+            strs = self._get_strs(arrays[name + ".strs"], int(indptr[-1]))
+            bounds = indptr.tolist()
+            return [set(strs[beg:end]) if beg != end else set() for beg, end in zip(bounds, bounds[1:])]
+        if kind == "synonym":
+            ntsynonym = self.ntsynonym
+            return [[ntsynonym(txt, scope, typename, set(dbxrefs))
+                     for txt, scope, typename, dbxrefs in val]
+                    for val in json.loads(arrays[name + ".json"].tobytes().decode("utf-8"))]
+        if kind == "json":
+            return json.loads(arrays[name + ".json"].tobytes().decode("utf-8"),
+                              object_hook=self._decode)
+        raise ValueError("UNKNOWN OBO CACHE COLUMN KIND({K}): {N}".format(K=kind, N=name))
+
+    @staticmethod
+    def _get_edges(arrays, name, recs_np):
+        """Get edge bounds (CSR indptr) and the source and target GO terms of all edges."""
+        indptr = arrays[name + ".indptr"]
+        tgts = recs_np[arrays[name + ".indices"]].tolist()
+        srcs = recs_np[np.repeat(np.arange(len(recs_np)), np.diff(indptr))].tolist()
+        return indptr.tolist(), srcs, tgts
+
+    @staticmethod
+    def _get_strs(arr, cnt):
+        """Get a list of cnt strings from a newline-separated UTF-8 string table."""
+        if not cnt:
+            return []
+        strs = arr.tobytes().decode("utf-8").split("\n")
+        if len(strs) != cnt:
+            raise ValueError("EXPECTED {N} STRINGS, FOUND {M}".format(N=cnt, M=len(strs)))
+        return strs
+
+    @classmethod
+    def _add_strs(cls, arrays, name, strs):
+        """Add a newline-separated UTF-8 string table."""
+        txt = "\n".join(strs)
+        if txt.count("\n") != max(len(strs) - 1, 0):
+            raise ValueError("CAN NOT STORE A NEWLINE IN AN OBO CACHE: {N}".format(N=name))
+        arrays[name] = cls._get_bytes(txt)
+
+    @staticmethod
+    def _get_bytes(txt):
+        """Get text as a uint8 array of UTF-8 bytes."""
+        return np.frombuffer(txt.encode("utf-8"), dtype=np.uint8)
+
+    @classmethod
+    def _encode(cls, val):
+        """Get a value which can be stored as JSON. Sets and tuples are tagged."""
+        if isinstance(val, (set, frozenset)):
+            return {"__set__": sorted(cls._encode(v) for v in val)}
+        if isinstance(val, tuple):
+            return {"__tuple__": [cls._encode(v) for v in val]}
+        if isinstance(val, list):
+            return [cls._encode(v) for v in val]
+        if isinstance(val, dict):
+            return {k: cls._encode(v) for k, v in val.items()}
+        if val is None or isinstance(val, (str, int, float)):
+            return val
+        raise TypeError("CAN NOT STORE {T} IN AN OBO CACHE: {V!r}".format(T=type(val).__name__, V=val))
+
+    @staticmethod
+    def _decode(dct):
+        """Restore tagged sets and tuples; json.loads calls this for each JSON object read."""
+        if len(dct) == 1:
+            if "__set__" in dct:
+                return set(dct["__set__"])
+            if "__tuple__" in dct:
+                return tuple(dct["__tuple__"])
+        return dct
+
+    @staticmethod
+    def _add_csr(arrays, name, idx2tgts):
+        """Add edges stored as CSR arrays: indptr and indices."""
+        indptr = np.zeros(len(idx2tgts) + 1, dtype=np.int64)
+        np.cumsum([len(tgts) for tgts in idx2tgts], out=indptr[1:])
+        arrays[name + ".indptr"] = indptr
+        arrays[name + ".indices"] = np.array(
+            [i for tgts in idx2tgts for i in sorted(tgts)], dtype=np.int32)
+
+    def _wr_file(self, arrays, hdr):
+        """Write the cache file. Write to a temporary file first; then rename."""
+        hdr = dict(hdr, key=self.key, arrays={})
+        # Reserve room for the header; array offsets are aligned to 8 bytes
+        hdrlen = len(json.dumps(self._get_hdr_max(hdr, arrays)).encode("utf-8"))
+        offset = self._align(len(self.magic) + 4 + hdrlen)
+        for name, arr in arrays.items():
+            hdr["arrays"][name] = [offset, arr.dtype.str, int(arr.size)]
+            offset = self._align(offset + arr.nbytes)
+        hdrbytes = json.dumps(hdr).encode("utf-8").ljust(hdrlen)
+        fout_tmp = "{F}.{PID}.tmp".format(F=self.cache_file, PID=os.getpid())
+        try:
+            with open(fout_tmp, "wb") as prt:
+                prt.write(self.magic)
+                prt.write(np.uint32(hdrlen).tobytes())
+                prt.write(hdrbytes)
+                for (offset, _, _), arr in zip(hdr["arrays"].values(), arrays.values()):
+                    prt.write(b"\0" * (offset - prt.tell()))
+                    prt.write(arr.tobytes())
+            os.replace(fout_tmp, self.cache_file)
+        except OSError as err:
+            logger.warning("NOT WRITING OBO CACHE(%s): %s", self.cache_file, err)
+            if os.path.exists(fout_tmp):
+                os.remove(fout_tmp)
+
+    @staticmethod
+    def _get_hdr_max(hdr, arrays):
+        """Get a header with the largest possible offsets, to size the header."""
+        maxint = 1 << 62
+        return dict(hdr, arrays={nm: [maxint, a.dtype.str, a.size] for nm, a in arrays.items()})
+
+    @staticmethod
+    def _align(offset):
+        """Round an offset up to a multiple of 8 bytes."""
+        return (offset + 7) // 8 * 8
+
+    def _init_key(self, optional_attrs, load_obsolete):
+        """Get the values which must match for the cache to be used."""
+        if optional_attrs is not None:
+            optional_attrs = OboOptionalAttrs.get_optional_attrs(
+                optional_attrs, OboOptionalAttrs.optional_exp)
+        fstat = os.stat(self.obo_file)
+        return {
+            "version": self.version,
+            "obo_file": self.obo_file,
+            "mtime_ns": fstat.st_mtime_ns,
+            "size": fstat.st_size,
+            "optional_attrs": sorted(optional_attrs) if optional_attrs else None,
+            "load_obsolete": bool(load_obsolete),
+        }
+
+    def _init_cache_file(self):
+        """Get the cache file name. Each set of load options has its own cache file."""
+        opts = json.dumps([self.key["optional_attrs"], self.key["load_obsolete"]])
+        return "{OBO}.{H}.cache".format(
+            OBO=self.obo_file, H=hashlib.sha1(opts.encode("utf-8")).hexdigest()[:8])
+
+
+# Copyright (C) 2010-present, DV Klopfenstein, H Tang, All rights reserved.
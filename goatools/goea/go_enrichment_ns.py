@@ -4,8 +4,10 @@
 __copyright__ = "Copyright (C) 2010-2019, H Tang et al., All rights reserved."
 __author__ = "various"
 
+import io
 import itertools
 from goatools.go_enrichment import GOEnrichmentStudy
+from goatools.forkpool import FORKED, iter_forked
 
 
 class GOEnrichmentStudyNS:
@@ -17,9 +19,67 @@ class GOEnrichmentStudyNS:
 
     def run_study(self, study_ids, **kws):
         """Run GOEAs for each namespace, BP MF CC"""
+        # workers: Run the namespaces in this many processes (default 1: no process pool)
+        workers = kws.pop('workers', 1)
+        if workers > 1 and self.ns2objgoea:
+            _, results = next(self._run_pool({kws.get('name'): study_ids}, workers, kws, True))
+            return results
         ns2results = {ns:o.run_study(study_ids, **kws) for ns, o in sorted(self.ns2objgoea.items())}
         return list(itertools.chain.from_iterable(ns2results.values()))
 
+    def run_studies(self, name2study, **kws):
+        """Run GOEAs for each study and each namespace. Yield (study name, results) pairs
+
+        name2study: dict of study names (e.g., study filenames) to study IDs
+        workers: Run chunks of studies in each namespace in this many processes (default 1)
+
+        Each namespace runs all studies (or a chunk of studies) at once
+        (GOEnrichmentStudy.run_studies).
+        """
+        workers = kws.pop('workers', 1)
+        if not self.ns2objgoea:
+            for name in name2study:
+                yield name, []
+        elif workers > 1:
+            yield from self._run_pool(name2study, workers, kws)
+        else:
+            itrs = [o.run_studies(name2study, **kws) for _, o in sorted(self.ns2objgoea.items())]
+            for ns_pairs in zip(*itrs):
+                yield ns_pairs[0][0], list(itertools.chain.from_iterable(r for _, r in ns_pairs))
+
+    def _run_pool(self, name2study, workers, kws, single=False):
+        """Run the GOEAs of each chunk of studies in each namespace in a process pool.
+
+        Yield (study name, results) pairs, identical to a serial run.
+        single: Run the one study with GOEnrichmentStudy.run_study, rather than run_studies
+        """
+        objgoea = next(iter(self.ns2objgoea.values()))
+        log = objgoea._get_log_or_prt(kws)  # pylint: disable=protected-access
+        nss = sorted(self.ns2objgoea)
+        names = list(name2study)
+        # Association matrices are built once, here, and inherited by all workers
+        for obj in self.ns2objgoea.values():
+            obj.get_assc_matrix()
+        chunks = _get_chunks(len(names), 2*workers//len(nss) + 1)
+        tasks = [(chunk, nspc) for chunk in chunks for nspc in nss]
+        shared = dict(names=names, name2study=name2study, single=single,
+                      ns2objgoea=self.ns2objgoea, kws=kws, log=log)
+        itr = iter_forked(_run_ns_forked, tasks, workers, shared)
+        for _ in chunks:
+            ns2pairs = {nspc:next(itr) for nspc in nss}
+            for idx, (name, _, _) in enumerate(ns2pairs[nss[0]]):
+                results_all = []
+                for nspc in nss:
+                    _, results, txt = ns2pairs[nspc][idx]
+                    # Write the log of each GOEA in the same order as a serial run
+                    if log is not None:
+                        log.write(txt)
+                    godag = self.ns2objgoea[nspc].obo_dag
+                    for rec in results:
+                        rec.set_goterm(godag)
+                    results_all.extend(results)
+                yield name, results_all
+
     def wr_xlsx(self, fout_xlsx, goea_results, **kws):
         """Write to spreadsheet format"""
         if self._chk_len(fout_xlsx, goea_results):
@@ -55,4 +115,39 @@ class GOEnrichmentStudyNS:
         return True
 
 
+def _get_chunks(num_studies, num_chunks):
+    """Split studies into at most num_chunks (begin, end) chunks of similar size"""
+    num_chunks = max(1, min(num_studies, num_chunks))
+    return [(i*num_studies//num_chunks, (i+1)*num_studies//num_chunks) for i in range(num_chunks)]
+
+
+def _run_ns_forked(task):
+    """Run the GOEAs of one chunk of studies in one namespace.
+
+    Return (study name, results, log text) for each study
+    """
+    (beg, end), nspc = task
+    kws = {k:v for k, v in FORKED['kws'].items() if k not in {'log', 'prt'}}
+    prt = io.StringIO() if FORKED['log'] is not None else None
+    objgoea = FORKED['ns2objgoea'][nspc]
+    name2study = FORKED['name2study']
+    names = FORKED['names'][beg:end]
+    if FORKED['single']:
+        itr = [(names[0], objgoea.run_study(name2study[names[0]], log=prt, **kws))]
+    else:
+        itr = objgoea.run_studies({n:name2study[n] for n in names}, log=prt, **kws)
+    name_results_txt = []
+    for name, results in itr:
+        # Do not send the GO DAG back to the parent; the GO term is set again in the parent
+        for rec in results:
+            rec.goterm = None
+        txt = ''
+        if prt is not None:
+            txt = prt.getvalue()
+            prt.seek(0)
+            prt.truncate(0)
+        name_results_txt.append((name, results, txt))
+    return name_results_txt
+
+
 # Copyright (C) 2010-2019, H Tang et al., All rights reserved.
@@ -327,7 +327,7 @@ class EdgesPath(EdgesBase):
 
     def _init_edges(self, dst_srcs_list):
         """Create all GO edges given a list of (dst, srcs)."""
-        from .go_paths import get_paths_goobjs, paths2edges
+        from .go_paths import get_edges_goobjs
 
         edges_all = set()
         goid_all = set()
@@ -336,10 +336,11 @@ class EdgesPath(EdgesBase):
             go2obj_srcs = {}
             for goid in srcs:
                 go2obj_srcs[goid] = go2obj[goid]
-            go_paths, go_all = get_paths_goobjs(
+            # Edges on all paths are found without listing every path
+            edges, go_all = get_edges_goobjs(
                 go2obj_srcs.values(), go_top=dst, go2obj=go2obj
             )
-            edges_all |= paths2edges(go_paths)
+            edges_all |= edges
             goid_all |= go_all
         self.edges = [(a.id, b.id) for a, b in edges_all]
         self.goid_all = goid_all
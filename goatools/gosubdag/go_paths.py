@@ -11,7 +11,7 @@ class GoPaths(object):
     """Class for helping traverse GO paths."""
 
     adjdir = {
-        None:  lambda go_obj: go_obj.parents + go_obj.children,
+        None:  lambda go_obj: go_obj.parents | go_obj.children,
         True:  lambda go_obj: go_obj.parents,
         False: lambda go_obj: go_obj.children}
 
@@ -20,30 +20,61 @@ class GoPaths(object):
         """Get a list of paths from goobj_start to either top or goid_end."""
         paths = []
         # Queue of terms to be examined (and storage for their paths)
-        working_q = cx.deque([[goobj_start]])
+        # Each path is stored as linked (GO term, previous link) pairs; no lists are copied
+        working_q = cx.deque([(goobj_start, None)])
         # Loop thru GO terms until we have examined all needed GO terms
         adjfnc = self.adjdir[dn0_up1]
         while working_q:
             #print "WORKING QUEUE LEN({})".format(len(working_q))
-            path_curr = working_q.popleft()
-            goobj_curr = path_curr[-1]
+            link_curr = working_q.popleft()
+            goobj_curr = link_curr[0]
             go_adjlst = adjfnc(goobj_curr)
             #print 'END', goid_end, goobj_curr
             # If this GO term is the endpoint, Stop. Store path.
             if (goid_end is not None and goobj_curr.id == goid_end) or \
                (goid_end is None and not go_adjlst):
-                paths.append(path_curr)
+                paths.append(_get_path(link_curr))
             # Else if this GO term is the not the end, add neighbors to path
             else:
+                path_curr = set(_get_path(link_curr)) if dn0_up1 is None else ()
                 for go_neighbor in go_adjlst:
                     if go_neighbor not in path_curr:
-                        #print "{}'s NEIGHBOR IS {}".format(goobj_curr.id, go_neighbor.id)
-                        new_path = path_curr + [go_neighbor]
-                        #sys.stdout.write(" {}'s {} {}\n".format(goobj_curr, up_dn, go_neighbor))
-                        working_q.append(new_path)
+                        working_q.append((go_neighbor, link_curr))
         #self.prt_paths(paths)
         return paths
 
+    def iter_paths_from_to(self, goobj_start, goid_end=None, dn0_up1=True, max_paths=None, max_len=None):
+        """Yield paths from goobj_start to either top or goid_end, one at a time.
+
+        max_paths: Stop after this many paths
+        max_len: Skip paths containing more than this many GO terms
+        """
+        return iter_paths(goobj_start, self.adjdir[dn0_up1], self._get_is_end(goid_end, dn0_up1),
+                          max_paths, max_len)
+
+    def get_num_paths_from_to(self, goobj_start, goid_end=None, dn0_up1=True):
+        """Count the paths from goobj_start to either top or goid_end without listing them."""
+        self._chk_dag(dn0_up1)
+        return get_num_paths(goobj_start, self.adjdir[dn0_up1], self._get_is_end(goid_end, dn0_up1))
+
+    def get_nodes_edges_from_to(self, goobj_start, goid_end=None, dn0_up1=True):
+        """Get all GO terms and edges on all paths from goobj_start without listing the paths."""
+        self._chk_dag(dn0_up1)
+        return get_nodes_edges(goobj_start, self.adjdir[dn0_up1], self._get_is_end(goid_end, dn0_up1))
+
+    def _get_is_end(self, goid_end, dn0_up1):
+        """Get the function which returns True if a GO term ends a path."""
+        if goid_end is not None:
+            return lambda go_obj: go_obj.id == goid_end
+        adjfnc = self.adjdir[dn0_up1]
+        return lambda go_obj: not adjfnc(go_obj)
+
+    @staticmethod
+    def _chk_dag(dn0_up1):
+        """Paths are counted using a DAG: GO terms must be traversed in one direction"""
+        if dn0_up1 is None:
+            raise ValueError("PATHS ARE COUNTED GOING UP (dn0_up1=True) OR DOWN (dn0_up1=False)")
+
     @staticmethod
     def prt_paths(paths, prt=sys.stdout):
         """Print list of paths."""
@@ -74,6 +105,89 @@ def get_paths_goobjs(go_objs, go_top=None, go2obj=None):
                 go_paths.extend(path for path in paths_curr)
     return go_paths, go_all
 
+def get_edges_goobjs(go_objs, go_top=None, go2obj=None):
+    """Given a list of GO objects, return: all edges and all GO terms on paths to go_top."""
+    edges_all = set()
+    go_all = set()
+    pathobj = GoPaths()
+    for go_obj in go_objs:
+        if go_obj.id not in go_all:
+            goobjs, edges = pathobj.get_nodes_edges_from_to(go_obj, go_top, True)
+            for goobj in goobjs:
+                goid = goobj.id
+                if goid not in go_all:
+                    go_all.add(goid)
+                    go2obj[goid] = goobj
+            edges_all |= edges
+    return edges_all, go_all
+
+def iter_paths(goobj_start, get_nexts, is_end, max_paths=None, max_len=None):
+    """Yield each path (list of GO terms) from goobj_start to a GO term where is_end is True."""
+    # Depth-first: one path is extended and shortened in place; only found paths are copied
+    path = [goobj_start]
+    on_path = {goobj_start}
+    stack = [None if is_end(goobj_start) else iter(get_nexts(goobj_start))]
+    num_paths = 0
+    while stack:
+        nexts = stack[-1]
+        if nexts is None:
+            yield list(path)
+            num_paths += 1
+            if max_paths is not None and num_paths >= max_paths:
+                return
+            nxt = None
+        else:
+            nxt = next(nexts, None)
+            while nxt is not None and nxt in on_path:
+                nxt = next(nexts, None)
+        if nxt is None or (max_len is not None and len(path) >= max_len):
+            stack.pop()
+            on_path.discard(path.pop())
+            continue
+        path.append(nxt)
+        on_path.add(nxt)
+        stack.append(None if is_end(nxt) else iter(get_nexts(nxt)))
+
+def get_num_paths(goobj_start, get_nexts, is_end):
+    """Count the paths from goobj_start to GO terms where is_end is True, one pass over the DAG."""
+    obj2cnt = {}
+    for goobj in _iter_postorder(goobj_start, get_nexts, is_end):
+        obj2cnt[goobj] = 1 if is_end(goobj) else sum(obj2cnt[o] for o in get_nexts(goobj))
+    return obj2cnt[goobj_start]
+
+def get_nodes_edges(goobj_start, get_nexts, is_end):
+    """Get the GO terms and edges on all paths from goobj_start, one pass over the DAG."""
+    # A GO term is on a path if it is reached from goobj_start and it reaches an end
+    obj2ok = {}
+    for goobj in _iter_postorder(goobj_start, get_nexts, is_end):
+        obj2ok[goobj] = is_end(goobj) or any(obj2ok[o] for o in get_nexts(goobj))
+    nodes = set(o for o, ok in obj2ok.items() if ok)
+    edges = set((o, nxt) for o in nodes if not is_end(o) for nxt in get_nexts(o) if obj2ok[nxt])
+    return nodes, edges
+
+def _iter_postorder(goobj_start, get_nexts, is_end):
+    """Yield GO terms reached from goobj_start, each after the GO terms it leads to."""
+    seen = set()
+    stack = [(goobj_start, False)]
+    while stack:
+        goobj, nexts_done = stack.pop()
+        if nexts_done:
+            yield goobj
+        elif goobj not in seen:
+            seen.add(goobj)
+            stack.append((goobj, True))
+            if not is_end(goobj):
+                stack.extend((o, False) for o in get_nexts(goobj) if o not in seen)
+
+def _get_path(link):
+    """Get a list of GO terms from linked (GO term, previous link) pairs."""
+    path = []
+    while link is not None:
+        path.append(link[0])
+        link = link[1]
+    path.reverse()
+    return path
+
 def paths2edges(paths):
     """[8079, 8135, 3723, 3676, 1901363, 5488, 3674] """
     edges_all = set()
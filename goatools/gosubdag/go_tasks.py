@@ -6,6 +6,8 @@ __author__ = "DV Klopfenstein"
 import collections as cx
 from goatools.godag.go_tasks import get_go2ancestors
 from goatools.godag.go_tasks import get_go2descendants
+from goatools.godag.go_tasks import prt_relationships
+from goatools.godag.closure import get_closure
 
 
 # ------------------------------------------------------------------------------------
@@ -62,6 +64,16 @@ def get_go2parents_go2obj(go2obj, relationships=None, prt=None):
     add_alt_goids(go2ancestors, altgo2goobj)
     return go2ancestors
 
+# ------------------------------------------------------------------------------------
+def get_go2parents_godag(godag, goids, relationships=None, prt=None):
+    """Return go2ancestors for GO IDs in a GODag, using the GODag's closure index if it has one."""
+    objclo = get_closure(godag, relationships)
+    if objclo is None:
+        return get_go2parents_go2obj({go:godag[go] for go in goids}, relationships, prt)
+    if prt is not None:
+        prt_relationships(prt, "up", relationships)
+    return objclo.get_go2ancestors(goids)
+
 # ------------------------------------------------------------------------------------
 def get_go2children_go2obj(go2obj, relationships=None, prt=None):
     """Return go2children (set of child GO IDs) for all GO ID keys in go2obj."""
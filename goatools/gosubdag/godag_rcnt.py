@@ -9,11 +9,11 @@ from goatools.gosubdag.godag_rcnt_init import CountRelativesInit
 class CountRelatives:
     """Get descendant/parent counts for all GO terms in a GODag and broad L0 and L1 terms."""
 
-    def __init__(self, go2obj, relationships=None, dcnt=True, go2letter=None):
+    def __init__(self, go2obj, relationships=None, dcnt=True, go2letter=None, godag=None):
         # Subset go2obj contains only items needed by go_sources
         self.go2obj = go2obj
         # Count of total number of descendants for each GO term
-        _ini = CountRelativesInit(go2obj, relationships, dcnt, go2letter)
+        _ini = CountRelativesInit(go2obj, relationships, dcnt, go2letter, godag)
         self.go2descendants = _ini.go2descendants  # GO IDs
         # Used by: Semantic, Grouper
         self.go2parents = _ini.go2ancestors    # Will be DEPRECATED: renamed to go2ancestors
@@ -9,6 +9,7 @@ import collections as cx
 from itertools import chain
 from goatools.godag.go_tasks import get_go2ancestors
 from goatools.godag.go_tasks import get_go2descendants
+from goatools.godag.closure import get_closure
 from goatools.gosubdag.go_tasks import get_goobjs_altgo2goobj
 from goatools.gosubdag.go_tasks import add_alt_goids
 
@@ -17,7 +18,7 @@ class CountRelativesInit:
     """Get descendant/parent counts for all GO terms in a GODag and broad L0 and L1 terms."""
 
 
-    def __init__(self, go2obj, relationships, dcnt, go2letter):
+    def __init__(self, go2obj, relationships, dcnt, go2letter, godag=None):
         # Subset go2obj contains only items needed by go_sources
         self.go2obj = go2obj
         self.relationships = relationships
@@ -26,8 +27,15 @@ class CountRelativesInit:
         # Ex: set(['part_of', 'regulates', 'negatively_regulates', 'positively_regulates'])
         _goobjs, _altgo2goobj = get_goobjs_altgo2goobj(self.go2obj)
         _r0 = not relationships  # True if not using relationships
-        self.go2descendants = get_go2descendants(_goobjs, relationships)
-        self.go2ancestors = get_go2ancestors(_goobjs, relationships)
+        # godag: Full GODag, which holds a closure index of all ancestors and descendants
+        objclo = get_closure(godag, relationships) if godag is not None else None
+        if objclo is not None:
+            _goids = [o.item_id for o in _goobjs]
+            self.go2descendants = objclo.get_go2descendants(_goids, reachable=True)
+            self.go2ancestors = objclo.get_go2ancestors(_goids, reachable=True)
+        else:
+            self.go2descendants = get_go2descendants(_goobjs, relationships)
+            self.go2ancestors = get_go2ancestors(_goobjs, relationships)
         self.go2dcnt = cx.Counter({go: len(p) for go, p in self.go2descendants.items()})
         add_alt_goids(self.go2ancestors, _altgo2goobj)
         add_alt_goids(self.go2descendants, _altgo2goobj)
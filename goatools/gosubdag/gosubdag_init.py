@@ -135,7 +135,8 @@ class InitFields:
                 self.go2obj,  # Subset go2obj contains only items needed by go_sources
                 self.relationships,
                 dcnt='dcnt' in self.kw_elems,
-                go2letter=self.kws.get('go2letter'))
+                go2letter=self.kws.get('go2letter'),
+                godag=self.go2obj_orig)
         return None
 
     def get_go2nt_all(self, rcntobj):
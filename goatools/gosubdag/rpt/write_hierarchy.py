@@ -71,8 +71,8 @@ class WrHierGO:
         objp = GoPaths()
         for goid_usr, goterm in go2term_ns.items():
             goids_all.add(goid_usr)
-            paths = objp.get_paths_from_to(goterm, goid_end=None, dn0_up1=True)
-            goids_all.update(set(o.id for p in paths for o in p))
+            goterms, _ = objp.get_nodes_edges_from_to(goterm, goid_end=None, dn0_up1=True)
+            goids_all.update(o.id for o in goterms)
         return goids_all
 
     @staticmethod
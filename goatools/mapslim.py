@@ -41,26 +41,76 @@ def mapslim(go_term, go_dag, goslim_dag):
         raise TypeError("goslim_dag must be an instance of GODag")
     if go_term not in go_dag:
         raise ValueError("go_term must be an accession that is in the go_dag")
+    direct_ancestors, all_ancestors = get_slimmapper(go_dag, goslim_dag).get_slims(go_term)
+    return set(direct_ancestors), set(all_ancestors)
 
-    all_ancestors = set()
-    covered_ancestors = set()
-
-    # get all paths for the term in the go_dag
-    paths = go_dag.paths_to_top(go_term)
-    for path in paths:
-        # the next loop needs to run bottom->up, i.e. from the go_term item to
-        # the root, thus we need to reverse the list prior to iteration
-        path.reverse()
-
-        got_leaf = False
-        for term in path:
-            if term.id in goslim_dag:
-                all_ancestors.add(term.id)
-                if got_leaf:
-                    covered_ancestors.add(term.id)
-                got_leaf = True
-
-    # get the direct ancestors, i.e. those that are not covered by a earlier
-    # ancestor of the GO-Slim in _any_ path (in bottom->top order)
-    direct_ancestors = all_ancestors - covered_ancestors
-    return direct_ancestors, all_ancestors
+
+def get_slimmapper(go_dag, goslim_dag):
+    """Get the SlimMapper for a GO DAG and GO slim, cached on the GO DAG."""
+    slims = frozenset(goslim_dag)
+    slims2mapper = go_dag.__dict__.setdefault("_slimmappers", {})
+    objmap = slims2mapper.get(slims)
+    if objmap is None:
+        objmap = SlimMapper(go_dag, slims)
+        slims2mapper[slims] = objmap
+    return objmap
+
+
+class SlimMapper:
+    """Maps GO terms and associations to GO slim terms without enumerating paths to the top.
+
+    The slim ancestors of every GO term are found in one sweep over the GO DAG, visiting
+    parents ('is_a') before children. For each GO term, two sets are stored:
+      all:     The GO slim terms that are the GO term or its ancestors
+      covered: The GO slim terms that have another GO slim term below them on a path
+               from the GO term to the top
+    The direct GO slim terms of a GO term are all - covered. Equal sets are shared.
+    """
+
+    def __init__(self, go_dag, goslim_goids):
+        # goslim_goids: GO slim DAG or set of GO IDs in the GO slim
+        self.go2allcov = self._init_go2allcov(go_dag, goslim_goids)
+
+    def get_slims(self, go_term):
+        """Get the direct and all GO slim terms of one GO term, as frozensets."""
+        all_ancestors, covered = self.go2allcov[go_term]
+        return all_ancestors - covered, all_ancestors
+
+    def get_slims_goids(self, goids):
+        """Get the direct and all GO slim terms of a set of GO IDs, e.g., of one gene.
+
+        GO IDs which are not in the GO DAG are ignored.
+        """
+        go2allcov = self.go2allcov
+        allcovs = [go2allcov[go] for go in goids if go in go2allcov]
+        all_ancestors = set().union(*[a for a, _ in allcovs])
+        covered = set().union(*[c for _, c in allcovs])
+        return all_ancestors - covered, all_ancestors
+
+    def get_id2slims(self, id2goids, only_direct=True):
+        """Map an association (e.g., gene-to-GO IDs) to gene-to-GO slim IDs."""
+        return {geneid: self.get_slims_goids(goids)[0 if only_direct else 1]
+                for geneid, goids in id2goids.items()}
+
+    @staticmethod
+    def _init_go2allcov(go_dag, goslim_goids):
+        """Find the all and covered GO slim terms of every GO term, parents first."""
+        recs = sorted({rec.item_id: rec for rec in go_dag.values()}.values(),
+                      key=lambda rec: rec.depth)
+        empty = frozenset()
+        # Many GO terms have the same GO slim terms: store one copy of each set
+        sets = {empty: empty}
+        rec2allcov = {}
+        for rec in recs:
+            parents = [rec2allcov[p] for p in rec.parents]
+            all_ancestors = set().union(*[a for a, _ in parents])
+            if rec.item_id in goslim_goids:
+                # All other GO slim terms above this GO slim term are covered by it
+                covered = all_ancestors
+                all_ancestors = all_ancestors | {rec.item_id}
+            else:
+                covered = set().union(*[c for _, c in parents])
+            all_ancestors = sets.setdefault(frozenset(all_ancestors), frozenset(all_ancestors))
+            covered = sets.setdefault(frozenset(covered), frozenset(covered))
+            rec2allcov[rec] = (all_ancestors, covered)
+        return {goid: rec2allcov[rec] for goid, rec in go_dag.items()}
@@ -7,13 +7,18 @@ A list of commonly used multiple correction routines
 from __future__ import print_function
 from __future__ import absolute_import
 import sys
-import random
 import numpy as np
 import collections as cx
+from scipy import sparse
+from goatools import multiple_testing_np
+from goatools.forkpool import FORKED, iter_forked
 
 __copyright__ = "Copyright (C) 2010-2018, H Tang et al., All rights reserved."
 __author__ = "various"
 
+# Module-level so that GOEA results can be pickled (e.g., returned from worker processes)
+NtMethodInfo = cx.namedtuple("NtMethodInfo", "source method fieldname")
+
 class Methods(object):
     """Class to manage multipletest methods from both local and remote sources."""
 
@@ -33,10 +38,13 @@ class Methods(object):
             'fdr_tsbky',      #  9) FDR 2-stage Benjamini-Krieger-Yekutieli (non-negative)
             'fdr_gbs',        # 10) FDR adaptive Gavrilov-Benjamini-Sarkar
             )),
-
+        # Vectorized in goatools.multiple_testing_np; Same p-values as statsmodels
+        ("numpy", multiple_testing_np.METHODS),
     ]
-    prefixes = {'statsmodels':'sm_'}
-    NtMethodInfo = cx.namedtuple("NtMethodInfo", "source method fieldname")
+    prefixes = {'statsmodels':'sm_', 'numpy':'np_'}
+    # Field names of these sources always have the prefix, so other field names do not change
+    prefixed = {'numpy'}
+    NtMethodInfo = NtMethodInfo
 
     def __init__(self, usr_methods=None):
         self._srcmethod2fieldname = self._init_srcmethod2fieldname()
@@ -73,6 +81,8 @@ class Methods(object):
             if usr_method.startswith(prefix):
                 method_source = src
                 method = usr_method[len(prefix):]
+                if (method_source, method) not in self._srcmethod2fieldname:
+                    raise self.rpt_invalid_method(usr_method)
                 nmtup = self.NtMethodInfo(method_source, method, usr_method)
                 self.methods.append(nmtup)
                 return
@@ -101,7 +111,7 @@ class Methods(object):
         for method_source, methods in self.all_methods:
             for method in methods:
                 prefix = self.prefixes.get(method_source, "")
-                prefix = prefix if ctr[method] != 1 else ""
+                prefix = prefix if ctr[method] != 1 or method_source in self.prefixed else ""
                 fieldname = "{P}{M}".format(P=prefix, M=method.replace('-', '_'))
                 srcmethod_fieldname.append(((method_source, method), fieldname))
         return cx.OrderedDict(srcmethod_fieldname)
@@ -115,9 +125,10 @@ class Methods(object):
     def _get_method_cnts(self):
         """Count the number of times a method is seen."""
         ctr = cx.Counter()
-        for source_methods in self.all_methods:
-            for method in source_methods[1]:
-                ctr[method] += 1
+        for method_source, methods in self.all_methods:
+            if method_source not in self.prefixed:
+                for method in methods:
+                    ctr[method] += 1
         return ctr
 
     def _add_method_src(self, method_source, usr_method, fieldname=None):
@@ -201,29 +212,11 @@ class HolmBonferroni(_AbstractCorrection):
     """
     def set_correction(self):
         """Do Holm-Bonferroni multiple test correction on original p-values."""
-        if len(self.pvals):
-            if all(p==1. for p in self.pvals):
-                idxs, correction = [(0,), (1,)]
-            else:
-                idxs, correction = list(zip(*self._generate_significant()))
-            idxs = list(idxs)
-            self.corrected_pvals[idxs] *= correction
-
-    def _generate_significant(self):
-
         pvals = self.pvals
-        pvals_idxs = list(zip(pvals, list(range(len(pvals)))))
-        pvals_idxs.sort()
-
-        num_pvals = len(self.pvals)
-
-        from itertools import groupby
-        for _, idxs in groupby(pvals_idxs, lambda x: x[0]):
-            idxs = list(idxs)
-            for p, i in idxs:
-                if p < 1.:
-                    yield (i, num_pvals)
-            num_pvals -= len(idxs)
+        if len(pvals):
+            # Each p-value < 1 is multiplied by the number of p-values which are >= it
+            num_ge = len(pvals) - np.searchsorted(np.sort(pvals), pvals, side='left')
+            self.corrected_pvals = np.where(pvals < 1., pvals*num_ge, pvals)
 
 
 class FDR(object):
@@ -232,11 +225,27 @@ class FDR(object):
     http://www.biomedcentral.com/1471-2105/6/168
     """
     def __init__(self, p_val_distribution, results, a=.05):
-        self.corrected_pvals = fdr = []
-        for rec in results:
-            q = (sum(1 for x in p_val_distribution if x < rec.p_uncorrected)
-                 * 1.0 / len(p_val_distribution))
-            fdr.append(q)
+        # q: fraction of the p-value distribution which is smaller than the p-value
+        distribution = np.sort(np.asarray(p_val_distribution, dtype=float))
+        pvals = np.array([rec.p_uncorrected for rec in results], dtype=float)
+        self.corrected_pvals = (
+            np.searchsorted(distribution, pvals, side='left') / len(distribution)).tolist()
+
+def get_tarone_testable(min_pvals, alpha):
+    """Tarone: Find which tests can reach significance, given the smallest p-value of each.
+
+    Tarone's k is the smallest k where at most k tests have a smallest p-value <= alpha/k.
+    Tests whose smallest p-value is > alpha/k can never be significant and are not tested.
+    Returns k and a boolean mask of the testable tests.
+    """
+    min_pvals = np.asarray(min_pvals, dtype=float)
+    if not min_pvals.size:
+        return 1, np.zeros(0, dtype=bool)
+    ks = np.arange(1, min_pvals.size + 1)
+    # Number of tests which can reach alpha/k, for each k
+    num_testable = np.searchsorted(np.sort(min_pvals), alpha/ks, side='right')
+    k = int(ks[np.argmax(num_testable <= ks)])
+    return k, min_pvals <= alpha/k
 
 def mcorrection_factory(pvals, alpha, method):
     """Return 'multiple correction' object of requested AbstractCorrection base class."""
@@ -246,34 +255,112 @@ def mcorrection_factory(pvals, alpha, method):
 
 
 def calc_qval(study_n, pop_n,
-              pop, assoc, term_pop, obo_dag, T=500):
-    """Generate p-value distribution for FDR based on resampling."""
-    from goatools.pvalcalc import FisherFactory
-    from goatools.ratio import count_terms
+              pop, assoc, term_pop, obo_dag, T=500, **kws):
+    """Generate p-value distribution for FDR based on resampling.
+
+    Optional keyword arguments:
+        seed: Random seed, for reproducible distributions
+        workers: Number of processes used to resample
+        assc_mtx: AsscMatrix of the population, if already built
+    """
     sys.stderr.write("Generate p-value distribution for FDR "
                      "based on resampling (this might take a while)\n")
-    distribution = []
-    calc_pvalue = FisherFactory().pval_obj.calc_pvalue
-    pop = list(pop)
-    for i in range(T):
-        new_study = random.sample(pop, study_n)
-        new_term_study = count_terms(new_study, assoc, obo_dag)
-
-        smallest_p = 1
-        for term, study_count in list(new_term_study.items()):
-            pop_count = term_pop[term]
-            p_uncorrected = calc_pvalue(study_count,
-                                        study_n,
-                                        pop_count,
-                                        pop_n)
-            if p_uncorrected < smallest_p:
-                smallest_p = p_uncorrected
-
-        distribution.append(smallest_p)
-        if i % 10 == 0:
+    objrs = FdrResampler(pop, assoc, obo_dag, term_pop, kws.get('assc_mtx'))
+    return objrs.get_distribution(study_n, pop_n, T, kws.get('seed'), kws.get('workers', 1))
+
+
+class FdrResampler(object):
+    """Get the smallest p-value of each of many random study sets drawn from the population.
+
+    Random study sets are drawn in blocks as a NumPy matrix of population indices.
+    GO counts of a block come from one sparse matrix product with the gene-by-GO
+    matrix. P-values are looked up in hypergeometric tables calculated once.
+    """
+
+    # Maximum number of random values drawn at once; bounds memory for large populations
+    max_block = 1 << 22
+
+    def __init__(self, pop, assoc, obo_dag, term_pop=None, assc_mtx=None):
+        from goatools.anno.assc_matrix import AsscMatrix
+        # Sort the population so a random seed always draws the same study sets
+        self.pop = sorted(pop)
+        self.assc_mtx = AsscMatrix(assoc, obo_dag, self.pop) if assc_mtx is None else assc_mtx
+        # Matrix row of each population item; -1 if the item has no GO annotations
+        gene2idx = self.assc_mtx.gene2idx
+        self.pop_rows = np.array([gene2idx.get(g, -1) for g in self.pop], dtype=np.int64)
+        self.pop_counts = self._init_pop_counts(term_pop)
+        # P-value tables for each GO ID: pvals[tbl_offsets[goidx] + study_count]
+        self.pvals = None
+        self.tbl_offsets = None
+
+    def get_distribution(self, study_n, pop_n, num_samples=500, seed=None, workers=1):
+        """Get the smallest p-value of each of num_samples random study sets."""
+        if study_n > len(self.pop):
+            raise ValueError("STUDY SIZE({N}) IS LARGER THAN THE POPULATION({P})".format(
+                N=study_n, P=len(self.pop)))
+        if study_n == 0:
+            return np.ones(num_samples)
+        self._init_tables(study_n, pop_n)
+        nblk = max(1, self.max_block // len(self.pop))
+        blocks = [(beg, min(num_samples, beg + nblk)) for beg in range(0, num_samples, nblk)]
+        # One independent random stream per block: results do not depend on workers
+        seeds = np.random.SeedSequence(seed).spawn(len(blocks))
+        tasks = [(study_n, end - beg, sd) for (beg, end), sd in zip(blocks, seeds)]
+        distribution = np.ones(num_samples)
+        # Workers inherit this object (population and p-value tables) through fork
+        self._set_distribution(distribution, blocks, iter_forked(
+            _get_minpvals_forked, tasks, workers, {'objrs': self}))
+        return distribution
+
+    @staticmethod
+    def _set_distribution(distribution, blocks, minpvals_blocks):
+        """Store the smallest p-values of each block of random study sets."""
+        num_samples = len(distribution)
+        for (beg, end), minpvals in zip(blocks, minpvals_blocks):
+            distribution[beg:end] = minpvals
             sys.stderr.write("Sample {0} / {1}: "
-                             "p-value {2}\n".format(i, T, smallest_p))
-    return distribution
+                             "p-value {2}\n".format(end, num_samples, minpvals.min()))
+
+    def get_minpvals(self, study_n, num_samples, seed):
+        """Get the smallest p-value of each of num_samples random study sets."""
+        rng = np.random.default_rng(seed)
+        # Each row holds the population indices of one random study set
+        samples = rng.random((num_samples, len(self.pop))).argpartition(
+            study_n - 1, axis=1)[:, :study_n]
+        rows = self.pop_rows[samples]
+        annotated = rows != -1
+        indptr = np.zeros(num_samples + 1, dtype=np.int64)
+        np.cumsum(annotated.sum(axis=1), out=indptr[1:])
+        indices = rows[annotated]
+        selector = sparse.csr_matrix(
+            (np.ones(indices.size, dtype=np.int32), indices, indptr),
+            shape=(num_samples, len(self.assc_mtx.genes)))
+        # Only GO IDs seen in a random study set are tested, as in the study
+        counts = selector.dot(self.assc_mtx.csr).tocoo()
+        pvals = self.pvals[self.tbl_offsets[counts.col] + counts.data]
+        minpvals = np.ones(num_samples)
+        np.minimum.at(minpvals, counts.row, pvals)
+        return minpvals
+
+    def _init_tables(self, study_n, pop_n):
+        """Calculate a p-value for every possible study count of every GO ID."""
+        from goatools.pvalcalc import FisherFactory
+        pval_obj = FisherFactory(pvalcalc='fisher_vectorized', log=None).pval_obj
+        pop_counts_uniq, idxs_uniq = np.unique(self.pop_counts, return_inverse=True)
+        lows, offsets, self.pvals = pval_obj.get_pval_tables(study_n, pop_counts_uniq, pop_n)
+        self.tbl_offsets = (offsets - lows)[idxs_uniq]
+
+    def _init_pop_counts(self, term_pop):
+        """Get the population count of each GO ID in the gene-by-GO matrix."""
+        if term_pop is not None:
+            return np.array([term_pop[go] for go in self.assc_mtx.goids], dtype=np.int64)
+        rows = self.pop_rows[self.pop_rows != -1]
+        return np.asarray(self.assc_mtx.csr[rows].sum(axis=0)).ravel().astype(np.int64)
+
+
+def _get_minpvals_forked(task):
+    """Get the smallest p-values of a block of random study sets in a forked worker"""
+    return FORKED['objrs'].get_minpvals(*task)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,73 @@
+"""Multiple-test corrections of many p-values at once, vectorized with NumPy.
+
+Corrected p-values match statsmodels.stats.multitest.multipletests, without importing
+statsmodels. A 2-D array is corrected one row at a time in one call, e.g., one row of
+GO term p-values for each of many studies:
+
+    >>> get_corrected_pvals([0.01, 0.02, 0.2], 'fdr_bh')
+    array([0.03, 0.03, 0.2 ])
+"""
+
+__copyright__ = "Copyright (C) 2010-present, H Tang et al., All rights reserved."
+__author__ = "DV Klopfenstein"
+
+import numpy as np
+
+# Multiple-test corrections; GOEA method names are these, prefixed with 'np_'
+METHODS = ('bonferroni', 'sidak', 'holm', 'hommel', 'fdr_bh', 'fdr_by')
+
+
+def get_corrected_pvals(pvals, method):
+    """Get the corrected p-values of each row of a 1-D or 2-D array of p-values"""
+    pvals = np.asarray(pvals, dtype=float)
+    if method not in METHODS:
+        raise ValueError('UNKNOWN METHOD({M}). EXPECTED: {Ms}'.format(
+            M=method, Ms=' '.join(METHODS)))
+    pvals_2d = np.atleast_2d(pvals)
+    if pvals_2d.shape[1] == 0:
+        return pvals.copy()
+    if method == 'bonferroni':
+        corrected = pvals_2d*pvals_2d.shape[1]
+    elif method == 'sidak':
+        with np.errstate(divide='ignore'):
+            corrected = -np.expm1(pvals_2d.shape[1]*np.log1p(-pvals_2d))
+    else:
+        corrected = _get_corrected_stepwise(pvals_2d, method)
+    np.minimum(corrected, 1.0, out=corrected)
+    return corrected.reshape(pvals.shape)
+
+
+def _get_corrected_stepwise(pvals, method):
+    """Correct p-values which depend on their rank: holm, hommel, fdr_bh, fdr_by"""
+    num = pvals.shape[1]
+    order = np.argsort(pvals, axis=1)
+    srt = np.take_along_axis(pvals, order, axis=1)
+    if method == 'holm':
+        corrected = np.maximum.accumulate(srt*(num - np.arange(num)), axis=1)
+    elif method == 'hommel':
+        corrected = _get_hommel(srt)
+    else:
+        # Benjamini-Hochberg; Benjamini-Yekutieli also divides by the harmonic sum
+        ecdf = np.arange(1, num + 1)/num
+        if method == 'fdr_by':
+            ecdf = ecdf/np.sum(1.0/np.arange(1, num + 1))
+        corrected = np.minimum.accumulate((srt/ecdf)[:, ::-1], axis=1)[:, ::-1]
+    unsorted = np.empty_like(corrected)
+    np.put_along_axis(unsorted, order, corrected, axis=1)
+    return unsorted
+
+
+def _get_hommel(srt):
+    """Hommel's closed method based on Simes tests, for each row of sorted p-values"""
+    num = srt.shape[1]
+    corrected = srt.copy()
+    for mval in range(num, 1, -1):
+        # Smallest Simes-adjusted p-value of the mval largest p-values in each row
+        cim = np.min(mval*srt[:, -mval:]/np.arange(1, mval + 1), axis=1)[:, None]
+        np.maximum(corrected[:, -mval:], cim, out=corrected[:, -mval:])
+        np.maximum(corrected[:, :-mval], np.minimum(mval*srt[:, :-mval], cim),
+                   out=corrected[:, :-mval])
+    return corrected
+
+
+# Copyright (C) 2010-present, H Tang et al., All rights reserved.
@@ -8,13 +8,21 @@
 # -*- coding: UTF-8 -*-
 import os
 import textwrap
+import weakref
 
 from sys import stderr, stdout
 from typing import Optional
 
+from .godag.memo import TraversalMemo
 from .godag.obo_optional_attributes import OboOptionalAttrs
 from .godag.typedef import TypeDef, add_to_typedef
 
+# GOTerm -> weakref to the traversal memo (TraversalMemo) of the GODag holding the GO term.
+# Kept off the GOTerm, so GOTerm data members are only GO term data
+_GOTERM2MEMO = weakref.WeakKeyDictionary()
+# id(GODag) -> GODag. GO terms are linked to their GODag's memo when a traversal first needs it
+_GODAGS = weakref.WeakValueDictionary()
+
 GraphEngines = ("pygraphviz", "pydot")
 
 __copyright__ = "Copyright (C) 2010-2018, H Tang et al., All rights reserved."
@@ -207,65 +215,53 @@ class GOTerm(object):
 
     def has_parent(self, term):
         """Return True if this GO object has a parent GO ID."""
-        for parent in self.parents:
-            if parent.item_id == term or parent.has_parent(term):
-                return True
-        return False
+        return term in self._get_all("parents")
 
     def has_child(self, term):
         """Return True if this GO object has a child GO ID."""
-        for parent in self.children:
-            if parent.item_id == term or parent.has_child(term):
-                return True
-        return False
+        return term in self._get_all("children")
 
     def get_all_parents(self):
         """Return all parent GO IDs."""
-        all_parents = set()
-        for parent in self.parents:
-            all_parents.add(parent.item_id)
-            all_parents |= parent.get_all_parents()
-        return all_parents
+        return set(self._get_all("parents"))
 
     def get_all_upper(self):
         """Return all parent GO IDs through both 'is_a' and all relationships."""
-        all_upper = set()
-        for upper in self.get_goterms_upper():
-            all_upper.add(upper.item_id)
-            all_upper |= upper.get_all_upper()
-        return all_upper
+        return set(self._get_all("upper"))
 
     def get_all_children(self):
         """Return all children GO IDs."""
-        all_children = set()
-        for parent in self.children:
-            all_children.add(parent.item_id)
-            all_children |= parent.get_all_children()
-        return all_children
+        return set(self._get_all("children"))
 
     def get_all_lower(self):
         """Return all parent GO IDs through both reverse 'is_a' and all relationships."""
-        all_lower = set()
-        for lower in self.get_goterms_lower():
-            all_lower.add(lower.item_id)
-            all_lower |= lower.get_all_lower()
-        return all_lower
+        return set(self._get_all("lower"))
 
     def get_all_parent_edges(self):
         """Return tuples for all parent GO IDs, containing current GO ID and parent GO ID."""
-        all_parent_edges = set()
-        for parent in self.parents:
-            all_parent_edges.add((self.item_id, parent.item_id))
-            all_parent_edges |= parent.get_all_parent_edges()
-        return all_parent_edges
+        return set(self._get_all("parent_edges"))
 
     def get_all_child_edges(self):
         """Return tuples for all child GO IDs, containing current GO ID and child GO ID."""
-        all_child_edges = set()
-        for parent in self.children:
-            all_child_edges.add((parent.item_id, self.item_id))
-            all_child_edges |= parent.get_all_child_edges()
-        return all_child_edges
+        return set(self._get_all("child_edges"))
+
+    def _get_all(self, kind):
+        """Get a frozenset of all GO IDs or edges, stored in the GODag's memo if there is one."""
+        memoref = _GOTERM2MEMO.get(self)
+        memo = memoref() if memoref is not None else None
+        if memo is None:
+            memo = self._get_memo()
+        return memo.get(self, kind)
+
+    def _get_memo(self):
+        """Link all GO terms in this GO term's GODag to the GODag's memo. Return the memo"""
+        # pylint: disable=protected-access
+        for godag in list(_GODAGS.values()):
+            if godag.get(self.item_id) is self:
+                godag._link_memo()
+                return godag._memo
+        # Not in a GODag
+        return TraversalMemo()
 
     def get_goterms_upper(self):
         """Returns a set containing parents and all relationship GO Terms."""
@@ -312,15 +308,111 @@ class GODag(dict):
         optional_attrs: Optional[set] = None,
         load_obsolete: bool = False,
         prt=stdout,
+        cache: bool = False,
+        memo_maxsize: Optional[int] = None,
     ):
         super().__init__()
-        self.version, self.data_version = self.load_obo_file(
-            obo_file, optional_attrs, load_obsolete, prt
-        )
+        # cache: Load from (or write) a binary cache file next to the obo file
+        if cache and os.path.isfile(obo_file):
+            self.version, self.data_version = self.load_obo_cache(
+                obo_file, optional_attrs, load_obsolete, prt
+            )
+        else:
+            self.version, self.data_version = self.load_obo_file(
+                obo_file, optional_attrs, load_obsolete, prt
+            )
+        # All ancestors/descendants found by GOTerm.get_all_* (memo_maxsize: optional LRU bound)
+        # Made after loading, so GO terms are loaded with plain dict inserts.
+        # GO terms are linked to the memo by the first traversal which needs it
+        self._memo = TraversalMemo(memo_maxsize)
+        _GODAGS[id(self)] = self
+
+    def load_obo_cache(self, obo_file, optional_attrs, load_obsolete, prt):
+        """Load the GO DAG from its binary cache. Write the cache if it is missing or stale."""
+        from .godag.obo_cache import OboCache
+
+        objcache = OboCache(obo_file, optional_attrs, load_obsolete)
+        ret = objcache.load(self)
+        if ret is None:
+            self.clear()
+            ret = self.load_obo_file(obo_file, optional_attrs, load_obsolete, prt)
+            self.version, self.data_version = ret
+            objcache.save(self)
+        elif prt:
+            prt.write("{DESC}\n".format(DESC=ret[0]))
+        return ret
+
+    def __setitem__(self, goid, rec):
+        super().__setitem__(goid, rec)
+        # No memo while loading or unpickling: GO terms are linked to the memo when first needed
+        if "_memo" in self.__dict__:
+            _GOTERM2MEMO[rec] = weakref.ref(self._memo)
+            self.clear_memo()
+
+    def __setstate__(self, state):
+        """Restore the data members of an unpickled GODag and link its GO terms to its memo"""
+        self.__dict__.update(state)
+        _GODAGS[id(self)] = self
+
+    def _link_memo(self):
+        """Link all GO terms to this GO DAG's memo"""
+        memoref = weakref.ref(self._memo)
+        for rec in self.values():
+            _GOTERM2MEMO[rec] = memoref
+
+    def __delitem__(self, goid):
+        super().__delitem__(goid)
+        if "_memo" in self.__dict__:
+            self.clear_memo()
+
+    def clear_memo(self):
+        """Clear stored traversals, compact DAG, closures, GO slim mappers and propagated associations.
+
+        Call this after editing GO term edges.
+        """
+        self._memo.clear()
+        self.__dict__.pop("_compact", None)
+        self.__dict__.pop("_closures", None)
+        self.__dict__.pop("_slimmappers", None)
+        self.__dict__.pop("_propagated", None)
+
+    def get_compact(self):
+        """Get a CompactGODag (integer-indexed GO IDs and sparse edges) of this GO DAG."""
+        objcmp = getattr(self, "_compact", None)
+        if objcmp is None:
+            from .godag.compact import CompactGODag
+
+            objcmp = CompactGODag(self)
+            self._compact = objcmp
+        return objcmp
+
+    def get_closure(self, relationships=None, fin_npz=None):
+        """Get all ancestors and descendants of all GO terms, built once per relationship set.
+
+        fin_npz: Optional file to read the closure from, or to write it to if missing or stale
+        """
+        from .godag.closure import ClosureIndex
+
+        objcmp = self.get_compact()
+        # pylint: disable=protected-access
+        key = objcmp._get_rels(relationships)
+        rels2closure = self.__dict__.setdefault("_closures", {})
+        objclo = rels2closure.get(key)
+        if objclo is None:
+            if fin_npz is not None:
+                objclo = ClosureIndex.load(fin_npz, objcmp, relationships)
+            if objclo is None:
+                objclo = ClosureIndex(objcmp, relationships)
+                if fin_npz is not None:
+                    objclo.save(fin_npz)
+            rels2closure[key] = objclo
+        return objclo
 
     def load_obo_file(self, obo_file, optional_attrs, load_obsolete, prt):
         """Read obo file. Store results."""
         reader = OBOReader(obo_file, optional_attrs)
+        # Plain dict inserts: GO terms are linked to the memo after loading
+        setitem = super().__setitem__
 
         # Save alt_ids and their corresponding main GO ID. Add to GODag after populating GO Terms
         alt2rec = {}
@@ -329,7 +421,7 @@ class GODag(dict):
             #   1) Argument load_obsolete is True OR
             #   2) Argument load_obsolete is False and the GO term is "live" (not obsolete)
             if load_obsolete or not rec.is_obsolete:
-                self[rec.item_id] = rec
+                setitem(rec.item_id, rec)
                 for alt in rec.alt_ids:
                     alt2rec[alt] = rec
 
@@ -342,7 +434,7 @@ class GODag(dict):
 
         # Add alt_ids to go2obj
         for goid_alt, rec in alt2rec.items():
-            self[goid_alt] = rec
+            setitem(goid_alt, rec)
         desc = self._str_desc(reader)
         if prt:
             prt.write("{DESC}\n".format(DESC=desc))
@@ -476,27 +568,45 @@ class GODag(dict):
             stderr.write("Term %s not found!\n" % term)
             return
 
-        def _get_upper(rec):
-            """Return the set of upper-neighbours to traverse."""
-            if relationships is None:
-                return rec.parents
-            if relationships is True:
-                return rec.get_goterms_upper()
-            return rec.get_goterms_upper_rels(relationships)
-
-        def _paths_to_top_recursive(rec):
-            if rec.level == 0:
-                return [[rec]]
-            paths = []
-            for parent in _get_upper(rec):
-                top_paths = _paths_to_top_recursive(parent)
-                for top_path in top_paths:
-                    top_path.append(rec)
-                    paths.append(top_path)
-            return paths
-
-        go_term = self[term]
-        return _paths_to_top_recursive(go_term)
+        return list(self.iter_paths_to_top(term, relationships))
+
+    def iter_paths_to_top(self, term, relationships=None, max_paths=None, max_len=None):
+        """Yield the paths to the root node one at a time, in the same order as paths_to_top.
+
+        Each path is a list of GO Terms ordered top -> bottom, ending with the given term.
+        - relationships: Same as paths_to_top
+        - max_paths: Stop after this many paths
+        - max_len: Skip paths containing more than this many GO terms
+        """
+        from .gosubdag.go_paths import iter_paths
+
+        for path in iter_paths(self[term], self._get_fnc_upper(relationships),
+                               lambda rec: rec.level == 0, max_paths, max_len):
+            path.reverse()
+            yield path
+
+    def get_num_paths_to_top(self, term, relationships=None):
+        """Count the paths to the root node without listing them: one pass over the DAG."""
+        from .gosubdag.go_paths import get_num_paths
+
+        return get_num_paths(self[term], self._get_fnc_upper(relationships),
+                             lambda rec: rec.level == 0)
+
+    def get_nodes_edges_to_top(self, term, relationships=None):
+        """Get all GO terms and (child, parent) edges on all paths to the root node."""
+        from .gosubdag.go_paths import get_nodes_edges
+
+        return get_nodes_edges(self[term], self._get_fnc_upper(relationships),
+                               lambda rec: rec.level == 0)
+
+    @staticmethod
+    def _get_fnc_upper(relationships):
+        """Return the function which returns the upper-neighbours to traverse."""
+        if relationships is None:
+            return lambda rec: rec.parents
+        if relationships is True:
+            return lambda rec: rec.get_goterms_upper()
+        return lambda rec: rec.get_goterms_upper_rels(relationships)
 
     def label_wrap(self, label, wrap_width):
         name = self[label].name
@@ -685,13 +795,14 @@ class GODag(dict):
     def update_association(self, association):
         """Add the GO parents of a gene's associated GO IDs to the gene's association."""
         bad_goids = set()
+        get_ancestors = self.get_closure().get_ancestors
         # Loop through all sets of GO IDs for all genes
         for goids in association.values():
             parents = set()
             # Iterate thru each GO ID in the current gene's association
             for goid in goids:
                 try:
-                    parents.update(self[goid].get_all_parents())
+                    parents.update(get_ancestors(goid))
                 except:
                     bad_goids.add(goid.strip())
             # Add the GO parents of all GO IDs in the current gene's association
@@ -8,6 +8,8 @@ __author__ = "DV Klopfenstein"
 import collections as cx
 import sys
 
+import numpy as np
+
 
 class PvalCalcBase(object):
     """Base class for initial p-value calculations."""
@@ -16,6 +18,8 @@ class PvalCalcBase(object):
         self.log = log
         self.name = name
         self.pval_fnc = pval_fnc
+        # Used to find the smallest p-value each GO term can reach
+        self._objvec = None
 
     def calc_pvalue(self, study_count, study_n, pop_count, pop_n):
         """pvalues are calculated in derived classes."""
@@ -24,6 +28,23 @@ class PvalCalcBase(object):
         )
         raise NotImplementedError(f"NOT IMPLEMENTED: {fnc_call} using {self.pval_fnc}.")
 
+    def calc_pvalues(self, study_counts, study_n, pop_counts, pop_n):
+        """Calculate uncorrected p-values for many GO terms sharing one study and population."""
+        calc_pvalue = self.calc_pvalue
+        return np.array(
+            [
+                calc_pvalue(scnt, study_n, pcnt, pop_n)
+                for scnt, pcnt in zip(study_counts, pop_counts)
+            ],
+            dtype=float,
+        )
+
+    def calc_min_pvalues(self, study_n, pop_counts, pop_n):
+        """Get the smallest p-value each GO term can reach, over all possible study counts."""
+        if self._objvec is None:
+            self._objvec = FisherVectorized("fisher_vectorized", self.log)
+        return self._objvec.calc_min_pvalues(study_n, pop_counts, pop_n)
+
 
 class FisherScipyStats(PvalCalcBase):
     """From the scipy stats package, use function, fisher_exact."""
@@ -71,12 +92,261 @@ class FisherScipyStats(PvalCalcBase):
         return p_uncorrected
 
 
+class FisherVectorized(PvalCalcBase):
+    """Fisher's exact test (two-sided) for all GO terms in one vectorized hypergeometric pass.
+
+    P-values match scipy.stats.fisher_exact: the two-sided p-value is the sum of
+    the hypergeometric probabilities which are no more likely than the observed table.
+    """
+
+    fmterr = FisherScipyStats.fmterr
+
+    # Relative tolerance used when comparing probabilities. Tables which are equally
+    # likely in theory (e.g., mirror images) may differ by rounding in log-space.
+    epsilon = 1e-7
+    # Maximum number of values computed at once; bounds memory for large study sets
+    max_block = 1 << 21
+
+    def __init__(self, name, log):
+        super().__init__(name, self.calc_pvalues, log)
+        self.lnfact = np.zeros(1)
+
+    def calc_pvalue(self, study_count, study_n, pop_count, pop_n):
+        """Calculate one uncorrected p-value."""
+        return float(self.calc_pvalues([study_count], study_n, [pop_count], pop_n)[0])
+
+    def calc_pvalues(self, study_counts, study_n, pop_counts, pop_n):
+        """Calculate uncorrected p-values for all GO terms in one pass."""
+        study_counts = np.asarray(study_counts, dtype=np.int64)
+        pop_counts = np.asarray(pop_counts, dtype=np.int64)
+        if not study_counts.size:
+            return np.zeros(0)
+        self._chk_counts(study_counts, study_n, pop_counts, pop_n)
+        # All terms which share a population count share one hypergeometric distribution
+        pop_counts_uniq, idxs_uniq = np.unique(pop_counts, return_inverse=True)
+        lows, offsets, pvals = self.get_pval_tables(study_n, pop_counts_uniq, pop_n)
+        return pvals[offsets[idxs_uniq] + study_counts - lows[idxs_uniq]]
+
+    def calc_min_pvalues(self, study_n, pop_counts, pop_n):
+        """Get the smallest p-value each GO term can reach, over all possible study counts.
+
+        Depends only on the margins (study_n, pop_count, pop_n), not on the study count.
+        """
+        pop_counts = np.asarray(pop_counts, dtype=np.int64)
+        if not pop_counts.size:
+            return np.zeros(0)
+        pop_counts_uniq, idxs_uniq = np.unique(pop_counts, return_inverse=True)
+        _, offsets, pvals = self.get_pval_tables(study_n, pop_counts_uniq, pop_n)
+        return np.minimum.reduceat(pvals, offsets)[idxs_uniq]
+
+    def get_pval_tables(self, study_n, pop_counts, pop_n):
+        """Get the p-value of every possible study count, for each population count.
+
+        Returns the lowest possible study count and the table offset for each
+        population count, and one flat array holding all p-value tables:
+            pvals[offsets[i] + study_count - lows[i]]
+        """
+        pop_counts = np.asarray(pop_counts, dtype=np.int64)
+        lows = np.maximum(0, study_n + pop_counts - pop_n)
+        widths = np.minimum(study_n, pop_counts) - lows + 1
+        offsets = np.zeros(pop_counts.size, dtype=np.int64)
+        np.cumsum(widths[:-1], out=offsets[1:])
+        pvals = np.ones(int(widths.sum()))
+        # Distributions with similar widths are calculated together in 2-D blocks
+        buckets = np.ceil(np.log2(widths)).astype(int) if widths.size else widths
+        for bucket in np.unique(buckets):
+            idxs = np.flatnonzero(buckets == bucket)
+            width = int(widths[idxs].max())
+            rows = max(1, self.max_block // width)
+            for beg in range(0, idxs.size, rows):
+                blk = idxs[beg:beg + rows]
+                tbl = self._get_pval_block(
+                    study_n, pop_counts[blk], pop_n, lows[blk], widths[blk], width
+                )
+                cols = np.arange(width)[None, :]
+                keep = cols < widths[blk][:, None]
+                pvals[(offsets[blk][:, None] + cols)[keep]] = tbl[keep]
+        return lows, offsets, pvals
+
+    def _get_pval_block(self, study_n, pop_counts, pop_n, lows, widths, width):
+        """Two-sided p-values for a block of hypergeometric distributions."""
+        lnfact = self._get_lnfact(pop_n)
+        cols = np.arange(width)[None, :]
+        valid = cols < widths[:, None]
+        xvals = lows[:, None] + np.where(valid, cols, 0)
+        # Hypergeometric: C(study_n, x) * C(pop_n-study_n, pop_count-x) / C(pop_n, pop_count)
+        pcnts = pop_counts[:, None]
+        lnpmf = (
+            lnfact[study_n]
+            - lnfact[xvals]
+            - lnfact[study_n - xvals]
+            + lnfact[pop_n - study_n]
+            - lnfact[pcnts - xvals]
+            - lnfact[pop_n - study_n - pcnts + xvals]
+            - lnfact[pop_n]
+            + lnfact[pcnts]
+            + lnfact[pop_n - pcnts]
+        )
+        pmf = np.where(valid, np.exp(lnpmf), 0.0)
+        # Sum the probabilities of all tables which are no more likely than each table
+        order = np.argsort(pmf, axis=1, kind="stable")
+        pmf_sorted = np.take_along_axis(pmf, order, axis=1)
+        cumsum = np.cumsum(pmf_sorted, axis=1)
+        # Find the last sorted probability which is <= the current probability * gamma
+        # A unimodal distribution has at most two probabilities of any nonzero value
+        thresholds = pmf_sorted * (1 + self.epsilon)
+        last = np.arange(width)[None, :].repeat(pmf.shape[0], axis=0)
+        while True:
+            nxt = np.minimum(last + 1, width - 1)
+            extend = (
+                (nxt != last)
+                & (pmf_sorted != 0.0)
+                & (np.take_along_axis(pmf_sorted, nxt, axis=1) <= thresholds)
+            )
+            if not extend.any():
+                break
+            last = np.where(extend, nxt, last)
+        pvals = np.empty_like(pmf)
+        np.put_along_axis(pvals, order, np.take_along_axis(cumsum, last, axis=1), axis=1)
+        # A table as likely as the most likely table has a p-value of 1
+        pmode = pmf.max(axis=1)[:, None]
+        pvals[np.abs(pmf - pmode) <= self.epsilon * pmode] = 1.0
+        return np.minimum(pvals, 1.0)
+
+    def _get_lnfact(self, pop_n):
+        """Get a table of log-factorials, sized to the population."""
+        if self.lnfact.size <= pop_n:
+            from scipy.special import gammaln
+
+            self.lnfact = gammaln(np.arange(pop_n + 1, dtype=float) + 1)
+        return self.lnfact
+
+    def _chk_counts(self, study_counts, study_n, pop_counts, pop_n):
+        """Check that no study count is larger than its population count."""
+        bad = np.flatnonzero(study_counts > pop_counts)
+        if bad.size:
+            idx = bad[0]
+            scnt = study_counts[idx]
+            pcnt = pop_counts[idx]
+            raise AssertionError(
+                self.fmterr.format(
+                    A=scnt,
+                    B=study_n - scnt,
+                    C=pcnt - scnt,
+                    D=pop_n - pcnt - study_n + scnt,
+                    scnt=scnt,
+                    stot=study_n,
+                    pcnt=pcnt,
+                    ptot=pop_n,
+                )
+            )
+
+
+class PvalTableCache(object):
+    """Least-recently-used cache of Fisher p-value tables and log-factorials.
+
+    One p-value table holds the p-value of every possible study count for one
+    (pop_n, pop_count, study_n). The size of the cache is bounded by the number of
+    p-values held in all tables (max_values). Hits and misses are counted for tuning.
+    """
+
+    NtInfo = cx.namedtuple("NtInfo", "hits misses tables values max_values")
+
+    def __init__(self, max_values=1 << 23):
+        self.max_values = max_values
+        self.key2tbl = cx.OrderedDict()
+        self.num_values = 0
+        self.hits = 0
+        self.misses = 0
+        self.lnfact = np.zeros(1)
+
+    def get(self, key):
+        """Get a p-value table; None if it is not cached"""
+        tbl = self.key2tbl.get(key)
+        if tbl is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.key2tbl.move_to_end(key)
+        return tbl
+
+    def put(self, key, tbl):
+        """Cache a p-value table; Remove the least-recently-used tables if needed"""
+        if tbl.size > self.max_values:
+            return
+        key2tbl = self.key2tbl
+        if key in key2tbl:
+            self.num_values -= key2tbl.pop(key).size
+        key2tbl[key] = tbl
+        self.num_values += tbl.size
+        while self.num_values > self.max_values:
+            self.num_values -= key2tbl.popitem(last=False)[1].size
+
+    def get_lnfact(self, pop_n):
+        """Get a table of log-factorials, sized to the largest population seen"""
+        if self.lnfact.size <= pop_n:
+            from scipy.special import gammaln
+
+            self.lnfact = gammaln(np.arange(pop_n + 1, dtype=float) + 1)
+        return self.lnfact
+
+    def get_info(self):
+        """Get the number of hits and misses and the size of the cache"""
+        return self.NtInfo(hits=self.hits, misses=self.misses, tables=len(self.key2tbl),
+                           values=self.num_values, max_values=self.max_values)
+
+    def clear(self):
+        """Remove all tables and reset the counters"""
+        self.key2tbl.clear()
+        self.num_values = 0
+        self.hits = 0
+        self.misses = 0
+
+
+class FisherCached(FisherVectorized):
+    """Vectorized Fisher's exact test, reusing p-value tables across studies and GOEAs.
+
+    P-value tables are kept in a cache shared by all FisherCached objects in a process,
+    so GOEAs on the same population (e.g., one GOEA per study) calculate each table once.
+    """
+
+    # Shared by all GOEAs in this process. Ex: FisherCached.cache.get_info()
+    cache = PvalTableCache()
+
+    def get_pval_tables(self, study_n, pop_counts, pop_n):
+        """Get the p-value of every possible study count, for each population count.
+
+        Same as FisherVectorized.get_pval_tables; only tables not in the cache are calculated.
+        """
+        pop_counts = np.asarray(pop_counts, dtype=np.int64)
+        cache = self.cache
+        keys = [(pop_n, pcnt, study_n) for pcnt in pop_counts.tolist()]
+        tbls = [cache.get(key) for key in keys]
+        missing = [i for i, tbl in enumerate(tbls) if tbl is None]
+        if missing:
+            _, offsets, pvals = super().get_pval_tables(study_n, pop_counts[missing], pop_n)
+            ends = np.append(offsets[1:], pvals.size).tolist()
+            for idx, beg, end in zip(missing, offsets.tolist(), ends):
+                tbls[idx] = pvals[beg:end].copy()
+                cache.put(keys[idx], tbls[idx])
+        lows = np.maximum(0, study_n + pop_counts - pop_n)
+        offsets = np.zeros(pop_counts.size, dtype=np.int64)
+        np.cumsum(np.array([tbl.size for tbl in tbls[:-1]], dtype=np.int64), out=offsets[1:])
+        return lows, offsets, np.concatenate(tbls) if tbls else np.ones(0)
+
+    def _get_lnfact(self, pop_n):
+        """Get a table of log-factorials, shared by all FisherCached objects"""
+        return self.cache.get_lnfact(pop_n)
+
+
 class FisherFactory(object):
     """Factory for choosing a fisher function."""
 
     options = cx.OrderedDict(
         [
             ("fisher_scipy_stats", FisherScipyStats),
+            ("fisher_vectorized", FisherVectorized),
+            ("fisher_cached", FisherCached),
         ]
     )
 
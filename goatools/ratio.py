@@ -6,10 +6,16 @@ __author__ = "various"
 
 from collections import defaultdict, Counter
 
+from goatools.anno.assc_matrix import AsscView
+
 
 def count_terms(geneset, assoc, obo_dag):
     """count the number of terms in the study group
     """
+    if isinstance(assoc, AsscView):
+        gene2idx = assoc.assc_mtx.gene2idx
+        goitems = assoc.assc_mtx.get_goitems(rows=[gene2idx[g] for g in geneset if g in gene2idx])
+        return Counter(goitems.get_go2cnt())
     term_cnt = Counter()
     for gene in (g for g in geneset if g in assoc):
         for goid in assoc[gene]:
@@ -20,8 +26,12 @@ def count_terms(geneset, assoc, obo_dag):
 
 def get_terms(desc, geneset, assoc, obo_dag, log):
     """Get the terms in the study group
+
+    Returns GoItems for a read-only association (AsscView); otherwise a dict of sets
     """
-    _chk_gene2go(assoc)
+    chk_gene2go(assoc)
+    if isinstance(assoc, AsscView):
+        return get_goitems(desc, geneset, assoc.assc_mtx, log)
     term2itemids = defaultdict(set)
     genes = [g for g in geneset if g in assoc]
     for gene in genes:
@@ -32,6 +42,18 @@ def get_terms(desc, geneset, assoc, obo_dag, log):
         _prt_log_items_found(log, desc, genes, geneset)
     return term2itemids
 
+def get_goitems(desc, geneset, assc_mtx, log):
+    """Get the terms of the genes in a gene-by-GO matrix (AsscMatrix)
+
+    Returns a read-only mapping of GO IDs to items (GoItems); item sets are made when used
+    """
+    geneset = list(geneset)
+    gene2idx = assc_mtx.gene2idx
+    rows = [gene2idx[g] for g in geneset if g in gene2idx]
+    if log is not None:
+        _prt_log_items_found(log, desc, rows, geneset)
+    return assc_mtx.get_goitems(rows=list(dict.fromkeys(rows)))
+
 def _prt_log_items_found(log, desc, genes, geneset):
     """Summarize study and population items found in the annotations"""
     num_stu = len(genes)
@@ -57,7 +79,7 @@ def is_ratio_different(min_ratio, study_go, study_n, pop_go, pop_n):
         return stu_ratio / pop_ratio > min_ratio
     return pop_ratio / stu_ratio > min_ratio
 
-def _chk_gene2go(assoc):
+def chk_gene2go(assoc):
     """Check that associations is gene2go, not go2gene."""
     if not assoc:
         raise RuntimeError("NO ITEMS FOUND IN ASSOCIATIONS {A}".format(A=assoc))
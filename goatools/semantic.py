@@ -7,12 +7,14 @@ check out:
 notebooks/semantic_similarity.ipynb
 """
 
+import math
 import sys
 from collections import Counter, defaultdict, deque
 
 from .anno.update_association import clean_anno
-from .godag.consts import NAMESPACE2GO, NAMESPACE2NS
+from .godag.consts import NAMESPACE2GO, NAMESPACE2NS, NS2NAMESPACE
 from .godag.go_tasks import get_go2ancestors
+from .godag.closure import get_closure
 from .godag.relationship_combos import RelationshipCombos
 from .gosubdag.gosubdag import GoSubDag
 from .utils import get_b2aset
@@ -21,6 +23,10 @@ from .utils import get_b2aset
 class TermCounts:
     """
     TermCounts counts the term counts for each
+
+    The counts of one namespace (get_termcounts_ns) reuse the ancestors found here.
+    Annotations can be added or removed (update_annotations); only the counts, term
+    frequencies and information content (IC) of the GO IDs which change are updated.
     """
 
     # pylint: disable=too-many-instance-attributes
@@ -38,37 +44,87 @@ class TermCounts:
         self.go2obj = go2obj  # Full GODag
         self.annots, go_alts = clean_anno(annots, go2obj, _prt)[:2]
         # Genes annotated to all associated GO, including inherited up ancestors'
-        _relationship_set = RelationshipCombos(go2obj).get_set(relationships)
-        self.go2genes = self._init_go2genes(_relationship_set, go2obj)
-        self.gene2gos = get_b2aset(self.go2genes)
-        # Annotation main GO IDs (prefer main id to alt_id)
-        self.goids = set(self.go2genes.keys())
-        self.gocnts = Counter(
-            {go: len(geneset) for go, geneset in self.go2genes.items()}
-        )
-        # Get total count for each branch: BP MF CC
-        self.aspect_counts = {
-            "biological_process": self.gocnts.get(
-                NAMESPACE2GO["biological_process"], 0
-            ),
-            "molecular_function": self.gocnts.get(
-                NAMESPACE2GO["molecular_function"], 0
-            ),
-            "cellular_component": self.gocnts.get(
-                NAMESPACE2GO["cellular_component"], 0
-            ),
-        }
-        self._init_add_goid_alt(go_alts)
-        self.gosubdag = GoSubDag(
-            set(self.gocnts.keys()),
-            go2obj,
-            tcntobj=self,
-            relationships=_relationship_set,
-            prt=None,
-        )
+        self.relationships = RelationshipCombos(go2obj).get_set(relationships)
+        self.go2genes = self._init_go2genes(self.relationships, go2obj)
+        self._init_counts(go_alts)
         if _prt:
             self.prt_objdesc(_prt)
 
+    @property
+    def gosubdag(self):
+        """GO DAG subset holding the counts, frequencies and IC of the annotated GO IDs"""
+        if self._gosubdag is None:
+            self._gosubdag = GoSubDag(
+                set(self.gocnts.keys()),
+                self.go2obj,
+                tcntobj=self,
+                relationships=self.relationships,
+                prt=None,
+            )
+        return self._gosubdag
+
+    def get_termcounts_ns(self, namespace):
+        """Get TermCounts for annotations in one namespace (BP, MF, CC or a namespace name)"""
+        nspc = NS2NAMESPACE.get(namespace, namespace)
+        go2obj = self.go2obj
+        objns = self.__class__.__new__(self.__class__)
+        objns.go2obj = go2obj
+        objns.relationships = self.relationships
+        objns.annots = {}
+        for geneid, goids in self.annots.items():
+            goids_ns = set(go for go in goids if go2obj[go].namespace == nspc)
+            if goids_ns:
+                objns.annots[geneid] = goids_ns
+        if self.relationships:
+            # Relationships, like regulates, may reach ancestors in other namespaces
+            objns.go2genes = objns._init_go2genes(self.relationships, go2obj)
+        else:
+            objns.go2genes = {go: set(genes) for go, genes in self.go2genes.items()
+                              if go not in self._go_alts and go2obj[go].namespace == nspc}
+        objns._init_counts(set(go for go in self._go_alts if go2obj[go].namespace == nspc))
+        return objns
+
+    def update_annotations(self, add=None, remove=None, prt=None):
+        """Add and remove gene-to-GO annotations. Return the GO IDs whose counts changed.
+
+        Only the counts of the changed GO IDs are updated. Their frequencies and IC are
+        updated too, as are those of all GO IDs in a namespace whose total count changed.
+        """
+        add, go_alts = clean_anno(add, self.go2obj, prt)[:2] if add else ({}, set())
+        remove = clean_anno(remove, self.go2obj, prt)[0] if remove else {}
+        get_ancestors = self._get_fnc_ancestors(self.relationships, self.go2obj)
+        # Alternate GO IDs new to the annotations get counts
+        goids_chg = go_alts.difference(self._go_alts)
+        self._go_alts.update(go_alts)
+        for geneid in set(add).union(remove):
+            if geneid not in self.annots and geneid not in add:
+                continue
+            goids_old = self.annots.get(geneid, set())
+            goids_new = goids_old.difference(remove.get(geneid, ())).union(add.get(geneid, ()))
+            self.annots[geneid] = goids_new
+            allterms_old = self.gene2gos.get(geneid, set())
+            allterms_new = self._get_allterms(goids_new, get_ancestors)
+            for goid in allterms_old.difference(allterms_new):
+                genes = self.go2genes[goid]
+                genes.discard(geneid)
+                if not genes:
+                    del self.go2genes[goid]
+            for goid in allterms_new.difference(allterms_old):
+                self.go2genes.setdefault(goid, set()).add(geneid)
+            goids_chg.update(allterms_old.symmetric_difference(allterms_new))
+            if allterms_new:
+                self.gene2gos[geneid] = allterms_new
+            else:
+                self.gene2gos.pop(geneid, None)
+        self._update_counts(goids_chg)
+        return goids_chg
+
+    def save(self, fout_npz, data_version=None, anno_date=None):
+        """Write counts, frequencies and IC to a file, which ICTable.load reads"""
+        from .semsim.ic_table import save_ic_table
+
+        save_ic_table(fout_npz, self, data_version, anno_date)
+
     def get_annotations_reversed(self):
         """Return go2geneset for all GO IDs explicitly annotated to a gene"""
         go2genes = get_b2aset(self.annots)
@@ -76,6 +132,70 @@ class TermCounts:
             return set.union(*go2genes.values())
         return set()
 
+    def _init_counts(self, go_alts):
+        """Count the genes annotated to each GO ID; go2genes holds main GO IDs"""
+        self.gene2gos = get_b2aset(self.go2genes)
+        # Annotation main GO IDs (prefer main id to alt_id)
+        self.goids = set(self.go2genes.keys())
+        self.gocnts = Counter(
+            {go: len(geneset) for go, geneset in self.go2genes.items()}
+        )
+        # Get total count for each branch: BP MF CC
+        self.aspect_counts = self._get_aspect_counts()
+        self._go_alts = set()
+        self._init_add_goid_alt(go_alts)
+        # Created when first needed
+        self._gosubdag = None
+
+    def _get_aspect_counts(self):
+        """Get total count for each branch: BP MF CC"""
+        return {ns: self.gocnts.get(go, 0) for ns, go in NAMESPACE2GO.items()}
+
+    def _update_counts(self, goids_chg):
+        """Update the counts, frequencies and IC of GO IDs whose gene sets changed"""
+        gocnts = self.gocnts
+        for goid in goids_chg:
+            if goid in self.go2genes:
+                gocnts[goid] = len(self.go2genes[goid])
+                self.goids.add(goid)
+            else:
+                gocnts.pop(goid, None)
+                self.goids.discard(goid)
+        for go_alt in list(self._go_alts):
+            goid_main = self.go2obj[go_alt].item_id
+            if goid_main in goids_chg:
+                goids_chg.add(go_alt)
+            if goid_main in self.go2genes:
+                gocnts[go_alt] = gocnts[goid_main]
+                self.go2genes[go_alt] = self.go2genes[goid_main]
+            else:
+                gocnts.pop(go_alt, None)
+                self.go2genes.pop(go_alt, None)
+                self._go_alts.discard(go_alt)
+        aspect_counts = self._get_aspect_counts()
+        namespaces = set(ns for ns, cnt in aspect_counts.items()
+                         if cnt != self.aspect_counts[ns])
+        self.aspect_counts = aspect_counts
+        if self._gosubdag is not None:
+            self._update_go2nt(goids_chg, namespaces)
+
+    def _update_go2nt(self, goids_chg, namespaces):
+        """Update count, frequency and IC in the GoSubDag; new GO IDs need a new GoSubDag"""
+        go2nt = self._gosubdag.go2nt
+        if not goids_chg.issubset(go2nt):
+            self._gosubdag = None
+            return
+        go2obj = self.go2obj
+        goids = set(goids_chg)
+        if namespaces:
+            goids.update(go for go in go2nt if go2obj[go].namespace in namespaces)
+        for goid in goids:
+            tfreq = self.get_term_freq(goid)
+            go2nt[goid] = go2nt[goid]._replace(
+                tcnt=self.gocnts.get(goid, 0),
+                tfreq=tfreq,
+                tinfo=0.0 - math.log(tfreq) if tfreq else 0)
+
     def _init_go2genes(self, relationship_set, godag):
         """
         Fills in the genes annotated to each GO, including ancestors
@@ -84,21 +204,34 @@ class TermCounts:
         a GO Terma are also annotated to all ancestors.
         """
         go2geneset = defaultdict(set)
-        go2up = get_go2ancestors(set(godag.values()), relationship_set)
+        get_ancestors = self._get_fnc_ancestors(relationship_set, godag)
         # Fill go-geneset dict with GO IDs in annotations and their corresponding counts
         for geneid, goids_anno in self.annots.items():
             # Make a union of all the terms for a gene, if term parents are
             # propagated but they won't get double-counted for the gene
-            allterms = set()
-            for goid_main in goids_anno:
-                allterms.add(goid_main)
-                if goid_main in go2up:
-                    allterms.update(go2up[goid_main])
             # Add 1 for each GO annotated to this gene product
-            for ancestor in allterms:
+            for ancestor in self._get_allterms(goids_anno, get_ancestors):
                 go2geneset[ancestor].add(geneid)
         return dict(go2geneset)
 
+    @staticmethod
+    def _get_fnc_ancestors(relationship_set, godag):
+        """Get a function which returns the ancestors of a main GO ID"""
+        objclo = get_closure(godag, relationship_set)
+        if objclo is not None:
+            return objclo.get_ancestors
+        go2up = get_go2ancestors(set(godag.values()), relationship_set)
+        return lambda goid: go2up.get(goid, ())
+
+    @staticmethod
+    def _get_allterms(goids_anno, get_ancestors):
+        """Get the annotated GO IDs and all of their ancestors"""
+        allterms = set()
+        for goid_main in goids_anno:
+            allterms.add(goid_main)
+            allterms.update(get_ancestors(goid_main))
+        return allterms
+
     def _init_add_goid_alt(self, not_main):
         """
         Add alternate GO IDs to term counts. Report GO IDs not found in GO DAG.
@@ -110,6 +243,7 @@ class TermCounts:
                 goid_main = self.go2obj[go_id].item_id
                 self.gocnts[go_id] = self.gocnts[goid_main]
                 self.go2genes[go_id] = self.go2genes[goid_main]
+                self._go_alts.add(go_id)
 
     def get_count(self, go_id):
         """
@@ -0,0 +1 @@
+"""Groupwise semantic similarity"""
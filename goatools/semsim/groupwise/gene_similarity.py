@@ -0,0 +1,174 @@
+"""Gene-product (groupwise) semantic similarity: best-match average, max or average"""
+
+__copyright__ = "Copyright (C) 2020-present, DV Klopfenstein. All rights reserved."
+__author__ = "DV Klopfenstein"
+
+import numpy as np
+from scipy import sparse
+
+from goatools.forkpool import FORKED, iter_forked
+from goatools.godag.consts import NS2NAMESPACE
+from goatools.semsim.termwise.similarity_matrix import SimilarityMatrix
+
+
+class GeneSimilarity:
+    """Semantic similarity of gene products, from the similarities of their GO terms.
+
+    The GO terms of all genes are collected once and the similarity of every pair of these
+    GO terms is computed once (SimilarityMatrix) and stored. Each gene-to-gene similarity
+    aggregates the term similarities of the two genes' GO terms:
+        bma: best-match average: (sum of row maxima + sum of column maxima) / (m + n)
+        max: the highest term similarity
+        avg: the average term similarity
+    Term pairs without a similarity (NaN) count as 0. Genes without GO terms give NaN.
+
+    gene2gos: Gene to GO IDs, e.g., TermCounts.annots (default: annotations in termcounts)
+    method: Term similarity: resnik, lin, schlicker or wang
+    namespace: Only use GO IDs in this namespace (BP, MF, CC)
+    """
+
+    aggregators = {'bma', 'max', 'avg'}
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, godag, termcounts=None, gene2gos=None, method='lin', namespace=None,
+                 **kws):
+        # kws: relationships rel2scf (wang)
+        if gene2gos is None:
+            gene2gos = termcounts.annots
+        self.method = method
+        self.genes = sorted(gene2gos)
+        self.gene2idx = {g: i for i, g in enumerate(self.genes)}
+        self.goids, self.indicator = self._init_goids(gene2gos, godag, namespace)
+        self.num_gos = np.asarray(self.indicator.sum(axis=1)).ravel()
+        # GO term-to-GO term similarities, created when first needed
+        self._simobj = SimilarityMatrix(self.goids, godag, termcounts, **kws)
+        self._termsim = None
+
+    def get_sim(self, gene_a, gene_b, aggregator='bma'):
+        """Get the semantic similarity of two genes"""
+        self._chk_aggregator(aggregator)
+        idx_a = self.gene2idx[gene_a]
+        idx_b = self.gene2idx[gene_b]
+        return float(self._get_block(idx_a, idx_a + 1, idx_b, idx_b + 1, aggregator)[0, 0])
+
+    def get_matrix(self, genes=None, aggregator='bma', workers=1, chunk_size=512, fout=None):
+        """Get the semantic similarity of all pairs of genes as a float32 matrix.
+
+        genes: Genes in the rows and columns (default: self.genes)
+        workers: Compute chunks of gene pairs in this many processes (default 1)
+        fout: Write the matrix to a NumPy .npy file one chunk at a time; return a memmap
+        """
+        self._chk_aggregator(aggregator)
+        if genes is not None:
+            objsim = self._get_subset(genes)
+            return objsim.get_matrix(None, aggregator, workers, chunk_size, fout)
+        num = len(self.genes)
+        if fout is None:
+            mtx = np.empty((num, num), dtype=np.float32)
+        else:
+            mtx = np.lib.format.open_memmap(fout, mode='w+', dtype=np.float32, shape=(num, num))
+        # Chunks in the upper triangle; each chunk is mirrored into the lower triangle
+        begs = range(0, num, chunk_size)
+        tasks = [(r, min(num, r + chunk_size), c, min(num, c + chunk_size), aggregator)
+                 for r in begs for c in begs if c >= r]
+        self._get_termsim()
+        for (row0, row1, col0, col1, _), block in zip(tasks, self._iter_blocks(tasks, workers)):
+            mtx[row0:row1, col0:col1] = block
+            mtx[col0:col1, row0:row1] = block.T
+        if fout is not None:
+            mtx.flush()
+        return mtx
+
+    def _iter_blocks(self, tasks, workers):
+        """Compute chunks of gene similarities, in a pool of forked processes if requested"""
+        # Workers inherit this object (including the GO term similarities) through fork
+        return iter_forked(_get_block_forked, tasks, workers, {'objsim': self})
+
+    def _get_block(self, row0, row1, col0, col1, aggregator):
+        """Get the similarities of genes row0:row1 to genes col0:col1"""
+        termsim = self._get_termsim()
+        ind_r = self.indicator[row0:row1]
+        ind_c = self.indicator[col0:col1]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if aggregator == 'avg':
+                block = (ind_c @ (ind_r @ termsim).T).T
+                block /= np.outer(self.num_gos[row0:row1], self.num_gos[col0:col1])
+            elif aggregator == 'max':
+                block = self._get_colmax(self._get_rowmax(ind_r, termsim), ind_c)
+            else:
+                sum_r = (ind_c @ self._get_rowmax(ind_r, termsim).T).T
+                sum_c = ind_r @ self._get_rowmax(ind_c, termsim).T
+                block = (sum_r + sum_c)/np.add.outer(
+                    self.num_gos[row0:row1], self.num_gos[col0:col1])
+        block = np.asarray(block, dtype=np.float32)
+        block[self.num_gos[row0:row1] == 0, :] = np.nan
+        block[:, self.num_gos[col0:col1] == 0] = np.nan
+        return block
+
+    @staticmethod
+    def _get_rowmax(ind, termsim):
+        """For each gene, get the highest similarity of its GO terms to every GO term"""
+        rowmax = np.zeros((ind.shape[0], termsim.shape[1]), dtype=termsim.dtype)
+        indptr = ind.indptr
+        for row in np.flatnonzero(np.diff(indptr)).tolist():
+            rowmax[row] = termsim[ind.indices[indptr[row]:indptr[row + 1]]].max(axis=0)
+        return rowmax
+
+    @staticmethod
+    def _get_colmax(rowmax, ind):
+        """For each gene pair, get the highest of the row gene's maxima over the column gene's GO"""
+        colmax = np.zeros((rowmax.shape[0], ind.shape[0]), dtype=rowmax.dtype)
+        indptr = ind.indptr
+        for col in np.flatnonzero(np.diff(indptr)).tolist():
+            colmax[:, col] = rowmax[:, ind.indices[indptr[col]:indptr[col + 1]]].max(axis=1)
+        return colmax
+
+    def _get_termsim(self):
+        """Get the similarity of every pair of GO terms, computed once"""
+        if self._termsim is None:
+            termsim = self._simobj.get_matrix(self.method)
+            termsim[np.isnan(termsim)] = 0.0
+            self._termsim = termsim
+        return self._termsim
+
+    def _get_subset(self, genes):
+        """Get a GeneSimilarity for a subset of genes sharing these GO term similarities"""
+        objsim = self.__class__.__new__(self.__class__)
+        objsim.__dict__.update(self.__dict__)
+        objsim.genes = list(genes)
+        objsim.gene2idx = {g: i for i, g in enumerate(objsim.genes)}
+        objsim.indicator = self.indicator[[self.gene2idx[g] for g in objsim.genes]]
+        objsim.num_gos = self.num_gos[[self.gene2idx[g] for g in objsim.genes]]
+        return objsim
+
+    def _init_goids(self, gene2gos, godag, namespace):
+        """Get the GO IDs of all genes and a sparse gene-by-GO indicator matrix"""
+        nspc = NS2NAMESPACE.get(namespace, namespace)
+        gene2goids = {}
+        for gene in self.genes:
+            goids = set(go for go in gene2gos[gene] if go in godag)
+            if nspc is not None:
+                goids = set(go for go in goids if godag[go].namespace == nspc)
+            gene2goids[gene] = goids
+        goids_all = sorted(set.union(set(), *gene2goids.values()))
+        go2idx = {go: i for i, go in enumerate(goids_all)}
+        rows = [r for r, g in enumerate(self.genes) for _ in gene2goids[g]]
+        cols = [go2idx[go] for g in self.genes for go in gene2goids[g]]
+        indicator = sparse.csr_matrix((np.ones(len(rows), dtype=np.float32), (rows, cols)),
+                                      shape=(len(self.genes), len(goids_all)))
+        indicator.sort_indices()
+        return goids_all, indicator
+
+    def _chk_aggregator(self, aggregator):
+        """Check that the aggregator is known"""
+        if aggregator not in self.aggregators:
+            raise ValueError('UNKNOWN AGGREGATOR({A}). EXPECTED: {As}'.format(
+                A=aggregator, As=' '.join(sorted(self.aggregators))))
+
+
+def _get_block_forked(task):
+    """Compute one chunk of gene similarities in a forked worker process"""
+    return FORKED['objsim']._get_block(*task)  # pylint: disable=protected-access
+
+
+# Copyright (C) 2020-present, DV Klopfenstein. All rights reserved.
@@ -0,0 +1,119 @@
+"""Term counts, frequencies and information content (IC) saved to and read from a file"""
+
+__copyright__ = "Copyright (C) 2020-present, DV Klopfenstein. All rights reserved."
+__author__ = "DV Klopfenstein"
+
+import collections as cx
+import math
+import os
+
+import numpy as np
+
+# Increment if the contents of the file change
+FORMAT_VERSION = 1
+
+NtIc = cx.namedtuple("NtIc", "namespace tcnt tfreq tinfo")
+
+
+def save_ic_table(fout_npz, termcounts, data_version=None, anno_date=None):
+    """Write the counts, frequencies and IC of a TermCounts to a NumPy .npz file.
+
+    data_version: GO DAG version (default: data_version of the GODag in termcounts)
+    anno_date: Date in the annotation file header, e.g., from GafReader.get_date()
+    """
+    go2obj = termcounts.go2obj
+    if data_version is None:
+        data_version = getattr(go2obj, "data_version", None)
+    goids = sorted(termcounts.gocnts)
+    namespaces = sorted(termcounts.aspect_counts)
+    ns2code = {ns: i for i, ns in enumerate(namespaces)}
+    tfreq = [termcounts.get_term_freq(go) for go in goids]
+    # Same IC as in TermCounts.gosubdag.go2nt
+    tinfo = [0.0 - math.log(f) if f else 0.0 for f in tfreq]
+    # Write to an open file so NumPy does not add an .npz extension
+    with open(fout_npz, "wb") as prt:
+        np.savez(
+            prt,
+            format_version=np.array(FORMAT_VERSION),
+            data_version=np.array("" if data_version is None else data_version),
+            anno_date=np.array("" if anno_date is None else anno_date),
+            goids=np.array(goids, dtype=str),
+            namespace=np.array([ns2code[go2obj[go].namespace] for go in goids], dtype=np.int8),
+            tcnt=np.array([termcounts.gocnts[go] for go in goids], dtype=np.int64),
+            tfreq=np.array(tfreq, dtype=float),
+            tinfo=np.array(tinfo, dtype=float),
+            namespaces=np.array(namespaces, dtype=str),
+            aspect_counts=np.array([termcounts.aspect_counts[ns] for ns in namespaces],
+                                   dtype=np.int64),
+            num_genes=np.array(len(termcounts.gene2gos)),
+        )
+
+
+class ICTable:
+    """Read-only term counts, frequencies and IC, used in place of TermCounts.
+
+    Made by save_ic_table or TermCounts.save, so the annotations need not be read again.
+    As with TermCounts, get_info_content(goid, ictable) returns the IC of a GO ID.
+    """
+
+    def __init__(self, dat, godag=None):
+        # dat: Contents of a file written by save_ic_table
+        self.go2obj = godag
+        self.data_version = dat["data_version"].item() or None
+        self.anno_date = dat["anno_date"].item() or None
+        self.num_genes = int(dat["num_genes"])
+        namespaces = dat["namespaces"].tolist()
+        self.aspect_counts = dict(zip(namespaces, dat["aspect_counts"].tolist()))
+        goids = dat["goids"].tolist()
+        self.gocnts = cx.Counter(dict(zip(goids, dat["tcnt"].tolist())))
+        self.go2ns = {go: namespaces[c] for go, c in zip(goids, dat["namespace"].tolist())}
+        self.gosubdag = _GoSubDagIc(self._init_go2nt(goids, dat))
+
+    @classmethod
+    def load(cls, fin_npz, godag=None, anno_date=None, data_version=None):
+        """Read an IC table. Return None if missing or made from other GO or annotation versions.
+
+        godag: GO DAG used with the IC (e.g., lin_sim); the IC table must be made from its version
+        """
+        if not os.path.exists(fin_npz):
+            return None
+        if data_version is None and godag is not None:
+            data_version = getattr(godag, "data_version", None)
+        with np.load(fin_npz) as dat:
+            if int(dat["format_version"]) != FORMAT_VERSION:
+                return None
+            if data_version is not None and dat["data_version"].item() != data_version:
+                return None
+            if anno_date is not None and dat["anno_date"].item() != anno_date:
+                return None
+            return cls(dat, godag)
+
+    def get_count(self, go_id):
+        """Returns the count of that GO term observed in the annotations."""
+        return self.gocnts[go_id]
+
+    def get_total_count(self, aspect):
+        """Gets the total count that's been precomputed."""
+        return self.aspect_counts[aspect]
+
+    def get_term_freq(self, go_id):
+        """Returns the frequency at which a GO term has been observed in the annotations."""
+        ntd = self.gosubdag.go2nt.get(go_id)
+        return ntd.tfreq if ntd else 0
+
+    def _init_go2nt(self, goids, dat):
+        """Get the namespace, count, frequency and IC of each GO ID"""
+        go2ns = self.go2ns
+        return {go: NtIc(namespace=go2ns[go], tcnt=c, tfreq=f, tinfo=i)
+                for go, c, f, i in zip(
+                    goids, dat["tcnt"].tolist(), dat["tfreq"].tolist(), dat["tinfo"].tolist())}
+
+
+class _GoSubDagIc:
+    """Holds go2nt, as TermCounts.gosubdag does, for get_info_content"""
+
+    def __init__(self, go2nt):
+        self.go2nt = go2nt
+
+
+# Copyright (C) 2020-present, DV Klopfenstein. All rights reserved.
@@ -0,0 +1,242 @@
+"""Semantic similarity of all pairs of GO terms: Resnik, Lin, Schlicker or Wang"""
+
+__copyright__ = "Copyright (C) 2020-present, DV Klopfenstein. All rights reserved."
+__author__ = "DV Klopfenstein"
+
+import numpy as np
+from scipy import sparse
+
+from goatools.godag.closure import ClosureIndex
+from goatools.godag.closure import get_closure
+from goatools.godag.compact import CompactGODag
+from goatools.semantic import get_info_content
+from goatools.semsim.termwise.wang import SsWang
+
+
+def similarity_matrix(goids, godag, method='resnik', termcounts=None, **kws):
+    """Get the semantic similarity of all pairs of GO IDs as a float32 matrix.
+
+    method: resnik, lin, schlicker or wang
+    kws: relationships, rel2scf (wang); condensed, dtype, block_size, fout (get_matrix)
+    """
+    kws_init = {k: kws.pop(k) for k in ('relationships', 'rel2scf') if k in kws}
+    return SimilarityMatrix(goids, godag, termcounts, **kws_init).get_matrix(method, **kws)
+
+
+class SimilarityMatrix:
+    """Semantic similarity of all pairs of GO IDs, computed in blocks of rows with NumPy.
+
+    Resnik, Lin and Schlicker use the ancestor closure (is_a) of the GO DAG and vectors of
+    information content (IC) and term frequency. As in semantic.deepest_common_ancestor,
+    the most specific common ancestor (MSCA) of two GO terms is the deepest common
+    ancestor. If several common ancestors are deepest, the one with the highest IC is used.
+
+    Wang uses the S-values of each GO term's ancestors as a sparse matrix.
+
+    Pairs without a similarity (e.g., GO terms in different namespaces) are NaN.
+    """
+
+    methods = {'resnik', 'lin', 'schlicker', 'wang'}
+
+    def __init__(self, goids, godag, termcounts=None, relationships=None, rel2scf=None):
+        self.goids = list(goids)
+        self.godag = godag
+        self.termcounts = termcounts
+        self.relationships = relationships
+        self.rel2scf = rel2scf
+        # Created when first needed
+        self._ic = None
+        self._wang = None
+
+    def get_matrix(self, method='resnik', condensed=False, dtype=np.float32, block_size=512,
+                   fout=None):
+        """Get the semantic similarity of all pairs of GO IDs.
+
+        condensed: Return the upper triangle (i < j) in the order of scipy's squareform
+        fout: Write the matrix to a NumPy .npy file one block at a time; return a memmap
+        """
+        if method not in self.methods:
+            raise ValueError('UNKNOWN SEMANTIC SIMILARITY METHOD({M}). EXPECTED: {Ms}'.format(
+                M=method, Ms=' '.join(sorted(self.methods))))
+        num = len(self.goids)
+        shape = (num*(num - 1)//2,) if condensed else (num, num)
+        if fout is None:
+            mtx = np.empty(shape, dtype=dtype)
+        else:
+            mtx = np.lib.format.open_memmap(fout, mode='w+', dtype=dtype, shape=shape)
+        get_block = self._get_fnc_block(method)
+        for beg in range(0, num, block_size):
+            end = min(num, beg + block_size)
+            # Similarities of rows beg:end to columns beg:num (upper triangle)
+            block = get_block(beg, end)
+            if condensed:
+                for row in range(beg, end):
+                    offset = row*num - row*(row + 1)//2
+                    mtx[offset:offset + num - row - 1] = block[row - beg, row - beg + 1:]
+            else:
+                mtx[beg:end, beg:] = block
+                mtx[beg:, beg:end] = block.T
+        if fout is not None:
+            mtx.flush()
+        return mtx
+
+    def _get_fnc_block(self, method):
+        """Get the function which computes one block of the upper triangle"""
+        if method == 'wang':
+            return self._get_block_wang
+        self._init_ic()
+        if method == 'resnik':
+            return lambda beg, end: self._get_block_msca(beg, end)[0]
+        if method == 'lin':
+            return lambda beg, end: self._get_block_lin(beg, end, None)
+        return lambda beg, end: self._get_block_lin(beg, end, 'schlicker')
+
+    # -- Resnik, Lin, Schlicker -------------------------------------------------------------
+    def _get_block_lin(self, beg, end, schlicker):
+        """Get Lin's (or Schlicker's) similarities, as in semantic.lin_sim_calc"""
+        sim_r, freq = self._get_block_msca(beg, end)
+        rowic = self._ic['rowic']
+        ic1 = rowic[beg:end, None]
+        ic2 = rowic[None, beg:]
+        info = ic1 + ic2
+        with np.errstate(divide='ignore', invalid='ignore'):
+            sim = 2*sim_r/info
+        factor = 1.0 - freq if schlicker else np.ones_like(sim_r)
+        if schlicker:
+            sim *= factor
+        has_ic = (ic1 != 0.0) & (ic2 != 0.0) & (info != 0)
+        rowidx = self._ic['rowidx']
+        same = rowidx[beg:end, None] == rowidx[None, beg:]
+        ret = np.where(has_ic, sim, np.where(same, factor, np.where(sim_r == 0.0, 0.0, np.nan)))
+        ret[np.isnan(sim_r)] = np.nan
+        return ret
+
+    def _get_block_msca(self, beg, end):
+        """Get the IC (Resnik's similarity) and term frequency of the MSCA of each pair"""
+        dat = self._ic
+        num_rows = end - beg
+        num_cols = len(self.goids) - beg
+        found = np.zeros((num_rows, num_cols), dtype=bool)
+        ic_msca = np.zeros((num_rows, num_cols))
+        freq_msca = np.zeros((num_rows, num_cols))
+        # Deepest common ancestors are found first
+        for anc, anc_ic, anc_freq, rank_cols in dat['levels']:
+            cnt = (anc[beg:end] @ anc[beg:].T).toarray()
+            new = (cnt != 0) & ~found
+            if not new.any():
+                continue
+            # One common ancestor at this depth: sums of IC and freq are the ancestor's values
+            one = new & (cnt == 1)
+            ic_msca[one] = (anc_ic[beg:end] @ anc[beg:].T).toarray()[one]
+            freq_msca[one] = (anc_freq[beg:end] @ anc[beg:].T).toarray()[one]
+            # Several common ancestors at this depth: use the one with the highest IC
+            rows, cols = np.nonzero(new & (cnt > 1))
+            if rows.size:
+                col_anc = self._get_common_maxic(anc, rank_cols, rows + beg, cols + beg)
+                ic_msca[rows, cols] = dat['colic'][col_anc]
+                freq_msca[rows, cols] = dat['colfreq'][col_anc]
+            found |= new
+        rowns = dat['rowns']
+        same_ns = rowns[beg:end, None] == rowns[None, beg:]
+        ic_msca[~(found & same_ns)] = np.nan
+        return ic_msca, freq_msca
+
+    @staticmethod
+    def _get_common_maxic(anc, rank_cols, rows, cols):
+        """For pairs of GO rows, get the common ancestor column with the highest IC"""
+        col_anc = np.full(rows.size, -1, dtype=np.int64)
+        for rank in range(rank_cols.shape[1]):
+            todo = np.flatnonzero(col_anc == -1)
+            if not todo.size:
+                break
+            cands = rank_cols[rows[todo], rank]
+            hit = np.asarray(anc[cols[todo], cands]).ravel() != 0
+            col_anc[todo[hit]] = cands[hit]
+        return col_anc
+
+    def _init_ic(self):
+        """Get the ancestors (including self) of each GO ID, grouped by ancestor depth"""
+        if self._ic is not None:
+            return
+        objclo = self._get_closure()
+        objcmp = objclo.objcmp
+        go2idx = objcmp.go2idx
+        rowidx = np.array([go2idx[self.godag[go].item_id] for go in self.goids], dtype=np.int64)
+        # Ancestors including self; columns are the GO terms which are any row's ancestor
+        mtx = (objclo.anc[rowidx] + sparse.csr_matrix(
+            (np.ones(rowidx.size, dtype=bool), (np.arange(rowidx.size), rowidx)),
+            shape=(rowidx.size, len(objcmp.goids)))).tocsc()
+        colidx = np.flatnonzero(np.diff(mtx.indptr))
+        mtx = sparse.csr_matrix(mtx[:, colidx], dtype=np.float64)
+        colgos = [objcmp.goids[i] for i in colidx.tolist()]
+        colic = np.array([get_info_content(go, self.termcounts) for go in colgos], dtype=float)
+        colfreq = np.array([self._get_freq(go) for go in colgos], dtype=float)
+        coldepth = np.array([self.godag[go].depth for go in colgos])
+        levels = []
+        for depth in sorted(set(coldepth.tolist()), reverse=True):
+            sel = sparse.diags((coldepth == depth).astype(np.float64))
+            anc = (mtx @ sel).tocsr()
+            anc.eliminate_zeros()
+            levels.append((
+                anc,
+                (anc @ sparse.diags(colic)).tocsr(),
+                (anc @ sparse.diags(colfreq)).tocsr(),
+                self._get_rank_cols(anc, colic)))
+        self._ic = {
+            'rowidx': rowidx,
+            'rowic': np.array([get_info_content(go, self.termcounts) for go in self.goids], dtype=float),
+            'rowns': objcmp.namespace[rowidx],
+            'colic': colic,
+            'colfreq': colfreq,
+            'levels': levels,
+        }
+
+    @staticmethod
+    def _get_rank_cols(anc, colic):
+        """Get each row's ancestor columns at one depth, sorted by decreasing IC"""
+        num_anc = np.diff(anc.indptr)
+        rank_cols = np.full((anc.shape[0], max(1, int(num_anc.max(initial=0)))), -1,
+                            dtype=np.int64)
+        for row in np.flatnonzero(num_anc > 1).tolist():
+            cols = anc.indices[anc.indptr[row]:anc.indptr[row + 1]]
+            rank_cols[row, :cols.size] = cols[np.argsort(-colic[cols], kind='stable')]
+        return rank_cols
+
+    def _get_closure(self):
+        """Get the is_a closure of the GO DAG; GO DAG subsets (dicts) get a new closure"""
+        objclo = get_closure(self.godag)
+        return objclo if objclo is not None else ClosureIndex(CompactGODag(self.godag))
+
+    def _get_freq(self, goid):
+        """Get the term frequency of a GO ID, as in semantic.get_freq_msca"""
+        if self.termcounts is None:
+            return 0.0
+        ntd = self.termcounts.gosubdag.go2nt.get(goid)
+        return ntd.tfreq if ntd else 0
+
+    # -- Wang -------------------------------------------------------------------------------
+    def _get_block_wang(self, beg, end):
+        """Get Wang's similarities: sum of S-values of common ancestors over sum of S-values"""
+        svals, has_anc, sv_all, loaded = self._init_wang()
+        num = (svals[beg:end] @ has_anc[beg:].T + has_anc[beg:end] @ svals[beg:].T).toarray()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            sim = num/(sv_all[beg:end, None] + sv_all[None, beg:])
+        sim[~(loaded[beg:end, None] & loaded[None, beg:])] = np.nan
+        return sim
+
+    def _init_wang(self):
+        """Get the S-values of the ancestors of each GO ID as a sparse matrix"""
+        if self._wang is None:
+            objwang = SsWang(self.goids, self.godag, self.relationships, self.rel2scf)
+            loaded = np.array([go in objwang.goids for go in self.goids], dtype=bool)
+            # Rows of GO IDs which are not loaded are empty
+            rows = np.flatnonzero(loaded)
+            scatter = sparse.csr_matrix((np.ones(rows.size), (rows, np.arange(rows.size))),
+                                        shape=(len(self.goids), rows.size))
+            svals = (scatter @ objwang.svalues.get_rows([self.goids[i] for i in rows])).tocsr()
+            has_anc = sparse.csr_matrix(svals, dtype=bool).astype(np.float64)
+            self._wang = (svals, has_anc, np.asarray(svals.sum(axis=1)).ravel(), loaded)
+        return self._wang
+
+
+# Copyright (C) 2020-present, DV Klopfenstein. All rights reserved.
@@ -14,11 +14,16 @@ __author__ = "DV Klopfenstein"
 
 from sys import stdout
 from goatools.semsim.termwise.dag_a import DagA
+from goatools.semsim.termwise.wang_svalues import WangSValues
 from goatools.godag.go_tasks import get_go2ancestors
 from goatools.godag.go_tasks import get_go2depth
+from goatools.godag.closure import get_closure
 
 class SsWang:
-    """Wang's termwise semantic similarity for GO terms"""
+    """Wang's termwise semantic similarity for GO terms
+
+    The S-values of the GO IDs and their ancestors are computed together (WangSValues).
+    """
 
     # Default semantic contribution factor (scf) for weights for edge types (w_e)
     dflt_rel2scf = {
@@ -33,20 +38,23 @@ class SsWang:
         self.godag = godag
         self.rels = self._init_rels(relationships)
         self.w_e = self._init_edge_weight_factor(rel2scf)
-        # Get GO Wang DAGs
-        self.go2dag = self._init_go2dag(goids)
+        self.goids = self._init_goids(goids)
+        # S-values of the GO IDs and all of their ancestors
+        self.svalues = WangSValues(godag, self.w_e, self.goids)
+        self._go2dag = None
+
+    @property
+    def go2dag(self):
+        """Get GO Wang DAGs (DagA), created when first needed"""
+        if self._go2dag is None:
+            self._go2dag = self._init_go2dag(self.goids)
+        return self._go2dag
 
     def get_sim(self, go_a, go_b):
         """Get Wang's semantic similarity between two GO terms"""
         if self._not_loaded(go_a, go_b):
             return None
-        dag_a = self.go2dag[go_a]
-        dag_b = self.go2dag[go_b]
-        goids_ab = set(dag_a.goids).intersection(dag_b.goids)
-        s_a = dag_a.get_svalues(goids_ab)
-        s_b = dag_b.get_svalues(goids_ab)
-        s_ab = sum([*s_a, *s_b])
-        return s_ab/(dag_a.get_sv() + dag_b.get_sv())
+        return self.svalues.get_sim(go_a, go_b)
 
     def prt_cfg(self, prt=stdout):
         """Print reseacher-specified Wang configuration"""
@@ -58,11 +66,11 @@ class SsWang:
         prt.write('\n')
 
     def _not_loaded(self, go_a, go_b):
-        """Check that both GO IDs are in the go2subdag dict"""
-        if go_a not in self.go2dag:
+        """Check that the S-values of both GO IDs were computed"""
+        if go_a not in self.svalues:
             print('**ERROR: {GO} NOT LOADED INTO SsWang'.format(GO=go_a))
             return True
-        if go_b not in self.go2dag:
+        if go_b not in self.svalues:
             print('**ERROR: {GO} NOT LOADED INTO SsWang'.format(GO=go_b))
             return True
         return False
@@ -88,19 +96,27 @@ class SsWang:
             ret[rel] = rel2scf[rel] if rel in rel2scf else d_rel2scf[rel]
         return ret
 
-    def _init_go2dag(self, goids):
+    def _init_goids(self, goids):
+        """Get the GO IDs provided by the researcher which are in the GO DAG"""
+        go_set_all = set(goids)
+        go_set_cur = go_set_all.intersection(self.godag.keys())
+        if go_set_cur != go_set_all:
+            self._go_not_found(go_set_cur, go_set_all)
+        return go_set_cur
+
+    def _init_go2dag(self, go_set_cur):
         """Get all GO IDs in the DAG above and including GO IDs in goids arg"""
         # GO terms provided by user
         ##tic = timeit.default_timer()
         s_godag = self.godag
         rels = self.rels
-        go_set_all = set(goids)
-        go_set_cur = go_set_all.intersection(s_godag.keys())
-        if go_set_cur != go_set_all:
-            self._go_not_found(go_set_cur, go_set_all)
         # Ancestor GO terms for each user GO term
         ##tic = prt_hms(tic, '_init_go2dag GO IDs not found')
-        go2ancestors = get_go2ancestors(self._get_goobjs(go_set_cur), rels)
+        objclo = get_closure(s_godag, rels)
+        if objclo is not None:
+            go2ancestors = objclo.get_go2ancestors(go_set_cur, reachable=True)
+        else:
+            go2ancestors = get_go2ancestors(self._get_goobjs(go_set_cur), rels)
         ##tic = prt_hms(tic, '_init_go2dag go2ancestors')
         go2depth = self._get_go2depth(go2ancestors, rels)
         ##tic = prt_hms(tic, '_init_go2dag go2depth')
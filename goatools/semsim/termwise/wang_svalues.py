@@ -0,0 +1,145 @@
+"""Wang's S-values of many GO terms at once, as a sparse GO term x ancestor matrix"""
+
+__copyright__ = "Copyright (C) 2020-present, DV Klopfenstein. All rights reserved."
+__author__ = "DV Klopfenstein"
+
+import numpy as np
+from scipy import sparse
+
+from goatools.godag.compact import CompactGODag
+
+
+class WangSValues:
+    """S-values of GO terms and all of their ancestors, computed in one topological pass.
+
+    The S-value of ancestor t to GO term A is the highest product of edge weights (w_e)
+    on any path from A up to t; S_A(A) is 1. So the S-values of A are the S-values of each
+    parent p, multiplied by the weight of the edge A->p, keeping the highest value for each
+    ancestor. GO terms are visited in layers, parents before children, and each layer is
+    computed with NumPy from the rows of the layers above.
+
+    Only the requested GO IDs and their ancestors are computed and stored (goids=None: all).
+    Row i of 'svalues' holds the S-values of GO i in the CompactGODag; other rows are empty.
+    """
+
+    def __init__(self, godag, w_e, goids=None):
+        # w_e: Edge weights for is_a and any relationships, e.g., SsWang.w_e
+        self.objcmp = _get_compact(godag)
+        self.weights = self._init_weights(w_e)
+        self.idxs = self._init_idxs(goids)
+        self.svalues = self._init_svalues()
+        # Semantic value of each GO term: sum of its S-values
+        self.semantic_value = np.asarray(self.svalues.sum(axis=1)).ravel()
+
+    def __contains__(self, goid):
+        idx = self.objcmp.go2idx.get(goid)
+        return idx is not None and self.svalues.indptr[idx] != self.svalues.indptr[idx + 1]
+
+    def get_go2svalue(self, goid):
+        """Get the S-values of a GO term and its ancestors"""
+        cols, vals = self._get_row(self.objcmp.go2idx[goid])
+        goids = self.objcmp.goids
+        return {goids[c]: v for c, v in zip(cols.tolist(), vals.tolist())}
+
+    def get_sv(self, goid):
+        """Get the semantic value of a GO term"""
+        return float(self.semantic_value[self.objcmp.go2idx[goid]])
+
+    def get_sim(self, go_a, go_b):
+        """Get Wang's semantic similarity: S-values of common ancestors over semantic values"""
+        idx_a = self.objcmp.go2idx[go_a]
+        idx_b = self.objcmp.go2idx[go_b]
+        cols_a, vals_a = self._get_row(idx_a)
+        cols_b, vals_b = self._get_row(idx_b)
+        _, i_a, i_b = np.intersect1d(cols_a, cols_b, assume_unique=True, return_indices=True)
+        s_ab = vals_a[i_a].sum() + vals_b[i_b].sum()
+        return float(s_ab/(self.semantic_value[idx_a] + self.semantic_value[idx_b]))
+
+    def get_rows(self, goids):
+        """Get the S-values of GO IDs as a CSR matrix; one row per GO ID"""
+        return self.svalues[self.objcmp.get_idxs(goids)]
+
+    def _get_row(self, idx):
+        """Get the ancestor columns and S-values of one GO index"""
+        mtx = self.svalues
+        beg, end = mtx.indptr[idx], mtx.indptr[idx + 1]
+        return mtx.indices[beg:end], mtx.data[beg:end]
+
+    def _init_svalues(self):
+        """Compute the S-values of the GO terms, one topological layer at a time"""
+        num = len(self.objcmp.goids)
+        idx2row = {}
+        for layer in self._iter_layers():
+            # Edges from each GO term in this layer to its parents, all in the layers above
+            wts = self.weights[layer]
+            children = np.repeat(layer, np.diff(wts.indptr))
+            parents = wts.indices
+            rows = [idx2row[p] for p in parents.tolist()]
+            lens = np.array([r[0].size for r in rows], dtype=np.int64)
+            row = np.concatenate([layer, np.repeat(children, lens)]).astype(np.int64)
+            col = np.concatenate([layer, *[r[0] for r in rows]]).astype(np.int64)
+            val = np.concatenate([np.ones(layer.size), *[r[1] for r in rows]])
+            val[layer.size:] *= np.repeat(wts.data, lens)
+            # Keep the highest S-value of each (GO term, ancestor)
+            order = np.lexsort((col, row))
+            row, col, val = row[order], col[order], val[order]
+            starts = np.flatnonzero(np.r_[True, (row[1:] != row[:-1]) | (col[1:] != col[:-1])])
+            row, col, val = row[starts], col[starts], np.maximum.reduceat(val, starts)
+            bounds = np.flatnonzero(np.r_[True, row[1:] != row[:-1], True])
+            for beg, end in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+                idx2row[int(row[beg])] = (col[beg:end], val[beg:end])
+        indptr = np.zeros(num + 1, dtype=np.int64)
+        for idx, (cols, _) in idx2row.items():
+            indptr[idx + 1] = cols.size
+        np.cumsum(indptr, out=indptr)
+        idxs = sorted(idx2row)
+        return sparse.csr_matrix((
+            np.concatenate([idx2row[i][1] for i in idxs]) if idxs else np.zeros(0),
+            np.concatenate([idx2row[i][0] for i in idxs]) if idxs else np.zeros(0, np.int64),
+            indptr), shape=(num, num))
+
+    def _iter_layers(self):
+        """Get layers of GO indices; each GO index comes after all of its parents"""
+        wts = self.weights
+        todo = np.zeros(len(self.objcmp.goids), dtype=bool)
+        todo[self.idxs] = True
+        num_parents = np.diff(wts.indptr)
+        children = wts.T.tocsr()
+        frontier = self.idxs[num_parents[self.idxs] == 0]
+        while frontier.size:
+            yield frontier
+            nxt = children[frontier].indices
+            nxt = nxt[todo[nxt]]
+            np.subtract.at(num_parents, nxt, 1)
+            nxt = np.unique(nxt)
+            frontier = nxt[num_parents[nxt] == 0]
+
+    def _init_idxs(self, goids):
+        """Get the indices of the requested GO IDs and all of their ancestors"""
+        objcmp = self.objcmp
+        if goids is None:
+            return np.arange(len(objcmp.goids))
+        idxs = objcmp.get_idxs([go for go in goids if go in objcmp.go2idx])
+        # pylint: disable=protected-access
+        return np.union1d(idxs, objcmp._get_reachable(idxs, self.weights)).astype(np.int64)
+
+    def _init_weights(self, w_e):
+        """Get a CSR matrix of GO to parents, holding the highest weight of the edge types"""
+        rel2csr = self.objcmp.rel2csr
+        mtx = None
+        for rel, weight in w_e.items():
+            if rel in rel2csr:
+                cur = sparse.csr_matrix(rel2csr[rel], dtype=np.float64)*weight
+                mtx = cur if mtx is None else mtx.maximum(cur)
+        mtx = sparse.csr_matrix(mtx)
+        mtx.sort_indices()
+        return mtx
+
+
+def _get_compact(godag):
+    """Get the CompactGODag cached on a GODag; GO DAG subsets (dicts) get a new one"""
+    fnc = getattr(godag, 'get_compact', None)
+    return fnc() if fnc is not None else CompactGODag(godag)
+
+
+# Copyright (C) 2020-present, DV Klopfenstein. All rights reserved.
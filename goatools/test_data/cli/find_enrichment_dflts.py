@@ -41,6 +41,7 @@ class ArgsDict(object):
             'ev_inc': None,
             'ev_exc': None,
             'go_terms': None,
+            'workers': 1,
             # BROAD 'remove_goids': None,
         }
         self.ntobj = cx.namedtuple("Namespace", " ".join(self.namespace.keys()))
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+"""Test that annotations stored as NumPy columns give the same associations as namedtuples."""
+
+import os
+import tempfile
+
+import numpy as np
+
+from goatools.obo_parser import GODag
+from goatools.evidence_codes import EvidenceCodes
+from goatools.anno.opts import AnnoOptions
+from goatools.anno.gaf_reader import GafReader
+from goatools.anno.gpad_reader import GpadReader
+from goatools.anno.columns import AnnoColumns
+from tests.test_anno_stream import KWS_ID2GOS
+from tests.test_anno_stream import _wr_gaf
+from tests.test_anno_stream import _wr_gpad
+
+__copyright__ = "Copyright (C) 2016-present, DV Klopfenstein, H Tang. All rights reserved."
+
+REPO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def test_anno_columns():
+    """Test that columnar GAF and GPAD readers give the same associations."""
+    godag = GODag(os.path.join(REPO, "tests/data/goslim_generic.obo"),
+                  optional_attrs={"relationship"}, prt=None)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        fin_gaf = os.path.join(tmpdir, "test.gaf")
+        fin_gpad = os.path.join(tmpdir, "test.gpad")
+        _wr_gaf(fin_gaf, godag)
+        _wr_gpad(fin_gpad, godag)
+        for cls, fin in [(GafReader, fin_gaf), (GpadReader, fin_gpad)]:
+            objnts = cls(fin, godag=godag)
+            objcol = cls(fin, godag=godag, columnar=True)
+            assert len(objcol.columns) == len(objnts.associations)
+            fout_npz = os.path.join(tmpdir, "columns")
+            objcol.columns.save(fout_npz)
+            objrd = AnnoColumns.load(fout_npz)
+            for kws in KWS_ID2GOS:
+                for namespace in ["BP", "MF", "CC"]:
+                    exp = objnts.get_id2gos(namespace, prt=None, **kws)
+                    assert objcol.get_id2gos(namespace, prt=None, **kws) == exp
+                    assert objrd.get_id2gos(namespace, godag, **kws) == exp
+                assert objcol.get_ns2assc(**kws) == objnts.get_ns2assc(**kws)
+                assert objrd.get_ns2assc(godag, **kws) == objnts.get_ns2assc(**kws)
+                assert objcol.get_id2gos_nss(**kws) == objnts.get_id2gos_nss(**kws)
+
+
+def test_anno_options_mask():
+    """Test that AnnoOptions masks select the same annotations as getfnc_qual_ev."""
+    evobj = EvidenceCodes()
+    evcodes = ["IDA", "ND", "IEA", "IMP", "TAS"]
+    ev_codes = np.tile(np.arange(len(evcodes)), 4)
+    has_not = np.arange(len(ev_codes)) % 3 == 0
+    for keep_nd in [False, True]:
+        for keep_not in [False, True]:
+            for kws in [{}, {"ev_include": {"IDA", "ND"}}, {"ev_exclude": {"IEA"}}]:
+                options = AnnoOptions(evobj, keep_ND=keep_nd, keep_NOT=keep_not, **kws)
+                fnc = options.getfnc_qual_ev()
+                exp = [fnc({"NOT"} if n else set(), evcodes[e]) for e, n in zip(ev_codes, has_not)]
+                assert options.get_mask(ev_codes, evcodes, has_not).tolist() == exp
+
+
+if __name__ == "__main__":
+    test_anno_columns()
+    test_anno_options_mask()
+
+# Copyright (C) 2016-present, DV Klopfenstein, H Tang. All rights reserved.
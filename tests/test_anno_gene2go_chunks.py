@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+"""Test reading an NCBI gene2go file in chunks, in one process or a process pool."""
+
+import os
+import tempfile
+
+import pytest
+
+from goatools.anno.genetogo_reader import Gene2GoReader
+from goatools.anno.init.reader_genetogo import InitAssc
+from tests.test_anno_stream import _wr_gz
+
+__copyright__ = "Copyright (C) 2016-present, DV Klopfenstein, H Tang. All rights reserved."
+
+CATEGORIES = ["Process", "Function", "Component"]
+
+
+def test_gene2go_chunks():
+    """Test that chunked and parallel reads of gene2go give the same annotations."""
+    chunk_size = InitAssc.chunk_size
+    with tempfile.TemporaryDirectory() as tmpdir:
+        fin_anno = os.path.join(tmpdir, "gene2go")
+        _wr_gene2go(fin_anno)
+        fin_gz = _wr_gz(fin_anno)
+        try:
+            for taxids in [None, [9606], [10090, 7227], True]:
+                for namespaces in [None, {"BP"}, {"MF", "CC"}]:
+                    exp = _get_exp(fin_anno, taxids, namespaces)
+                    assert exp
+                    for fin in [fin_anno, fin_gz]:
+                        for workers in [1, 3]:
+                            for size in [1000, 64 * 1024 * 1024]:
+                                InitAssc.chunk_size = size
+                                objanno = Gene2GoReader(fin, taxids=taxids, namespaces=namespaces,
+                                                        workers=workers)
+                                assert [tuple(nt) for nt in objanno.associations] == exp
+        finally:
+            InitAssc.chunk_size = chunk_size
+    # Lines for a taxid starting with the same digits (96060) are not read as 9606
+    assert {nt.tax_id for nt in objanno.associations} == {9606, 96060, 10090, 7227}
+
+
+def test_gene2go_line_error(capsys):
+    """Test that a line which can not be parsed is reported with its line number."""
+    chunk_size = InitAssc.chunk_size
+    with tempfile.TemporaryDirectory() as tmpdir:
+        fin_anno = os.path.join(tmpdir, "gene2go")
+        _wr_gene2go(fin_anno)
+        with open(fin_anno, encoding="utf-8") as ifstrm:
+            lines = ifstrm.readlines()
+        # Line 250 (header is line 1): human, with an unknown category
+        line_bad = lines[249].replace(lines[249].split("\t")[7], "Unknown\n")
+        assert line_bad.startswith("9606\t")
+        lines[249] = line_bad
+        with open(fin_anno, "w", encoding="utf-8") as prt:
+            prt.writelines(lines)
+        try:
+            for workers in [1, 3]:
+                for size in [1000, 64 * 1024 * 1024]:
+                    InitAssc.chunk_size = size
+                    with pytest.raises(SystemExit):
+                        Gene2GoReader(fin_anno, taxids=[9606], workers=workers)
+                    captured = capsys.readouterr()
+                    assert "**FATAL: {F}[250]:\n{L}".format(F=fin_anno, L=line_bad) in captured.err
+                    assert " 7) NS            Unknown" in captured.out
+        finally:
+            InitAssc.chunk_size = chunk_size
+
+
+def _get_exp(fin_anno, taxids, namespaces):
+    """Parse each gene2go line into the expected annotation fields."""
+    category2ns = {'Process':'BP', 'Function':'MF', 'Component':'CC'}
+    if taxids is None:
+        taxids = [9606]
+    exp = []
+    with open(fin_anno, encoding="utf-8") as ifstrm:
+        for line in ifstrm:
+            if line[0] == "#":
+                continue
+            vals = line.rstrip("\n").split("\t")
+            nspc = category2ns[vals[7]]
+            if (taxids is True or int(vals[0]) in taxids) and \
+                (namespaces is None or nspc in namespaces):
+                exp.append((
+                    int(vals[0]), int(vals[1]), vals[2], vals[3],
+                    set(vals[4].split(" ")) if vals[4] != "-" else set(),
+                    vals[5],
+                    [] if vals[6] == "-" else ["PMID:" + n for n in vals[6].split("|")],
+                    nspc))
+    return exp
+
+
+def _wr_gene2go(fout):
+    """Write a gene2go file with annotations for several taxids."""
+    taxids = [7227, 9606, 96060, 10090]
+    with open(fout, "w", encoding="utf-8") as prt:
+        prt.write("#" + "\t".join(InitAssc.hdrs) + "\n")
+        for idx in range(600):
+            prt.write("\t".join([
+                str(taxids[idx // 150]), str(1000 + idx % 37), "GO:{N:07}".format(N=idx % 29),
+                ["IDA", "IEA", "ND", "TAS"][idx % 4],
+                ["-", "enables", "NOT involved_in"][idx % 3],
+                "term {I}".format(I=idx % 29),
+                ["-", "123", "123|456"][idx % 3],
+                CATEGORIES[idx % 3]]) + "\n")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
+
+# Copyright (C) 2016-present, DV Klopfenstein, H Tang. All rights reserved.
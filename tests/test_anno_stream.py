@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+"""Test that streaming GAF and GPAD readers give the same associations as stored annotations."""
+
+import os
+import gzip
+import tempfile
+
+import pytest
+
+from goatools.obo_parser import GODag
+from goatools.anno.gaf_reader import GafReader
+from goatools.anno.gpad_reader import GpadReader
+from goatools.anno.factory import get_objanno
+
+__copyright__ = "Copyright (C) 2016-present, DV Klopfenstein, H Tang. All rights reserved."
+
+REPO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+NS2ASPECT = {"biological_process": "P", "molecular_function": "F", "cellular_component": "C"}
+
+KWS_ID2GOS = [
+    {},
+    {"keep_ND": True, "keep_NOT": True},
+    {"ev_exclude": {"IEA"}},
+    {"propagate_counts": True},
+    {"propagate_counts": True, "relationships": {"part_of"}, "go2geneids": True},
+]
+
+
+def test_gaf_stream():
+    """Test that a streaming GafReader gives the same associations as a GafReader."""
+    godag = GODag(os.path.join(REPO, "tests/data/goslim_generic.obo"),
+                  optional_attrs={"relationship"}, prt=None)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        fin_gaf = os.path.join(tmpdir, "test.gaf")
+        _wr_gaf(fin_gaf, godag)
+        fin_gz = _wr_gz(fin_gaf)
+        for namespace in ["BP", "MF", "CC"]:
+            for kws in KWS_ID2GOS:
+                exp = GafReader(fin_gaf, godag=godag, prt=None).get_id2gos(namespace, prt=None, **kws)
+                assert exp
+                for fin in [fin_gaf, fin_gz]:
+                    objanno = GafReader(fin, godag=godag, stream=True, prt=None)
+                    with pytest.raises(RuntimeError):
+                        len(objanno.associations)
+                    assert objanno.get_id2gos(namespace, prt=None, **kws) == exp
+        # Filter by namespace and taxid as the file is read
+        objstored = GafReader(fin_gaf, godag=godag, prt=None)
+        for taxids in [{9606}, {10090, 7227}]:
+            objanno = get_objanno(fin_gz, godag=godag, namespaces={"BP"}, taxids=taxids,
+                                  stream=True, prt=None)
+            nts = list(objanno.iter_associations())
+            assert nts == [nt for nt in objstored.associations
+                           if nt.NS == "BP" and nt.Taxon[0] in taxids]
+            assert nts == GafReader(fin_gaf, godag=godag, namespaces={"BP"}, taxids=taxids,
+                                    prt=None).associations
+        for kws in KWS_ID2GOS:
+            objanno = GafReader(fin_gz, godag=godag, stream=True, prt=None)
+            assert objanno.get_ns2assc(**kws) == objstored.get_ns2assc(**kws)
+            assert objanno.get_id2gos_nss(**kws) == objstored.get_id2gos_nss(**kws)
+
+
+def test_gpad_stream():
+    """Test that a streaming GpadReader gives the same associations as a GpadReader."""
+    godag = GODag(os.path.join(REPO, "tests/data/goslim_generic.obo"),
+                  optional_attrs={"relationship"}, prt=None)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        fin_gpad = os.path.join(tmpdir, "test.gpad")
+        _wr_gpad(fin_gpad, godag)
+        fin_gz = _wr_gz(fin_gpad)
+        objstored = GpadReader(fin_gpad, godag=godag)
+        assert objstored.associations
+        objanno = GpadReader(fin_gz, godag=godag, stream=True)
+        assert objanno.hdr == objstored.hdr
+        assert list(objanno.iter_associations()) == objstored.associations
+        # Annotations are not stored when streaming
+        assert objstored.qty == len(objstored.associations)
+        assert objanno.qty is None
+        with pytest.raises(RuntimeError, match="iter_associations"):
+            objanno.get_associations()
+        with pytest.raises(RuntimeError, match="stream=True"):
+            objanno.get_relation_cnt()
+        for kws in KWS_ID2GOS:
+            assert objanno.get_ns2assc(**kws) == objstored.get_ns2assc(**kws)
+            assert objanno.get_id2gos("MF", prt=None, **kws) == \
+                objstored.get_id2gos("MF", prt=None, **kws)
+
+
+def _wr_gaf(fout_gaf, godag):
+    """Write a GAF file containing annotations to the GO IDs in a GO DAG."""
+    goterms = sorted({o.item_id: o for o in godag.values() if o.depth != 0}.items())
+    evcodes = ["IDA", "IEA", "ND", "IMP"]
+    with open(fout_gaf, "w", encoding="utf-8") as prt:
+        prt.write("!gaf-version: 2.1\n!generated-by: test\n")
+        for idx in range(400):
+            goid, goterm = goterms[(idx * 7) % len(goterms)]
+            taxon = ["taxon:9606", "taxon:10090", "taxon:7227|taxon:9606"][idx % 3]
+            prt.write("\t".join([
+                "UniProtKB", "P{I:05}".format(I=idx % 53), "GENE{I}".format(I=idx % 53),
+                "NOT" if idx % 11 == 0 else "", goid, "PMID:{I}".format(I=idx),
+                evcodes[idx % 4], "", NS2ASPECT[goterm.namespace], "", "", "protein",
+                taxon, "20200101", "UniProt", "", ""]) + "\n")
+
+
+def _wr_gpad(fout_gpad, godag):
+    """Write a GPAD file containing annotations to the GO IDs in a GO DAG."""
+    goids = sorted({o.item_id for o in godag.values() if o.depth != 0})
+    ecos = ["ECO:0000314", "ECO:0000501", "ECO:0000307", "ECO:0000315"]
+    with open(fout_gpad, "w", encoding="utf-8") as prt:
+        prt.write("!gpa-version: 1.1\n!generated-by: test\n")
+        for idx in range(300):
+            prt.write("\t".join([
+                "UniProtKB", "P{I:05}".format(I=idx % 41),
+                "NOT|enables" if idx % 13 == 0 else "involved_in",
+                goids[(idx * 5) % len(goids)], "PMID:{I}".format(I=idx), ecos[idx % 4],
+                "", "", "20200101", "UniProt", "", ""]) + "\n")
+
+
+def _wr_gz(fin):
+    """Write a gzipped copy of a file."""
+    fout_gz = fin + ".gz"
+    with open(fin, "rb") as ifstrm, gzip.open(fout_gz, "wb") as ofstrm:
+        ofstrm.write(ifstrm.read())
+    return fout_gz
+
+
+if __name__ == "__main__":
+    test_gaf_stream()
+    test_gpad_stream()
+
+# Copyright (C) 2016-present, DV Klopfenstein, H Tang. All rights reserved.
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+"""Test propagating an association with a sparse matrix against update_association."""
+
+import os
+import copy
+import random
+import weakref
+
+from goatools.obo_parser import GODag
+from goatools.anno.update_association import update_association
+from goatools.anno.update_association import get_assc_propagated
+from goatools.anno.update_association import get_assc_propagated_view
+
+__copyright__ = "Copyright (C) 2016-present, DV Klopfenstein, H Tang, All rights reserved."
+
+REPO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def test_assc_propagated():
+    """Test the propagated gene-by-GO matrix against update_association"""
+    godag = GODag(os.path.join(REPO, "tests/data/goslim_generic.obo"),
+                  optional_attrs={"relationship"}, prt=None)
+    rng = random.Random(11)
+    goids = sorted(godag) + ["GO:9999999"]
+    assoc = {"gene{I}".format(I=i): set(rng.sample(goids, rng.randrange(1, 6))) for i in range(60)}
+    assoc_orig = copy.deepcopy(assoc)
+    # A GO DAG and a dict subset of a GO DAG, which has no closure of its own
+    go2obj = {go: o for go, o in godag.items() if o.namespace != "cellular_component"}
+    for dag in [godag, go2obj]:
+        for relationships in [None, {"part_of"}, True]:
+            objmtx = get_assc_propagated(assoc, dag, relationships, prt=None)
+            assert assoc == assoc_orig
+            exp = copy.deepcopy(assoc)
+            update_association(exp, dag, relationships, prt=None)
+            # Alternate GO IDs are main GO IDs; GO IDs not in the GO DAG are dropped
+            exp = {g: set(dag[go].item_id for go in gos if go in dag) for g, gos in exp.items()}
+            assert objmtx.get_id2gos() == exp
+            genes = ["gene3", "gene5", "gene_none"]
+            assert objmtx.get_id2gos(genes) == {g: exp[g] for g in genes if g in exp}
+            assert objmtx.csr.nnz == sum(len(gos) for gos in exp.values())
+
+
+def test_assc_propagated_view():
+    """Test that a propagated view is reused only for an association of the same content"""
+    godag = GODag(os.path.join(REPO, "tests/data/goslim_generic.obo"), prt=None)
+    rng = random.Random(11)
+    goids = sorted(godag)
+    assoc = _Gene2Gos(("gene{I}".format(I=i), set(rng.sample(goids, 3))) for i in range(60))
+    view = get_assc_propagated_view(assoc, godag, prt=None)
+    assert get_assc_propagated_view(assoc, godag, prt=None) is view
+    assert get_assc_propagated_view(dict(copy.deepcopy(assoc)), godag, prt=None) is view
+    # Swap a GO ID in place, keeping the number of genes and annotations
+    goid_old = next(iter(assoc["gene0"]))
+    goid_new = next(go for go in goids if go not in view["gene0"])
+    assoc["gene0"] = (assoc["gene0"] - {goid_old}) | {goid_new}
+    view_new = get_assc_propagated_view(assoc, godag, prt=None)
+    assert view_new is not view
+    assert godag[goid_new].item_id in view_new["gene0"]
+    assert dict(view_new.items()) == get_assc_propagated(assoc, godag, prt=None).get_id2gos()
+    # The association is not kept alive by the cache
+    assoc_ref = weakref.ref(assoc)
+    del assoc
+    assert assoc_ref() is None
+
+
+class _Gene2Gos(dict):
+    """An association (gene2gos) which can be weakly referenced"""
+
+
+if __name__ == "__main__":
+    test_assc_propagated()
+    test_assc_propagated_view()
+
+# Copyright (C) 2016-present, DV Klopfenstein, H Tang, All rights reserved.
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+"""Test the resampled p-value distribution used by the 'fdr' multiple-test correction."""
+
+import os
+import collections as cx
+
+import numpy as np
+
+from goatools.associations import read_associations
+from goatools.multiple_testing import FDR, FdrResampler
+from goatools.obo_parser import GODag
+from goatools.pvalcalc import FisherFactory
+from goatools.ratio import count_terms
+
+__copyright__ = "Copyright (C) 2010-present, H Tang et al., All rights reserved."
+
+REPO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def test_minpvals():
+    """Test the smallest p-values against scalar Fisher tests on the same random study sets."""
+    godag, assoc, pop = _get_data()
+    objrs = FdrResampler(pop, assoc, godag)
+    study_n = 30
+    objrs.get_distribution(study_n, len(pop), 3, seed=1)
+    minpvals = objrs.get_minpvals(study_n, 8, 2)
+    # Draw the same random study sets
+    rng = np.random.default_rng(2)
+    samples = rng.random((8, len(pop))).argpartition(study_n - 1, axis=1)[:, :study_n]
+    term_pop = count_terms(pop, assoc, godag)
+    calc_pvalue = FisherFactory(log=None).pval_obj.calc_pvalue
+    for sample, minpval in zip(samples, minpvals):
+        term_study = count_terms([objrs.pop[i] for i in sample], assoc, godag)
+        exp = min([1] + [calc_pvalue(cnt, study_n, term_pop[go], len(pop))
+                         for go, cnt in term_study.items()])
+        assert np.isclose(minpval, exp, rtol=1e-9), (minpval, exp)
+
+
+def test_distribution_seed_workers():
+    """Test that a seed reproduces the distribution, with or without workers."""
+    godag, assoc, pop = _get_data()
+    objrs = FdrResampler(pop, assoc, godag, count_terms(pop, assoc, godag))
+    objrs.max_block = 7 * len(pop)
+    dist_a = objrs.get_distribution(20, len(pop), 100, seed=123)
+    dist_b = objrs.get_distribution(20, len(pop), 100, seed=123, workers=3)
+    assert len(dist_a) == 100
+    assert np.array_equal(dist_a, dist_b)
+    assert not np.array_equal(dist_a, objrs.get_distribution(20, len(pop), 100, seed=124))
+    assert np.array_equal(objrs.get_distribution(0, len(pop), 5), np.ones(5))
+
+
+def test_fdr_qvals():
+    """Test that FDR q-values are the fraction of the distribution less than each p-value."""
+    ntrec = cx.namedtuple("ntrec", "p_uncorrected")
+    distribution = [0.5, 0.01, 0.2, 1.0, 0.2, 0.03]
+    results = [ntrec(p) for p in [0.0001, 0.01, 0.2, 0.21, 1.0, 1.1]]
+    qvals = FDR(distribution, results).corrected_pvals
+    exp = [sum(1 for x in distribution if x < r.p_uncorrected) / len(distribution)
+           for r in results]
+    assert qvals == exp
+
+
+def _get_data():
+    """Get a GO DAG, an association (not propagated), and a population."""
+    godag = GODag(os.path.join(REPO, "tests/data/goslim_generic.obo"), prt=None)
+    fin_assc = os.path.join(REPO, "tests/data/small_association")
+    assoc = read_associations(fin_assc, "id2gos", no_top=True)
+    fin_pop = os.path.join(REPO, "tests/data/small_population")
+    with open(fin_pop, encoding="utf-8") as ifstrm:
+        pop = set(line.rstrip() for line in ifstrm)
+    return godag, assoc, pop
+
+
+if __name__ == "__main__":
+    test_minpvals()
+    test_distribution_seed_workers()
+    test_fdr_qvals()
+
+# Copyright (C) 2010-present, H Tang et al., All rights reserved.
@@ -0,0 +1,40 @@
+#!/usr/bin/env python
+"""Test running tasks in a pool of forked processes, or serially if fork is not available."""
+
+import multiprocessing
+
+from goatools.forkpool import FORKED
+from goatools.forkpool import get_fork_context
+from goatools.forkpool import iter_forked
+
+__copyright__ = "Copyright (C) 2010-present, DV Klopfenstein, H Tang, All rights reserved."
+
+
+def test_iter_forked(monkeypatch):
+    """Test results in task order, with and without fork"""
+    exp = [(i, 10*i) for i in range(20)]
+    FORKED["outer"] = "kept"
+    for workers in [1, 3]:
+        act = list(iter_forked(_get_task, iter(range(20)), workers, {"scale": 10}))
+        assert act == exp
+        assert FORKED == {"outer": "kept"}
+    # No fork on this platform (e.g., Windows): tasks run in this process
+    def _no_fork(method=None):
+        raise ValueError("cannot find context for {M!r}".format(M=method))
+    monkeypatch.setattr(multiprocessing, "get_context", _no_fork)
+    assert get_fork_context(3) is None
+    assert list(iter_forked(_get_task, range(20), 3, {"scale": 10})) == exp
+    assert FORKED == {"outer": "kept"}
+    FORKED.clear()
+
+
+def _get_task(task):
+    """Scale a number by a value shared through FORKED"""
+    return task, FORKED["scale"]*task
+
+
+if __name__ == "__main__":
+    import pytest
+    pytest.main([__file__])
+
+# Copyright (C) 2010-present, DV Klopfenstein, H Tang, All rights reserved.
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+"""Test streamed GO paths, path counts, and GO terms and edges on all paths."""
+
+import os
+
+from goatools.obo_parser import GODag
+from goatools.gosubdag.go_paths import GoPaths
+from goatools.gosubdag.go_paths import get_paths_goobjs
+from goatools.gosubdag.go_paths import get_edges_goobjs
+from goatools.gosubdag.go_paths import paths2edges
+
+__copyright__ = "Copyright (C) 2016-present, DV Klopfenstein, H Tang, All rights reserved."
+
+REPO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def test_paths_to_top():
+    """Test iter_paths_to_top, get_num_paths_to_top and get_nodes_edges_to_top."""
+    godag = GODag(os.path.join(REPO, "tests/data/goslim_generic.obo"),
+                  optional_attrs={"relationship"}, prt=None)
+    for relationships in [None, True, {"part_of"}]:
+        for goid in sorted(godag):
+            exp = _paths_to_top_recursive(godag[goid], relationships)
+            assert godag.paths_to_top(goid, relationships) == exp
+            assert list(godag.iter_paths_to_top(goid, relationships)) == exp
+            assert godag.get_num_paths_to_top(goid, relationships) == len(exp)
+            nodes, edges = godag.get_nodes_edges_to_top(goid, relationships)
+            assert nodes == set(o for p in exp for o in p)
+            assert edges == set((b, a) for a, b in paths2edges(exp))
+            # Limits
+            assert list(godag.iter_paths_to_top(goid, relationships, max_paths=2)) == exp[:2]
+            for max_len in [1, 3]:
+                assert list(godag.iter_paths_to_top(goid, relationships, max_len=max_len)) == \
+                    [p for p in exp if len(p) <= max_len]
+
+
+def test_gopaths():
+    """Test GoPaths: listed paths, streamed paths, counts and edges."""
+    godag = GODag(os.path.join(REPO, "tests/data/goslim_generic.obo"), prt=None)
+    objp = GoPaths()
+    goterms = sorted({o.item_id: o for o in godag.values()}.items())
+    tops = [None] + [go for go, o in goterms if o.depth == 1]
+    for dn0_up1 in [True, False]:
+        for goid_end in tops:
+            for _, goterm in goterms:
+                paths = objp.get_paths_from_to(goterm, goid_end, dn0_up1)
+                paths_iter = list(objp.iter_paths_from_to(goterm, goid_end, dn0_up1))
+                assert sorted(_get_goids(paths)) == sorted(_get_goids(paths_iter))
+                assert objp.get_num_paths_from_to(goterm, goid_end, dn0_up1) == len(paths)
+                nodes, edges = objp.get_nodes_edges_from_to(goterm, goid_end, dn0_up1)
+                assert nodes == set(o for p in paths for o in p)
+                assert edges == paths2edges(paths)
+    # Edges on paths from GO terms to one top GO term
+    for go_top in tops:
+        go2obj_p = {}
+        go2obj_e = {}
+        goobjs = [o for _, o in goterms]
+        go_paths, go_all = get_paths_goobjs(goobjs, go_top, go2obj_p)
+        edges, go_all_e = get_edges_goobjs(goobjs, go_top, go2obj_e)
+        assert edges == paths2edges(go_paths)
+        assert go_all_e == go_all
+        assert go2obj_e == go2obj_p
+
+
+def _paths_to_top_recursive(rec, relationships):
+    """List paths to the top recursively."""
+    if rec.level == 0:
+        return [[rec]]
+    if relationships is None:
+        uppers = rec.parents
+    elif relationships is True:
+        uppers = rec.get_goterms_upper()
+    else:
+        uppers = rec.get_goterms_upper_rels(relationships)
+    paths = []
+    for upper in uppers:
+        for path in _paths_to_top_recursive(upper, relationships):
+            paths.append(path + [rec])
+    return paths
+
+
+def _get_goids(paths):
+    """Get the GO IDs of the GO terms in each path."""
+    return [[o.item_id for o in p] for p in paths]
+
+
+if __name__ == "__main__":
+    test_paths_to_top()
+    test_gopaths()
+
+# Copyright (C) 2016-present, DV Klopfenstein, H Tang, All rights reserved.
@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+"""Test loading a GODag from its binary cache file."""
+
+import os
+import io
+import sys
+import json
+import shutil
+import tempfile
+
+from goatools.obo_parser import GODag
+from goatools.godag.obo_cache import OboCache
+
+__copyright__ = "Copyright (C) 2010-present, DV Klopfenstein, H Tang, All rights reserved."
+
+REPO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+OPTIONAL_ATTRS = {"def", "synonym", "relationship", "xref", "subset", "comment", "consider"}
+
+
+def test_godag_cache():
+    """Test that a GODag loaded from the cache is the same as one parsed from the obo."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        fin_obo = os.path.join(tmpdir, "goslim_generic.obo")
+        shutil.copy(os.path.join(REPO, "tests/data/goslim_generic.obo"), fin_obo)
+        for optional_attrs in [None, {"relationship"}, OPTIONAL_ATTRS]:
+            for load_obsolete in [False, True]:
+                kws = {"optional_attrs": optional_attrs, "load_obsolete": load_obsolete}
+                fin_cache = OboCache(fin_obo, optional_attrs, load_obsolete).cache_file
+                godag_obo = GODag(fin_obo, prt=None, **kws)
+                assert not os.path.exists(fin_cache)
+                godag_wr = GODag(fin_obo, prt=None, cache=True, **kws)
+                assert os.path.exists(fin_cache)
+                prt = io.StringIO()
+                godag_rd = GODag(fin_obo, prt=prt, cache=True, **kws)
+                assert prt.getvalue() == "{V}\n".format(V=godag_obo.version)
+                exp = _get_summary(godag_obo)
+                assert _get_summary(godag_wr) == exp
+                assert _get_summary(godag_rd) == exp
+                assert godag_rd.version == godag_obo.version
+                assert godag_rd.data_version == godag_obo.data_version
+                assert {k: vars(o) for k, o in godag_rd.typedefs.items()} == \
+                    {k: vars(o) for k, o in godag_obo.typedefs.items()}
+        # A changed obo file is parsed again
+        with open(fin_obo, "a", encoding="utf-8") as prt:
+            prt.write("\n[Term]\nid: GO:0000000\nname: new term\nnamespace: biological_process\n")
+        godag_rd = GODag(fin_obo, prt=None, cache=True)
+        assert "GO:0000000" in godag_rd
+        assert _get_summary(godag_rd) == _get_summary(GODag(fin_obo, prt=None))
+
+
+def test_godag_cache_data():
+    """Test that the cache holds only data (arrays) and that a bad cache file is not used."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        fin_obo = os.path.join(tmpdir, "goslim_generic.obo")
+        shutil.copy(os.path.join(REPO, "tests/data/goslim_generic.obo"), fin_obo)
+        objcache = OboCache(fin_obo, OPTIONAL_ATTRS)
+        exp = _get_summary(GODag(fin_obo, OPTIONAL_ATTRS, prt=None, cache=True))
+        with open(objcache.cache_file, "rb") as ifstrm:
+            content = ifstrm.read()
+        beg = len(OboCache.magic)
+        hdrlen = int.from_bytes(content[beg:beg + 4], sys.byteorder)
+        hdr = json.loads(content[beg + 4:beg + 4 + hdrlen])
+        assert all("O" not in dtype for _, dtype, _ in hdr["arrays"].values())
+        attr2kind = {attr: kind for attr, kind, _ in hdr["columns"]}
+        assert attr2kind["namespace"] == "codes"
+        assert attr2kind["item_id"] == "copy"
+        assert attr2kind["level"] == "int"
+        assert attr2kind["is_obsolete"] == "bool"
+        assert attr2kind["alt_ids"] == "strset"
+        assert attr2kind["synonym"] == "synonym"
+        # A cache file whose data can not be read is ignored; the obo file is parsed again
+        offset = hdr["arrays"]["col.synonym.json"][0]
+        with open(objcache.cache_file, "wb") as prt:
+            prt.write(content[:offset] + b"\x80\x05" + content[offset + 2:])
+        assert _get_summary(GODag(fin_obo, OPTIONAL_ATTRS, prt=None, cache=True)) == exp
+        with open(objcache.cache_file, "rb") as ifstrm:
+            assert ifstrm.read() == content
+
+
+def test_godag_cache_save():
+    """Test saving GO terms with different data members and data which can not be stored."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        fin_obo = os.path.join(tmpdir, "goslim_generic.obo")
+        shutil.copy(os.path.join(REPO, "tests/data/goslim_generic.obo"), fin_obo)
+        objcache = OboCache(fin_obo)
+        godag = GODag(fin_obo, prt=None)
+        recs = sorted(godag.values(), key=lambda o: o.item_id)
+        recs[0].note = "first"
+        recs[1].note = {"a": ("b", 2)}
+        recs[2].note = None
+        objcache.save(godag)
+        godag_rd = GODag.__new__(GODag)
+        assert objcache.load(godag_rd) == (godag.version, godag.data_version)
+        assert _get_summary(godag_rd) == _get_summary(godag)
+        os.remove(objcache.cache_file)
+        # GO terms whose data can not be stored are not written to the cache
+        recs[3].note = object()
+        objcache.save(godag)
+        recs[3].note = None
+        recs[3].name = "first\nsecond"
+        objcache.save(godag)
+        assert not os.path.exists(objcache.cache_file)
+
+
+def _get_summary(godag):
+    """Get the GO Term data members, replacing GOTerm references with GO IDs."""
+    go2summary = {}
+    for goid, rec in godag.items():
+        attrs = {}
+        for key, val in rec.__dict__.items():
+            if key in {"parents", "children"}:
+                val = {o.item_id for o in val}
+            elif key in {"relationship", "relationship_rev"}:
+                val = {r: {o.item_id for o in objs} for r, objs in val.items()}
+            elif key == "synonym":
+                assert all(type(nt).__name__ == "synonym" for nt in val)
+                val = [tuple(nt) for nt in val]
+            attrs[key] = val
+        go2summary[goid] = (list(attrs), attrs)
+    return go2summary
+
+
+if __name__ == "__main__":
+    test_godag_cache()
+    test_godag_cache_data()
+    test_godag_cache_save()
+
+# Copyright (C) 2010-present, DV Klopfenstein, H Tang, All rights reserved.
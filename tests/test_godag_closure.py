@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+"""Test the transitive-closure index cached on a GODag."""
+
+import os
+import tempfile
+
+from goatools.obo_parser import GODag
+from goatools.godag.closure import ClosureIndex
+from goatools.godag.go_tasks import get_go2ancestors
+from goatools.anno.update_association import update_association
+
+__copyright__ = "Copyright (C) 2010-present, DV Klopfenstein, H Tang, All rights reserved."
+
+REPO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def test_closure():
+    """Test closure ancestors and descendants against go_tasks."""
+    godag = GODag(os.path.join(REPO, "tests/data/goslim_generic.obo"),
+                  optional_attrs={"relationship"}, prt=None)
+    goterms = {o.item_id: o for o in godag.values()}.values()
+    for rels in [None, {"part_of"}, {"part_of", "regulates"}, True]:
+        objclo = godag.get_closure(rels)
+        # Built once per relationship set
+        assert godag.get_closure(set(rels) if isinstance(rels, set) else rels) is objclo
+        go2ancestors = get_go2ancestors(goterms, rels)
+        go2ancestors = {go: ancs for go, ancs in go2ancestors.items() if ancs}
+        assert objclo.get_go2ancestors() == go2ancestors, rels
+        assert objclo.get_go2descendants() == _get_inverse(go2ancestors), rels
+        for goid, goterm in godag.items():
+            assert objclo.get_ancestors(goid) == go2ancestors.get(goterm.item_id, set())
+    # Alternate GO IDs are keys if requested
+    alt2main = {go: o.item_id for go, o in godag.items() if go != o.item_id}
+    objclo = godag.get_closure()
+    go2ancestors = objclo.get_go2ancestors(alt2main)
+    assert go2ancestors
+    for goid_alt, ancestors in go2ancestors.items():
+        assert ancestors == objclo.get_ancestors(alt2main[goid_alt])
+
+
+def test_closure_save_load():
+    """Test writing and reading a closure index."""
+    godag = GODag(os.path.join(REPO, "tests/data/goslim_generic.obo"),
+                  optional_attrs={"relationship"}, prt=None)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        fout_npz = os.path.join(tmpdir, "closure_part_of")
+        objclo = godag.get_closure({"part_of"}, fout_npz)
+        assert os.path.exists(fout_npz)
+        objrd = ClosureIndex.load(fout_npz, godag.get_compact(), {"part_of"})
+        assert objrd is not None
+        assert (objrd.anc != objclo.anc).nnz == 0
+        assert objrd.get_go2descendants() == objclo.get_go2descendants()
+        # A closure file for other relationships is not used
+        assert ClosureIndex.load(fout_npz, godag.get_compact()) is None
+
+
+def test_update_association():
+    """Test that propagating associations with the closure matches go_tasks."""
+    godag = GODag(os.path.join(REPO, "tests/data/goslim_generic.obo"),
+                  optional_attrs={"relationship"}, prt=None)
+    goids = sorted(godag)
+    assc = {"gene{I}".format(I=i): set(goids[i::17]) for i in range(17)}
+    for rels in [None, {"part_of"}]:
+        assc_godag = {g: set(gos) for g, gos in assc.items()}
+        assc_dict = {g: set(gos) for g, gos in assc.items()}
+        update_association(assc_godag, godag, rels, prt=None)
+        # A dict of GO Terms has no closure index
+        update_association(assc_dict, dict(godag), rels, prt=None)
+        assert assc_godag == assc_dict
+        assert assc_godag != assc
+
+
+def _get_inverse(go2ancestors):
+    """Get GO-to-descendants from GO-to-ancestors."""
+    go2descendants = {}
+    for goid, ancestors in go2ancestors.items():
+        for ancestor in ancestors:
+            go2descendants.setdefault(ancestor, set()).add(goid)
+    return go2descendants
+
+
+if __name__ == "__main__":
+    test_closure()
+    test_closure_save_load()
+    test_update_association()
+
+# Copyright (C) 2010-present, DV Klopfenstein, H Tang, All rights reserved.
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+"""Test that CompactGODag queries match GODag and godag.go_tasks."""
+
+import os
+
+from goatools.obo_parser import GODag
+from goatools.godag.compact import CompactGODag
+from goatools.godag.go_tasks import get_go2ancestors
+from goatools.godag.go_tasks import get_go2descendants
+
+__copyright__ = "Copyright (C) 2010-present, DV Klopfenstein, H Tang, All rights reserved."
+
+REPO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def test_compact_godag():
+    """Test CompactGODag ancestors and descendants against go_tasks."""
+    fin_obo = os.path.join(REPO, "tests/data/goslim_generic.obo")
+    godag = GODag(fin_obo, optional_attrs={"relationship"}, prt=None)
+    objcmp = CompactGODag(godag)
+    goterms = {o.item_id: o for o in godag.values()}.values()
+    assert len(objcmp) == len(goterms)
+    for rels in [None, {"part_of"}, {"regulates"}, {"part_of", "has_part"}, True]:
+        go2ancestors = get_go2ancestors(goterms, rels)
+        go2ancestors = {go: ancs for go, ancs in go2ancestors.items() if ancs}
+        assert objcmp.get_go2ancestors(rels) == go2ancestors, rels
+        go2descendants = _get_inverse(go2ancestors)
+        assert objcmp.get_go2descendants(rels) == go2descendants, rels
+        for goid, ancestors in go2ancestors.items():
+            assert objcmp.get_ancestors(goid, rels) == ancestors
+        for goid, descendants in go2descendants.items():
+            assert objcmp.get_descendants(goid, rels) == descendants
+    # No relationships: is_a only
+    go2descendants = get_go2descendants(goterms, None)
+    assert objcmp.get_go2descendants() == {go: ds for go, ds in go2descendants.items() if ds}
+    for goterm in goterms:
+        idx = objcmp.go2idx[goterm.item_id]
+        assert objcmp.get_parents(goterm.item_id) == {o.item_id for o in goterm.parents}
+        assert objcmp.get_children(goterm.item_id) == {o.item_id for o in goterm.children}
+        assert objcmp.depth[idx] == goterm.depth
+        assert objcmp.level[idx] == goterm.level
+        assert objcmp.namespaces[objcmp.namespace[idx]] == goterm.namespace
+        for alt_id in goterm.alt_ids:
+            assert objcmp.go2idx[alt_id] == idx
+
+
+def test_compact_from_obo():
+    """Test reading an obo file directly into a CompactGODag."""
+    fin_obo = os.path.join(REPO, "tests/data/goslim_generic.obo")
+    objcmp = CompactGODag(GODag(fin_obo, optional_attrs={"relationship"}, prt=None))
+    objobo = CompactGODag.from_obo(fin_obo, optional_attrs={"relationship"})
+    assert objobo.goids == objcmp.goids
+    assert objobo.go2idx == objcmp.go2idx
+    assert (objobo.depth == objcmp.depth).all()
+    assert (objobo.level == objcmp.level).all()
+    assert (objobo.namespace == objcmp.namespace).all()
+    for rel, csr in objcmp.rel2csr.items():
+        assert (objobo.rel2csr[rel] != csr).nnz == 0, rel
+    # Parents are numbered before their children
+    for rels in [None, True]:
+        mtx = objobo.get_matrix(rels)
+        order = objobo.get_topological_order(rels)
+        pos = {idx: i for i, idx in enumerate(order)}
+        assert all(pos[p] < pos[c] for c, p in zip(*mtx.nonzero()))
+
+
+def _get_inverse(go2ancestors):
+    """Get GO-to-descendants from GO-to-ancestors."""
+    go2descendants = {}
+    for goid, ancestors in go2ancestors.items():
+        for ancestor in ancestors:
+            go2descendants.setdefault(ancestor, set()).add(goid)
+    return go2descendants
+
+
+if __name__ == "__main__":
+    test_compact_godag()
+    test_compact_from_obo()
+
+# Copyright (C) 2010-present, DV Klopfenstein, H Tang, All rights reserved.
@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+"""Test memoized GOTerm traversals: get_all_parents, get_all_children, has_parent, etc."""
+
+import os
+import pickle
+import shutil
+import tempfile
+
+from goatools.associations import read_associations
+from goatools.go_enrichment import GOEnrichmentStudy
+from goatools.obo_parser import GODag
+from goatools.obo_parser import GOTerm
+from goatools.obo_parser import _GOTERM2MEMO
+from goatools.rpt.goea_nt_xfrm import MgrNtGOEAs
+
+__copyright__ = "Copyright (C) 2010-present, DV Klopfenstein, H Tang, All rights reserved."
+
+REPO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def test_memo():
+    """Test that memoized traversals match a recursive walk of the GO DAG."""
+    for maxsize in [None, 7]:
+        godag = GODag(os.path.join(REPO, "tests/data/goslim_generic.obo"),
+                      optional_attrs={"relationship"}, prt=None, memo_maxsize=maxsize)
+        for _ in range(2):
+            for rec in godag.values():
+                parents = _get_all(rec, lambda o: o.parents)
+                children = _get_all(rec, lambda o: o.children)
+                assert rec.get_all_parents() == parents
+                assert rec.get_all_children() == children
+                assert rec.get_all_upper() == _get_all(rec, GOTerm.get_goterms_upper)
+                assert rec.get_all_lower() == _get_all(rec, GOTerm.get_goterms_lower)
+                assert rec.get_all_parent_edges() == _get_edges(rec, lambda o: o.parents)
+                assert rec.get_all_child_edges() == set(
+                    (c, p) for p, c in _get_edges(rec, lambda o: o.children))
+                for goid in parents:
+                    assert rec.has_parent(goid)
+                    assert not rec.has_child(goid)
+                for goid in children:
+                    assert rec.has_child(goid)
+                # Return values may be modified by the caller
+                rec.get_all_parents().add("GO:0000000")
+            if maxsize is not None:
+                assert len(godag._memo) <= maxsize
+
+
+def test_memo_link():
+    """Test that GO terms are loaded with no memo, then linked to it by the first traversal."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        fin_obo = os.path.join(tmpdir, "goslim_generic.obo")
+        shutil.copy(os.path.join(REPO, "tests/data/goslim_generic.obo"), fin_obo)
+        # Parse the obo, write the cache, read the cache
+        for cache in [False, True, True]:
+            godag = GODag(fin_obo, prt=None, cache=cache)
+            assert not any(rec in _GOTERM2MEMO for rec in godag.values())
+            assert godag["GO:0006520"].get_all_parents()
+            assert all(_GOTERM2MEMO[rec]() is godag._memo for rec in godag.values())
+            assert len(godag._memo)
+
+
+def test_memo_clear():
+    """Test that traversals reflect edited edges after clear_memo."""
+    godag = GODag(os.path.join(REPO, "tests/data/goslim_generic.obo"), prt=None)
+    rec = godag["GO:0006520"]
+    top = godag["GO:0003674"]
+    parents = rec.get_all_parents()
+    assert "GO:0003674" not in parents
+    rec.parents.add(top)
+    top.children.add(rec)
+    godag.clear_memo()
+    assert rec.get_all_parents() == parents | {"GO:0003674"}
+    assert top.has_child("GO:0006520")
+    # A GOTerm which is not in a GODag
+    term = GOTerm()
+    term.item_id = "GO:0000001"
+    term.parents = {rec}
+    assert term.get_all_parents() == parents | {"GO:0006520", "GO:0003674"}
+
+
+def test_memo_pickle():
+    """Test that a pickled GODag is restored with its own traversal memo."""
+    godag = GODag(os.path.join(REPO, "tests/data/goslim_generic.obo"), prt=None)
+    rec = godag["GO:0006520"]
+    parents = rec.get_all_parents()
+    godag_rd = pickle.loads(pickle.dumps(godag))
+    rec_rd = godag_rd["GO:0006520"]
+    assert rec_rd.get_all_parents() == parents
+    assert godag_rd._memo is not godag._memo
+    assert len(godag_rd._memo)
+    # The memo is not a GO term data member
+    assert "_memo" not in vars(rec_rd)
+
+
+def test_memo_goea_nts():
+    """Test GOEA namedtuples holding all GO term data members of a GODag with a memo."""
+    godag = GODag(os.path.join(REPO, "tests/data/goslim_generic.obo"), prt=None)
+    assoc = read_associations(os.path.join(REPO, "tests/data/small_association"), "id2gos",
+                              no_top=True)
+    with open(os.path.join(REPO, "tests/data/small_population"), encoding="utf-8") as ifstrm:
+        pop = [line.rstrip() for line in ifstrm]
+    goeaobj = GOEnrichmentStudy(pop, assoc, godag, methods=["bonferroni"], log=None)
+    for columnar in [False, True]:
+        results = goeaobj.run_study(pop[:20], log=None, columnar=columnar)
+        nts = MgrNtGOEAs(results).get_goea_nts_all()
+        assert len(nts) == len(results)
+        assert all(not fld.startswith("_") for fld in nts[0]._fields)
+
+
+def _get_all(rec, get_nexts):
+    """Get all GO IDs reached from a GO term by walking every path."""
+    goids = set()
+    for nxt in get_nexts(rec):
+        goids.add(nxt.item_id)
+        goids |= _get_all(nxt, get_nexts)
+    return goids
+
+
+def _get_edges(rec, get_nexts):
+    """Get all edges reached from a GO term by walking every path."""
+    edges = set()
+    for nxt in get_nexts(rec):
+        edges.add((rec.item_id, nxt.item_id))
+        edges |= _get_edges(nxt, get_nexts)
+    return edges
+
+
+if __name__ == "__main__":
+    test_memo()
+    test_memo_link()
+    test_memo_clear()
+    test_memo_pickle()
+    test_memo_goea_nts()
+
+# Copyright (C) 2010-present, DV Klopfenstein, H Tang, All rights reserved.
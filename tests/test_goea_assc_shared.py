@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+"""Test that GOEAs share one read-only propagated association, leaving the caller's unchanged."""
+
+import copy
+
+import numpy as np
+
+from goatools.anno.update_association import update_association
+from goatools.go_enrichment import GOEnrichmentStudy
+from tests.utils import get_goea_data
+from tests.utils import get_ids
+
+__copyright__ = "Copyright (C) 2010-present, DV Klopfenstein, H Tang. All rights reserved."
+
+
+def test_goea_assc_shared():
+    """Test GOEAs sharing a propagated association against GOEAs on an updated association"""
+    godag, assoc, pop = get_goea_data(optional_attrs={"relationship"})
+    assoc_orig = copy.deepcopy(assoc)
+    study = get_ids("tests/data/small_study")
+    for relationships in [None, {"part_of"}]:
+        goea_a = _get_goea(pop, assoc, godag, relationships=relationships)
+        goea_b = _get_goea(pop[::2], assoc, godag, alpha=0.01, relationships=relationships)
+        assert assoc == assoc_orig
+        assert goea_a.assoc is goea_b.assoc
+        # Read-only
+        assert isinstance(goea_a.assoc[pop[0]], frozenset)
+        # Same results as a GOEA on an association updated in place
+        assoc_exp = copy.deepcopy(assoc)
+        update_association(assoc_exp, godag, relationships, prt=None)
+        goea_exp = _get_goea(pop, assoc_exp, godag, propagate_counts=False)
+        _chk_results(goea_a.run_study(study, log=None), goea_exp.run_study(study, log=None))
+        _, results = next(goea_a.run_studies({"study": study}, log=None))
+        _chk_results(results, goea_exp.run_study(study, log=None))
+    goea_p = _get_goea(pop, assoc, godag, relationships={"part_of"})
+    goea_0 = _get_goea(pop, assoc, godag)
+    assert goea_p.assoc is not goea_0.assoc
+    # A changed association or GO DAG is propagated again
+    assoc["NEW_GENE"] = {"GO:0005840"}
+    assert _get_goea(pop, assoc, godag).assoc is not goea_0.assoc
+    assoc_cur = _get_goea(pop, assoc, godag).assoc
+    godag.clear_memo()
+    assert _get_goea(pop, assoc, godag).assoc is not assoc_cur
+
+
+def _chk_results(results_act, results_exp):
+    """Check that two lists of GOEA results are equivalent."""
+    assert len(results_act) == len(results_exp)
+    go2rec = {r.GO: r for r in results_exp}
+    for rec in results_act:
+        exp = go2rec[rec.GO]
+        assert rec.study_items == exp.study_items, rec.GO
+        assert rec.pop_items == exp.pop_items, rec.GO
+        assert np.isclose(rec.p_uncorrected, exp.p_uncorrected, rtol=1e-12)
+        assert np.isclose(rec.p_holm, exp.p_holm, rtol=1e-12)
+
+
+def _get_goea(pop, assoc, godag, **kws):
+    """Create a GOEnrichmentStudy"""
+    return GOEnrichmentStudy(pop, assoc, godag, methods=["holm"], log=None, **kws)
+
+
+if __name__ == "__main__":
+    test_goea_assc_shared()
+
+# Copyright (C) 2010-present, DV Klopfenstein, H Tang. All rights reserved.
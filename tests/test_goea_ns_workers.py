@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+"""Test that GOEAs run in a process pool are identical to GOEAs run serially."""
+
+import os
+import io
+import types
+
+import pytest
+
+from goatools.anno.factory import get_objanno
+from goatools.cli.find_enrichment import GoeaCliArgs
+from goatools.cli.find_enrichment import GoeaCliFnc
+from goatools.goea.go_enrichment_ns import GOEnrichmentStudyNS
+from goatools.goea.go_enrichment_ns import _get_chunks
+from goatools.obo_parser import GODag
+from tests.utils import REPO
+from tests.utils import get_ids
+
+__copyright__ = "Copyright (C) 2010-present, DV Klopfenstein, H Tang. All rights reserved."
+
+
+def test_run_study_workers():
+    """Test that run_study with workers returns the same results as a serial run_study."""
+    objgoeans = _get_objgoeans()
+    study_ids = get_ids("tests/data/small_study")
+    log_serial = io.StringIO()
+    log_pool = io.StringIO()
+    results_serial = objgoeans.run_study(study_ids, log=log_serial)
+    results_pool = objgoeans.run_study(study_ids, log=log_pool, workers=3)
+    assert _get_tsv(objgoeans, results_pool) == _get_tsv(objgoeans, results_serial)
+    assert log_pool.getvalue() == log_serial.getvalue()
+    assert all(r.goterm is not None for r in results_pool)
+
+
+def test_run_studies_workers():
+    """Test that run_studies with workers returns the same results as a serial run_studies."""
+    objgoeans = _get_objgoeans()
+    pop_ids = sorted(get_ids("tests/data/small_population"))
+    name2study = {
+        "small_study": get_ids("tests/data/small_study"),
+        "pop_a": pop_ids[:40],
+        "pop_b": pop_ids[-25:],
+        "empty": [],
+    }
+    for idx in range(8):
+        name2study["pop_{I}".format(I=idx)] = pop_ids[idx*5:idx*5 + 30]
+    log_serial = io.StringIO()
+    log_pool = io.StringIO()
+    name2results_serial = dict(objgoeans.run_studies(name2study, log=log_serial))
+    # One task per chunk of studies per namespace: (12 studies in 6 chunks) x (3 namespaces)
+    name2results_pool = dict(objgoeans.run_studies(name2study, log=log_pool, workers=8))
+    assert list(name2results_pool) == list(name2study)
+    assert log_pool.getvalue() == log_serial.getvalue()
+    for name, results_serial in name2results_serial.items():
+        tsv_serial = _get_tsv(objgoeans, results_serial)
+        assert _get_tsv(objgoeans, name2results_pool[name]) == tsv_serial, name
+        # Each namespace runs all studies at once; results match running one study at a time.
+        # GO terms with equal p-values may be in another order
+        tsv_study = _get_tsv(objgoeans, objgoeans.run_study(name2study[name], log=None))
+        assert sorted(tsv_serial.splitlines()) == sorted(tsv_study.splitlines()), name
+
+
+def test_get_chunks():
+    """Test that chunks of studies cover all studies, in order"""
+    assert _get_chunks(12, 6) == [(0, 2), (2, 4), (4, 6), (6, 8), (8, 10), (10, 12)]
+    assert _get_chunks(2, 6) == [(0, 1), (1, 2)]
+    assert _get_chunks(1, 3) == [(0, 1)]
+    assert _get_chunks(0, 3) == [(0, 0)]
+    for num_studies in range(1, 30):
+        chunks = _get_chunks(num_studies, 7)
+        assert [b for b, _ in chunks[1:]] == [e for _, e in chunks[:-1]]
+        assert chunks[0][0] == 0 and chunks[-1][1] == num_studies
+
+
+def test_find_enrichment_studies(monkeypatch):
+    """Test that --workers is 1 or more and the population file is read once for all studies"""
+    fins = [os.path.join(REPO, f) for f in ["data/study", "data/population", "data/association"]]
+    with pytest.raises(SystemExit):
+        GoeaCliArgs(["--workers=0"] + fins)
+    objcli = GoeaCliFnc.__new__(GoeaCliFnc)
+    objcli.args = GoeaCliArgs(["--workers=4"] + fins).args
+    objcli.objanno = types.SimpleNamespace(associations=None)
+    pops = []
+    read_pop = GoeaCliFnc._read_pop
+    monkeypatch.setattr(GoeaCliFnc, "_read_pop",
+                        staticmethod(lambda fin: pops.append(fin) or read_pop(fin)))
+    fin2study, pop = objcli._rd_studies(",".join([fins[0], fins[1]]), fins[1])
+    assert pops == [fins[1]]
+    assert list(fin2study) == fins[:2]
+    assert fin2study[fins[1]] == pop
+
+
+def _get_tsv(objgoeans, results):
+    """Get GOEA results as tab-separated text."""
+    if not results:
+        return ""
+    objgoea = next(iter(objgoeans.ns2objgoea.values()))
+    prt = io.StringIO()
+    objgoea.prt_tsv(prt, results)
+    return prt.getvalue()
+
+
+def _get_objgoeans():
+    """Create a GOEnrichmentStudyNS with local test data."""
+    godag = GODag(os.path.join(REPO, "tests/data/goslim_generic.obo"), prt=None)
+    fin_assc = os.path.join(REPO, "tests/data/small_association")
+    objanno = get_objanno(fin_assc, "id2gos", godag=godag)
+    return GOEnrichmentStudyNS(
+        get_ids("tests/data/small_population"), objanno.get_ns2assc(), godag,
+        methods=["bonferroni", "sidak", "holm"], log=None)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
+
+# Copyright (C) 2010-present, DV Klopfenstein, H Tang. All rights reserved.
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+"""Test pruning GO terms which can never be significant (Tarone) before running a GOEA."""
+
+import numpy as np
+from scipy import stats
+
+from goatools.multiple_testing import get_tarone_testable
+from goatools.pvalcalc import FisherFactory
+from tests.utils import get_goeaobj
+from tests.utils import get_ids
+
+__copyright__ = "Copyright (C) 2010-present, DV Klopfenstein, H Tang. All rights reserved."
+
+
+def test_min_pvalues():
+    """Test the smallest p-values GO terms can reach against scipy for every study count"""
+    pop_n = 60
+    for pvalcalc in ["fisher_scipy_stats", "fisher_vectorized"]:
+        pval_obj = FisherFactory(pvalcalc=pvalcalc, log=None).pval_obj
+        for study_n in [1, 7, 30, 59]:
+            pop_counts = np.arange(pop_n + 1)
+            act = pval_obj.calc_min_pvalues(study_n, pop_counts, pop_n)
+            for pop_count, min_pval in zip(pop_counts.tolist(), act.tolist()):
+                exp = min(_get_pval(x, study_n, pop_count, pop_n) for x in range(
+                    max(0, study_n + pop_count - pop_n), min(study_n, pop_count) + 1))
+                assert np.isclose(min_pval, exp, rtol=1e-6), (study_n, pop_count)
+
+
+def test_tarone_testable():
+    """Test Tarone's k: the smallest k where at most k tests can reach alpha/k"""
+    rng = np.random.default_rng(3)
+    for _ in range(50):
+        min_pvals = 10**-rng.uniform(0, 5, rng.integers(1, 40))
+        alpha = 0.05
+        k_act, testable = get_tarone_testable(min_pvals, alpha)
+        k_exp = next(k for k in range(1, len(min_pvals) + 1)
+                     if sum(p <= alpha/k for p in min_pvals) <= k)
+        assert k_act == k_exp
+        assert np.array_equal(testable, min_pvals <= alpha/k_exp)
+    assert get_tarone_testable([], 0.05)[1].size == 0
+
+
+def test_goea_prune_untestable():
+    """Test that pruned GO terms can not be significant and corrections count kept terms"""
+    goeaobj = get_goeaobj()
+    study = get_ids("tests/data/small_study")
+    pop_n = goeaobj.pop_n
+    for alpha in [0.05, 0.2]:
+        results_all = goeaobj.run_study(study, alpha=alpha, log=None)
+        results = goeaobj.run_study(study, alpha=alpha, prune_untestable=True, log=None)
+        assert 0 < len(results) < len(results_all)
+        go2res = {r.GO: r for r in results}
+        study_n = results[0].study_n
+        pop_counts = np.array([r.pop_count for r in results_all])
+        min_pvals = goeaobj.pval_obj.calc_min_pvalues(study_n, pop_counts, pop_n)
+        tarone_k, _ = get_tarone_testable(min_pvals, alpha)
+        assert len(results) <= tarone_k
+        for rec, min_pval in zip(results_all, min_pvals):
+            if rec.GO in go2res:
+                res = go2res[rec.GO]
+                assert res.p_uncorrected == rec.p_uncorrected
+                assert np.isclose(res.p_bonferroni, min(1.0, rec.p_uncorrected*len(results)))
+            else:
+                # Pruned: never significant, even with Tarone's k in place of all GO terms
+                assert min_pval > alpha/tarone_k
+                assert rec.p_uncorrected > alpha/tarone_k
+        # Every GO term significant without pruning is still significant
+        assert {r.GO for r in results_all if r.p_bonferroni < alpha} <= \
+            {r.GO for r in results if r.p_bonferroni < alpha}
+        _, results_batch = next(goeaobj.run_studies(
+            {"study": study}, alpha=alpha, prune_untestable=True, log=None))
+        assert {r.GO for r in results_batch} == set(go2res)
+
+
+def _get_pval(study_count, study_n, pop_count, pop_n):
+    """Get a two-sided Fisher's exact p-value from scipy"""
+    table = [[study_count, study_n - study_count],
+             [pop_count - study_count, pop_n - pop_count - study_n + study_count]]
+    return stats.fisher_exact(table)[1]
+
+
+if __name__ == "__main__":
+    test_min_pvalues()
+    test_tarone_testable()
+    test_goea_prune_untestable()
+
+# Copyright (C) 2010-present, DV Klopfenstein, H Tang. All rights reserved.
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+"""Test that columnar GOEA results (GoeaResults) match lists of GOEnrichmentRecords."""
+
+import os
+import io
+import tempfile
+
+from goatools.go_enrichment import GoeaResults
+from goatools.rpt.goea_nt_xfrm import MgrNtGOEAs
+from tests.utils import get_goeaobj
+from tests.utils import get_ids
+
+__copyright__ = "Copyright (C) 2010-present, DV Klopfenstein, H Tang. All rights reserved."
+
+FLDS = ["GO", "NS", "name", "depth", "enrichment", "ratio_in_study", "ratio_in_pop",
+        "study_count", "study_n", "pop_count", "pop_n", "p_uncorrected", "p_bonferroni",
+        "p_holm", "fold_enrichment", "study_items", "pop_items", "goterm"]
+
+
+def test_goea_results_columnar():
+    """Test GoeaResults rows, records and reports against GOEnrichmentRecords"""
+    goeaobj = get_goeaobj()
+    study = get_ids("tests/data/small_study")
+    records = goeaobj.run_study(study, log=None)
+    results = goeaobj.run_study(study, log=None, columnar=True)
+    assert isinstance(results, GoeaResults)
+    assert len(results) == len(records)
+    # Record-like rows and records made on demand
+    _chk_results(list(results), records)
+    _chk_results(results.get_records(), records)
+    assert results[-1].GO == records[-1].GO
+    assert results.get_study_items() == MgrNtGOEAs(records).get_study_items()
+    # Population items are shared, not copied
+    assert results[0].pop_items is goeaobj.go2popitems[results[0].GO]
+    # Reports
+    with tempfile.TemporaryDirectory() as tmpdir:
+        fout_a = os.path.join(tmpdir, "records.tsv")
+        fout_b = os.path.join(tmpdir, "columnar.tsv")
+        goeaobj.wr_tsv(fout_a, records)
+        goeaobj.wr_tsv(fout_b, results)
+        with open(fout_a, encoding="utf-8") as ifstrm_a, open(fout_b, encoding="utf-8") as ifstrm_b:
+            assert ifstrm_a.read() == ifstrm_b.read()
+    flds = FLDS[:-1] + ["level", "namespace"]
+    assert MgrNtGOEAs(results).get_goea_nts_prt(flds) == MgrNtGOEAs(records).get_goea_nts_prt(flds)
+    prt_a, prt_b = io.StringIO(), io.StringIO()
+    goeaobj.print_results(records, pval=None, prt=prt_a)
+    goeaobj.print_results(results, pval=None, prt=prt_b)
+    assert prt_a.getvalue() == prt_b.getvalue()
+
+
+def test_goea_results_columnar_kws():
+    """Test keep_if, empty studies and run_studies with columnar GOEA results"""
+    goeaobj = get_goeaobj()
+    study = get_ids("tests/data/small_study")
+    keep_if = lambda r: r.p_uncorrected < 0.1 and r.enrichment == "e"
+    records = goeaobj.run_study(study, log=None, keep_if=keep_if)
+    results = goeaobj.run_study(study, log=None, keep_if=keep_if, columnar=True)
+    assert records
+    _chk_results(results, records)
+    assert not goeaobj.run_study([], log=None, columnar=True)
+    assert not goeaobj.run_study(["NOT_A_GENE"], log=None, columnar=True)
+    name2study = {"study": study, "empty": []}
+    name2records = dict(goeaobj.run_studies(name2study, log=None))
+    for name, results in goeaobj.run_studies(name2study, log=None, columnar=True):
+        assert isinstance(results, GoeaResults)
+        _chk_results(results, name2records[name])
+
+
+def _chk_results(results, records):
+    """Check GOEA results against GOEnrichmentRecords, row by row"""
+    assert len(results) == len(records)
+    for res, rec in zip(results, records):
+        for fld in FLDS:
+            assert getattr(res, fld) == getattr(rec, fld), (rec.GO, fld)
+        assert res.get_pvalue() == rec.get_pvalue()
+        assert str(res) == str(rec)
+
+
+if __name__ == "__main__":
+    test_goea_results_columnar()
+    test_goea_results_columnar_kws()
+
+# Copyright (C) 2010-present, DV Klopfenstein, H Tang. All rights reserved.
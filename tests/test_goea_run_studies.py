@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+"""Test running many GOEAs at once, sharing the population-side work."""
+
+import random
+
+import numpy as np
+
+from tests.utils import get_goeaobj
+from tests.utils import get_ids
+
+__copyright__ = "Copyright (C) 2010-present, DV Klopfenstein, H Tang. All rights reserved."
+
+
+def test_run_studies():
+    """Test that run_studies returns the same results as run_study for each study."""
+    goeaobj = get_goeaobj()
+    study_ids = get_ids("tests/data/small_study")
+    pop_ids = sorted(goeaobj.pop)
+    rng = random.Random(77)
+    name2study = {
+        "small_study": study_ids,
+        "rand_a": rng.sample(pop_ids, 100),
+        "rand_b": rng.sample(pop_ids, 7),
+        "empty": [],
+        "notinpop": ["NOT_A_GENE"],
+    }
+    names = []
+    for name, results_batch in goeaobj.run_studies(name2study, log=None):
+        names.append(name)
+        results_one = goeaobj.run_study(name2study[name], log=None)
+        _chk_results(results_batch, results_one)
+    assert names == list(name2study)
+
+
+def test_run_studies_selected():
+    """Test run_studies with user-selected GO IDs."""
+    goeaobj = get_goeaobj()
+    selected = {"GO:0008150", "GO:0003674", "GO:0005840"}
+    study_ids = get_ids("tests/data/small_study")
+    _, results = next(goeaobj.run_studies({"small_study": study_ids}, selected_goids=selected))
+    assert {r.GO for r in results} == selected
+    _chk_results(results, goeaobj.run_study(study_ids, selected_goids=selected))
+
+
+def _chk_results(results_batch, results_one):
+    """Check that two lists of GOEA results are equivalent."""
+    assert len(results_batch) == len(results_one)
+    go2rec = {r.GO: r for r in results_one}
+    for rec in results_batch:
+        exp = go2rec[rec.GO]
+        assert rec.study_items == exp.study_items, rec.GO
+        assert rec.pop_items == exp.pop_items, rec.GO
+        assert rec.ratio_in_study == exp.ratio_in_study, rec.GO
+        assert rec.ratio_in_pop == exp.ratio_in_pop, rec.GO
+        assert rec.NS == exp.NS
+        assert np.isclose(rec.p_uncorrected, exp.p_uncorrected, rtol=1e-12)
+        assert np.isclose(rec.p_holm, exp.p_holm, rtol=1e-12)
+
+
+if __name__ == "__main__":
+    test_run_studies()
+    test_run_studies_selected()
+
+# Copyright (C) 2010-present, DV Klopfenstein, H Tang. All rights reserved.
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+"""Test saving TermCounts to an IC table and using the IC table in place of TermCounts."""
+
+import os
+import tempfile
+
+import numpy as np
+
+from goatools.obo_parser import GODag
+from goatools.anno.gaf_reader import GafReader
+from goatools.semantic import TermCounts
+from goatools.semantic import get_info_content
+from goatools.semantic import resnik_sim
+from goatools.semantic import lin_sim
+from goatools.semantic import schlicker_sim
+from goatools.semsim.ic_table import ICTable
+from goatools.semsim.termwise.similarity_matrix import SimilarityMatrix
+
+__copyright__ = "Copyright (C) 2020-present, DV Klopfenstein. All rights reserved."
+
+REPO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def test_ic_table():
+    """Test that an IC table gives the same IC and similarities as TermCounts"""
+    godag = GODag(os.path.join(REPO, "tests/data/goslim_generic.obo"), prt=None)
+    goids = sorted(godag)
+    annots = {"gene{I}".format(I=i): set(goids[i::17]) for i in range(50)}
+    tcntobj = TermCounts(godag, annots)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        fin_gaf = os.path.join(tmpdir, "mini.gaf")
+        _wr_gaf(fin_gaf)
+        anno_date = GafReader(fin_gaf, hdr_only=True).get_date()
+        assert anno_date == "2024-01-15"
+        fout_npz = os.path.join(tmpdir, "ic.npz")
+        tcntobj.save(fout_npz, anno_date=anno_date)
+        # The IC table is read only if made from the same GO DAG and annotation versions
+        assert ICTable.load(os.path.join(tmpdir, "none.npz")) is None
+        assert ICTable.load(fout_npz, godag, "2024-02-01") is None
+        assert ICTable.load(fout_npz, anno_date=anno_date, data_version="releases/1999") is None
+        ictbl = ICTable.load(fout_npz, godag, anno_date)
+    assert ictbl.data_version == godag.data_version
+    assert ictbl.anno_date == anno_date
+    assert ictbl.num_genes == len(tcntobj.gene2gos)
+    assert ictbl.gocnts == tcntobj.gocnts
+    assert ictbl.aspect_counts == tcntobj.aspect_counts
+    for goid in goids:
+        assert get_info_content(goid, ictbl) == get_info_content(goid, tcntobj)
+        assert ictbl.get_term_freq(goid) == tcntobj.get_term_freq(goid)
+        assert ictbl.get_count(goid) == tcntobj.get_count(goid)
+    for go_a in goids[::7]:
+        for go_b in goids[::5]:
+            for fnc in [resnik_sim, lin_sim, schlicker_sim]:
+                assert fnc(go_a, go_b, godag, ictbl) == fnc(go_a, go_b, godag, tcntobj)
+    mtx_act = SimilarityMatrix(goids, godag, ictbl).get_matrix("lin")
+    mtx_exp = SimilarityMatrix(goids, godag, tcntobj).get_matrix("lin")
+    assert np.array_equal(mtx_act, mtx_exp, equal_nan=True)
+
+
+def _wr_gaf(fout_gaf):
+    """Write a GAF file with a date in the header"""
+    with open(fout_gaf, "w", encoding="utf-8") as prt:
+        prt.write("!gaf-version: 2.2\n")
+        prt.write("!generated-by: MGI\n")
+        prt.write("!date-generated: 2024-01-15\n")
+        prt.write("\t".join(["MGI", "MGI:1918911", "0610005C13Rik", "enables", "GO:0003674",
+                             "GO_REF:0000015", "ND", "", "F", "RIKEN cDNA", "", "protein",
+                             "taxon:10090", "20100209", "MGI", "", ""]) + "\n")
+
+
+if __name__ == "__main__":
+    test_ic_table()
+
+# Copyright (C) 2020-present, DV Klopfenstein. All rights reserved.
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+"""Test that GO slim mapping in one sweep matches mapping using all paths to the top."""
+
+import os
+
+from goatools.obo_parser import GODag
+from goatools.mapslim import mapslim
+from goatools.mapslim import get_slimmapper
+from goatools.mapslim import SlimMapper
+
+__copyright__ = "Copyright (C) 2010-present, H Tang et al. All rights reserved."
+
+REPO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def test_mapslim_mini():
+    """Test the map2slim example: a small GO DAG and an even smaller GO slim."""
+    go_dag = GODag(os.path.join(REPO, "tests/data/mini_obo.obo"), prt=None)
+    goslim_dag = GODag(os.path.join(REPO, "tests/data/mini_slim_obo.obo"), prt=None)
+    expected_results = {
+        'GO:0000005': ({'GO:0000002', 'GO:0000003'}, {'GO:0000001', 'GO:0000002', 'GO:0000003'}),
+        'GO:0000006': ({'GO:0000003'}, {'GO:0000001', 'GO:0000003'}),
+        'GO:0000007': ({'GO:0000004'}, {'GO:0000001', 'GO:0000003', 'GO:0000004'}),
+        'GO:0000008': ({'GO:0000003'}, {'GO:0000001', 'GO:0000003'}),
+        'GO:0000009': ({'GO:0000004'}, {'GO:0000001', 'GO:0000003', 'GO:0000004'}),
+        'GO:0000010': ({'GO:0000002', 'GO:0000003'}, {'GO:0000001', 'GO:0000002', 'GO:0000003'}),
+    }
+    for go_term, exp in expected_results.items():
+        assert mapslim(go_term, go_dag, goslim_dag) == exp
+    # The mapper is built once for a GO DAG and GO slim
+    assert get_slimmapper(go_dag, goslim_dag) is get_slimmapper(go_dag, goslim_dag)
+    objmap = get_slimmapper(go_dag, goslim_dag)
+    assert objmap.get_slims_goids({'GO:0000006', 'GO:0000007', 'GO:9999999'}) == \
+        ({'GO:0000004'}, {'GO:0000001', 'GO:0000003', 'GO:0000004'})
+
+
+def test_mapslim_paths():
+    """Test one-sweep GO slim mapping against mapping using all paths to the top."""
+    go_dag = GODag(os.path.join(REPO, "tests/data/goslim_generic.obo"), prt=None)
+    goids = sorted(set(o.item_id for o in go_dag.values()))
+    for step in [3, 7, 20]:
+        slims = set(goids[::step])
+        objmap = SlimMapper(go_dag, slims)
+        for goid in go_dag:
+            assert objmap.get_slims(goid) == _get_slims_paths(goid, go_dag, slims), goid
+        id2goids = {"gene{I}".format(I=i): set(goids[i::11]) for i in range(11)}
+        for only_direct in [True, False]:
+            exp = {}
+            for gene, gos in id2goids.items():
+                all_anc = set()
+                covered = set()
+                for goid in gos:
+                    direct_cur, all_cur = _get_slims_paths(goid, go_dag, slims)
+                    all_anc |= all_cur
+                    covered |= all_cur - direct_cur
+                exp[gene] = all_anc - covered if only_direct else all_anc
+            assert objmap.get_id2slims(id2goids, only_direct) == exp
+
+
+def _get_slims_paths(go_term, go_dag, slims):
+    """Map a GO term to GO slim terms by walking every path to the top."""
+    all_ancestors = set()
+    covered_ancestors = set()
+    for path in go_dag.paths_to_top(go_term):
+        got_leaf = False
+        for term in reversed(path):
+            if term.item_id in slims:
+                all_ancestors.add(term.item_id)
+                if got_leaf:
+                    covered_ancestors.add(term.item_id)
+                got_leaf = True
+    return all_ancestors - covered_ancestors, all_ancestors
+
+
+if __name__ == "__main__":
+    test_mapslim_mini()
+    test_mapslim_paths()
+
+# Copyright (C) 2010-present, H Tang et al. All rights reserved.
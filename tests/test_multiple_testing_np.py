@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+"""Test multiple-test corrections vectorized with NumPy against statsmodels."""
+
+import itertools
+
+import numpy as np
+from statsmodels.stats.multitest import multipletests
+
+from goatools.multiple_testing import HolmBonferroni
+from goatools.multiple_testing_np import METHODS
+from goatools.multiple_testing_np import get_corrected_pvals
+from tests.utils import get_goeaobj
+from tests.utils import get_ids
+
+__copyright__ = "Copyright (C) 2010-present, H Tang et al., All rights reserved."
+
+
+def test_corrected_pvals():
+    """Test each row of 2-D corrections against statsmodels, including ties and p-values of 1"""
+    rng = np.random.default_rng(7)
+    for num in [1, 2, 3, 10, 57]:
+        pvals = rng.uniform(0, 1, (5, num))**3
+        pvals[:, ::3] = np.round(pvals[:, ::3], 2)
+        pvals[0, :2] = 1.0
+        for method in METHODS:
+            act = get_corrected_pvals(pvals, method)
+            assert act.shape == pvals.shape
+            for row, pvals_row in zip(act, pvals):
+                exp = multipletests(pvals_row, 0.05, method)[1]
+                assert np.allclose(row, exp, rtol=1e-12, atol=0), (method, num)
+                assert np.array_equal(get_corrected_pvals(pvals_row, method), row)
+    assert get_corrected_pvals([], "fdr_bh").size == 0
+
+
+def test_holmbonferroni_vectorized():
+    """Test the vectorized local Holm-Bonferroni against grouping sorted p-values"""
+    rng = np.random.default_rng(3)
+    for _ in range(100):
+        pvals = np.round(rng.uniform(0, 1.2, rng.integers(1, 30)), 1).clip(0, 1).tolist()
+        exp = np.array(pvals)
+        num_pvals = len(pvals)
+        srt = sorted(zip(pvals, range(len(pvals))))
+        for _, idxs in itertools.groupby(srt, lambda x: x[0]):
+            idxs = list(idxs)
+            for pval, idx in idxs:
+                if pval < 1.:
+                    exp[idx] = pval*num_pvals
+            num_pvals -= len(idxs)
+        exp[exp > 1] = 1
+        assert np.array_equal(HolmBonferroni(pvals).corrected_pvals, exp)
+
+
+def test_goea_np_methods():
+    """Test GOEAs using np_ methods against statsmodels on the uncorrected p-values"""
+    methods = ["np_{M}".format(M=m) for m in METHODS]
+    goeaobj = get_goeaobj(methods)
+    results = goeaobj.run_study(get_ids("tests/data/small_study"), log=None, columnar=True)
+    for method in METHODS:
+        exp = multipletests(results.p_uncorrected, 0.05, method)[1]
+        act = [getattr(r, "p_np_{M}".format(M=method)) for r in results]
+        assert np.allclose(act, exp, rtol=1e-12, atol=0)
+
+
+if __name__ == "__main__":
+    test_corrected_pvals()
+    test_holmbonferroni_vectorized()
+    test_goea_np_methods()
+
+# Copyright (C) 2010-present, H Tang et al., All rights reserved.
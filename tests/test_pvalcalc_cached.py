@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+"""Test Fisher p-values from cached tables, shared across GOEAs, against fisher_vectorized."""
+
+import numpy as np
+
+from goatools.go_enrichment import GOEnrichmentStudy
+from goatools.pvalcalc import FisherCached
+from goatools.pvalcalc import FisherFactory
+from goatools.pvalcalc import PvalTableCache
+from tests.utils import get_goea_data
+from tests.utils import get_ids
+
+__copyright__ = "Copyright (C) 2016-present, DV Klopfenstein, H Tang et al., All rights reserved."
+
+
+def test_pvalcalc_cached():
+    """Test cached p-values, hits and misses, and the bounded size of the cache"""
+    obj_vec = FisherFactory(pvalcalc="fisher_vectorized", log=None).pval_obj
+    obj_cache = FisherFactory(pvalcalc="fisher_cached", log=None).pval_obj
+    assert isinstance(obj_cache, FisherCached)
+    cache = obj_cache.cache = PvalTableCache(max_values=3000)
+    rng = np.random.default_rng(5)
+    pop_n = 900
+    pop_counts = rng.integers(0, 200, 300)
+    for study_n in [40, 40, 7, 40]:
+        study_counts = np.minimum(pop_counts, rng.integers(0, study_n + 1, pop_counts.size))
+        exp = obj_vec.calc_pvalues(study_counts, study_n, pop_counts, pop_n)
+        act = obj_cache.calc_pvalues(study_counts, study_n, pop_counts, pop_n)
+        assert np.array_equal(act, exp)
+        assert cache.get_info().values <= 3000
+    info = cache.get_info()
+    assert info.hits and info.misses
+    assert info.values == sum(t.size for t in cache.key2tbl.values())
+    # The least recently used tables were removed; the last study's tables are kept
+    num_uniq = np.unique(pop_counts).size
+    assert cache.get_info().tables < 3*num_uniq
+    obj_cache.calc_pvalues([0], 40, [int(pop_counts[-1])], pop_n)
+    assert cache.get_info().hits == info.hits + 1
+    cache.clear()
+    assert cache.get_info() == (0, 0, 0, 0, 3000)
+
+
+def test_goea_pvalcalc_cached():
+    """Test that GOEAs on one population share p-value tables"""
+    obo_dag, assoc, pop = get_goea_data()
+    study = get_ids("tests/data/small_study")
+    FisherCached.cache.clear()
+    kws = {"methods": ["bonferroni"], "log": None}
+    goea_a = GOEnrichmentStudy(pop, assoc, obo_dag, pvalcalc="fisher_cached", **kws)
+    goea_b = GOEnrichmentStudy(pop, assoc, obo_dag, pvalcalc="fisher_cached", alpha=0.01, **kws)
+    goea_exp = GOEnrichmentStudy(pop, assoc, obo_dag, pvalcalc="fisher_vectorized", **kws)
+    exp = {r.GO: r.p_uncorrected for r in goea_exp.run_study(study)}
+    assert {r.GO: r.p_uncorrected for r in goea_a.run_study(study)} == exp
+    misses = FisherCached.cache.get_info().misses
+    assert {r.GO: r.p_uncorrected for r in goea_b.run_study(study)} == exp
+    info = FisherCached.cache.get_info()
+    assert info.misses == misses and info.hits == misses
+    FisherCached.cache.clear()
+
+
+if __name__ == "__main__":
+    test_pvalcalc_cached()
+    test_goea_pvalcalc_cached()
+
+# Copyright (C) 2016-present, DV Klopfenstein, H Tang et al., All rights reserved.
@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+"""Test that the vectorized Fisher's exact test matches scipy's fisher_exact."""
+
+import os
+
+import numpy as np
+
+from goatools.obo_parser import GODag
+from goatools.pvalcalc import FisherFactory
+from tests.utils import REPO
+from tests.utils import get_goeaobj
+from tests.utils import get_ids
+
+__copyright__ = "Copyright (C) 2016-present, DV Klopfenstein, H Tang et al., All rights reserved."
+
+
+def test_pvals_random_margins():
+    """Compare vectorized p-values to scipy p-values for many random margins."""
+    obj_scipy = FisherFactory(pvalcalc="fisher_scipy_stats", log=None).pval_obj
+    obj_vec = FisherFactory(pvalcalc="fisher_vectorized", log=None).pval_obj
+    rng = np.random.default_rng(1234)
+    for pop_n, study_n in [(16, 10), (20, 20), (50, 1), (500, 250), (2000, 37)]:
+        pop_counts = rng.integers(0, pop_n + 1, 300)
+        pop_counts[:4] = [0, 1, pop_n - 1, pop_n]
+        study_counts = np.array([
+            rng.integers(max(0, study_n + pcnt - pop_n), min(study_n, pcnt) + 1)
+            for pcnt in pop_counts])
+        pvals_scipy = obj_scipy.calc_pvalues(study_counts, study_n, pop_counts, pop_n)
+        pvals_vec = obj_vec.calc_pvalues(study_counts, study_n, pop_counts, pop_n)
+        assert np.allclose(pvals_vec, pvals_scipy, rtol=1e-9, atol=0), (pop_n, study_n)
+    # Whales and sharks example from FisherScipyStats
+    assert np.isclose(obj_vec.calc_pvalue(8, 10, 9, 16), 0.034965034965034975, rtol=1e-12)
+
+
+def test_goea_vectorized():
+    """Compare GOEA results using scipy and vectorized Fisher's exact tests."""
+    study_ids = get_ids("tests/data/small_study")
+    obo_dag = GODag(os.path.join(REPO, "data/i86.obo"), load_obsolete=True, prt=None)
+    go2pval = {}
+    for pvalcalc in ["fisher_scipy_stats", "fisher_vectorized"]:
+        goeaobj = get_goeaobj(["bonferroni"], obo_dag, pvalcalc=pvalcalc)
+        results = goeaobj.run_study(study_ids, log=None)
+        go2pval[pvalcalc] = {r.GO: (r.p_uncorrected, r.p_bonferroni) for r in results}
+    go2pval_scipy = go2pval["fisher_scipy_stats"]
+    go2pval_vec = go2pval["fisher_vectorized"]
+    assert go2pval_scipy.keys() == go2pval_vec.keys()
+    for goid, pvals_scipy in go2pval_scipy.items():
+        assert np.allclose(go2pval_vec[goid], pvals_scipy, rtol=1e-9, atol=0), goid
+
+
+if __name__ == "__main__":
+    test_pvals_random_margins()
+    test_goea_vectorized()
+
+# Copyright (C) 2016-present, DV Klopfenstein, H Tang et al., All rights reserved.
@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+"""Test study and population GO terms and counts from an association matrix."""
+
+import os
+from collections import defaultdict, Counter
+
+from goatools.anno.assc_matrix import AsscMatrix
+from goatools.anno.assc_matrix import AsscView
+from goatools.anno.assc_matrix import get_assc_matrix
+from goatools.associations import read_associations
+from goatools.obo_parser import GODag
+from goatools.ratio import count_terms
+from goatools.ratio import get_terms
+
+__copyright__ = "Copyright (C) 2010-present, H Tang et al., All rights reserved."
+
+REPO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def test_get_terms():
+    """Test GO terms and counts against looping over the association"""
+    godag = GODag(os.path.join(REPO, "tests/data/goslim_generic.obo"), prt=None)
+    assoc = read_associations(os.path.join(REPO, "tests/data/small_association"), "id2gos",
+                              no_top=True)
+    genes = sorted(assoc)
+    # GO IDs not in the GO DAG are ignored; alternate GO IDs are counted as main GO IDs
+    goid_alt = next(a for a, o in godag.items() if a != o.id)
+    assoc[genes[0]] = assoc[genes[0]].union({"GO:0000000", goid_alt})
+    study = genes[:40] + genes[:5] + ["NOT_A_GENE"]
+    view = AsscView(AsscMatrix(assoc, godag))
+    for geneset in [study, genes, [], ["NOT_A_GENE"]]:
+        exp = _get_terms(geneset, assoc, godag)
+        for assc in [assoc, view]:
+            act = get_terms("study", geneset, assc, godag, None)
+            assert set(act) == set(exp) and len(act) == len(exp)
+            assert dict(act.items()) == exp
+            assert count_terms(geneset, assc, godag) == _count_terms(geneset, assoc, godag)
+        assert act.get_go2cnt() == {go: len(s) for go, s in exp.items()}
+    for assc in [assoc, view]:
+        assert godag[goid_alt].id in get_terms("study", study, assc, godag, None)
+        assert "GO:0000000" not in get_terms("study", study, assc, godag, None)
+    # Counts of GO IDs which are not annotated are 0
+    goitems = get_terms("study", study, view, godag, None)
+    goid = next(iter(goitems))
+    assert goitems.get_counts([goid, "GO:0000000"]).tolist() == [len(goitems[goid]), 0]
+    # Sets of items are made once
+    assert goitems[goid] is goitems[goid]
+
+
+def test_assc_changed():
+    """Test GO terms of an association changed in place; an AsscView's matrix is reused"""
+    godag = GODag(os.path.join(REPO, "tests/data/goslim_generic.obo"), prt=None)
+    assoc = read_associations(os.path.join(REPO, "tests/data/small_association"), "id2gos",
+                              no_top=True)
+    genes = sorted(assoc)[:30]
+    exp = _count_terms(genes, assoc, godag)
+    assert count_terms(genes, assoc, godag) == exp
+    # Swap a GO ID, keeping the number of genes and annotations
+    gene = genes[0]
+    goid_old = next(iter(assoc[gene]))
+    goid_new = next(go for go in godag if godag[go].id not in exp)
+    assoc[gene] = (assoc[gene] - {goid_old}) | {goid_new}
+    assert count_terms(genes, assoc, godag) == _count_terms(genes, assoc, godag)
+    assert dict(get_terms("study", genes, assoc, godag, None).items()) == \
+        _get_terms(genes, assoc, godag)
+    assert godag[goid_new].id in get_terms("study", genes, assoc, godag, None)
+    # A read-only view holds its matrix, which is used for every gene set
+    view = AsscView(AsscMatrix(assoc, godag))
+    assert get_assc_matrix(view, godag, genes) is view.assc_mtx
+    assert count_terms(genes, view, godag) == _count_terms(genes, assoc, godag)
+
+
+def _get_terms(geneset, assoc, obo_dag):
+    """Get the terms in the study group by looping over the association"""
+    term2itemids = defaultdict(set)
+    for gene in (g for g in geneset if g in assoc):
+        for goid in assoc[gene]:
+            if goid in obo_dag:
+                term2itemids[obo_dag[goid].id].add(gene)
+    return term2itemids
+
+
+def _count_terms(geneset, assoc, obo_dag):
+    """Count the number of terms in the study group by looping over the association"""
+    term_cnt = Counter()
+    for gene in (g for g in geneset if g in assoc):
+        for goid in assoc[gene]:
+            if goid in obo_dag:
+                term_cnt[obo_dag[goid].id] += 1
+    return term_cnt
+
+
+if __name__ == "__main__":
+    test_get_terms()
+    test_assc_changed()
+
+# Copyright (C) 2010-present, H Tang et al., All rights reserved.
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+"""Test gene-to-gene (groupwise) semantic similarity against double loops over GO terms."""
+
+import os
+import tempfile
+
+import numpy as np
+
+from goatools.obo_parser import GODag
+from goatools.semantic import TermCounts
+from goatools.semantic import lin_sim
+from goatools.semsim.termwise.wang import SsWang
+from goatools.semsim.groupwise.gene_similarity import GeneSimilarity
+
+__copyright__ = "Copyright (C) 2020-present, DV Klopfenstein. All rights reserved."
+
+REPO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def test_gene_similarity():
+    """Test best-match average, max and average gene similarities"""
+    godag = GODag(os.path.join(REPO, "tests/data/goslim_generic.obo"),
+                  optional_attrs={"relationship"}, prt=None)
+    goids = sorted(set(o.item_id for o in godag.values()))
+    assc = {"gene{I:02}".format(I=i): set(goids[i::23]) for i in range(30)}
+    assc["gene_nogo"] = {"GO:9999999"}
+    termcounts = TermCounts(godag, assc)
+    objsim = GeneSimilarity(godag, termcounts, assc, "lin", "BP")
+    termsim = lambda a, b: lin_sim(a, b, godag, termcounts)
+    for aggregator in ["bma", "max", "avg"]:
+        mtx = objsim.get_matrix(aggregator=aggregator, chunk_size=7)
+        _chk_mtx(mtx, objsim.genes, assc, godag, termsim, aggregator)
+        assert np.array_equal(
+            objsim.get_matrix(aggregator=aggregator, chunk_size=9, workers=3), mtx, equal_nan=True)
+        assert np.isclose(objsim.get_sim("gene03", "gene05", aggregator), mtx[3, 5])
+    # A subset of genes; Writing the matrix to a file
+    genes = ["gene07", "gene02", "gene_nogo"]
+    mtx = objsim.get_matrix(genes)
+    _chk_mtx(mtx, genes, assc, godag, termsim, "bma")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        fout_npy = os.path.join(tmpdir, "genesim.npy")
+        objsim.get_matrix(genes, fout=fout_npy)
+        assert np.array_equal(np.load(fout_npy), mtx, equal_nan=True)
+    # Wang term similarities
+    objsim = GeneSimilarity(godag, termcounts, assc, "wang", "BP", relationships={"part_of"})
+    objwang = SsWang(goids, godag, {"part_of"})
+    _chk_mtx(objsim.get_matrix(), objsim.genes, assc, godag, objwang.get_sim, "bma")
+
+
+def _chk_mtx(mtx, genes, assc, godag, termsim, aggregator):
+    """Check gene similarities against double loops over the genes' BP GO terms"""
+    gene2gos = {g: sorted(go for go in assc[g] if go in godag and
+                          godag[go].namespace == "biological_process") for g in genes}
+    for idx_a, gene_a in enumerate(genes):
+        for idx_b, gene_b in enumerate(genes):
+            gos_a = gene2gos[gene_a]
+            gos_b = gene2gos[gene_b]
+            if not gos_a or not gos_b:
+                assert np.isnan(mtx[idx_a, idx_b])
+                continue
+            sims = np.array([[termsim(a, b) or 0.0 for b in gos_b] for a in gos_a])
+            if aggregator == "bma":
+                exp = (sims.max(axis=1).sum() + sims.max(axis=0).sum())/(len(gos_a) + len(gos_b))
+            elif aggregator == "max":
+                exp = sims.max()
+            else:
+                exp = sims.mean()
+            assert np.isclose(mtx[idx_a, idx_b], exp, rtol=1e-5), (gene_a, gene_b, aggregator)
+
+
+if __name__ == "__main__":
+    test_gene_similarity()
+
+# Copyright (C) 2020-present, DV Klopfenstein. All rights reserved.
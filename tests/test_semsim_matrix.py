@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+"""Test that similarity matrices match the pairwise Resnik, Lin, Schlicker and Wang functions."""
+
+import os
+import tempfile
+
+import numpy as np
+from scipy.spatial.distance import squareform
+
+from goatools.obo_parser import GODag
+from goatools.semantic import TermCounts
+from goatools.semantic import resnik_sim
+from goatools.semantic import lin_sim
+from goatools.semantic import schlicker_sim
+from goatools.semantic import common_parent_go_ids
+from goatools.semantic import get_info_content
+from goatools.semsim.termwise.wang import SsWang
+from goatools.semsim.termwise.similarity_matrix import SimilarityMatrix
+from goatools.semsim.termwise.similarity_matrix import similarity_matrix
+
+__copyright__ = "Copyright (C) 2020-present, DV Klopfenstein. All rights reserved."
+
+REPO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def test_similarity_matrix():
+    """Test Resnik, Lin, Schlicker and Wang similarity matrices against pairwise values."""
+    godag = GODag(os.path.join(REPO, "tests/data/goslim_generic.obo"),
+                  optional_attrs={"relationship"}, prt=None)
+    goids = sorted(set(o.item_id for o in godag.values()))
+    termcounts = TermCounts(godag, {"gene{I}".format(I=i): set(goids[i::13]) for i in range(40)})
+    objsim = SimilarityMatrix(goids, godag, termcounts)
+    method2fnc = {
+        "resnik": lambda a, b: resnik_sim(a, b, godag, termcounts),
+        "lin": lambda a, b: lin_sim(a, b, godag, termcounts),
+        "schlicker": lambda a, b: schlicker_sim(a, b, godag, termcounts),
+    }
+    for method, fnc in method2fnc.items():
+        mtx = objsim.get_matrix(method, block_size=37)
+        assert mtx.dtype == np.float32
+        _chk_mtx(mtx, goids, fnc)
+    objwang = SsWang(goids, godag, {"part_of"})
+    mtx = similarity_matrix(goids, godag, "wang", relationships={"part_of"}, block_size=50)
+    _chk_mtx(mtx, goids, objwang.get_sim)
+    # Condensed matrices and matrices written to a file
+    dense = objsim.get_matrix("lin")
+    condensed = objsim.get_matrix("lin", condensed=True, block_size=29)
+    offdiag = ~np.eye(len(goids), dtype=bool)
+    assert np.array_equal(squareform(condensed, checks=False)[offdiag], dense[offdiag],
+                          equal_nan=True)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        fout_npy = os.path.join(tmpdir, "lin.npy")
+        objsim.get_matrix("lin", block_size=64, fout=fout_npy)
+        assert np.array_equal(np.load(fout_npy), dense, equal_nan=True)
+
+
+def test_similarity_matrix_ties():
+    """Test that the deepest common ancestor with the highest IC is the MSCA"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        fin_obo = os.path.join(tmpdir, "ties.obo")
+        _wr_obo_ties(fin_obo)
+        godag = GODag(fin_obo, prt=None)
+    goids = sorted(godag)
+    assc = {"gene{I}".format(I=i): {go} for i, go in enumerate(goids)}
+    assc["gene_b"] = {"GO:0000003"}
+    termcounts = TermCounts(godag, assc)
+    mtx = similarity_matrix(goids, godag, "resnik", termcounts)
+    num_ties = 0
+    for idx_a, go_a in enumerate(goids):
+        for idx_b, go_b in enumerate(goids):
+            goids_common = common_parent_go_ids([go_a, go_b], godag)
+            depth = max(godag[go].depth for go in goids_common)
+            deepest = [go for go in goids_common if godag[go].depth == depth]
+            num_ties += len(deepest) > 1
+            exp = max(get_info_content(go, termcounts) for go in deepest)
+            assert np.isclose(mtx[idx_a, idx_b], exp)
+    assert num_ties
+
+
+def _wr_obo_ties(fout_obo):
+    """Write a GO DAG where GO:0000004 and GO:0000005 have two deepest common ancestors."""
+    go2parents = {
+        "GO:0000001": [],
+        "GO:0000002": ["GO:0000001"],
+        "GO:0000003": ["GO:0000001"],
+        "GO:0000004": ["GO:0000002", "GO:0000003"],
+        "GO:0000005": ["GO:0000002", "GO:0000003"],
+        "GO:0000006": ["GO:0000005"],
+    }
+    with open(fout_obo, "w", encoding="utf-8") as prt:
+        prt.write("format-version: 1.2\n")
+        for goid, parents in go2parents.items():
+            prt.write("\n[Term]\nid: {GO}\nname: {GO}\nnamespace: biological_process\n".format(
+                GO=goid))
+            for parent in parents:
+                prt.write("is_a: {GO}\n".format(GO=parent))
+
+
+def _chk_mtx(mtx, goids, fnc):
+    """Check a similarity matrix against a function of two GO IDs."""
+    for idx_a, go_a in enumerate(goids):
+        for idx_b, go_b in enumerate(goids):
+            exp = fnc(go_a, go_b)
+            exp = np.nan if exp is None else exp
+            assert np.isclose(mtx[idx_a, idx_b], exp, equal_nan=True), (go_a, go_b)
+
+
+if __name__ == "__main__":
+    test_similarity_matrix()
+    test_similarity_matrix_ties()
+
+# Copyright (C) 2020-present, DV Klopfenstein. All rights reserved.
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+"""Test that S-values computed in one topological pass match Wang's DagA S-values."""
+
+import os
+
+import numpy as np
+
+from goatools.obo_parser import GODag
+from goatools.godag.go_tasks import get_go2ancestors
+from goatools.semsim.termwise.wang import SsWang
+from goatools.semsim.termwise.wang_svalues import WangSValues
+
+__copyright__ = "Copyright (C) 2020-present, DV Klopfenstein. All rights reserved."
+
+REPO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def test_wang_svalues():
+    """Test S-values, semantic values and similarities against DagA and paths to the top"""
+    godag = GODag(os.path.join(REPO, "tests/data/goslim_generic.obo"),
+                  optional_attrs={"relationship"}, prt=None)
+    goids = sorted(set(o.item_id for o in godag.values()))
+    rels_all = set(SsWang.dflt_rel2scf).difference({"is_a"})
+    for rels, rel2scf in [(None, None), ({"part_of"}, None), ({"part_of"}, {"is_a": 0.9}),
+                          (rels_all, {"is_a": 0.9, "part_of": 0.7})]:
+        objwang = SsWang(goids, godag, rels, rel2scf)
+        objsv = WangSValues(godag, objwang.w_e)
+        go2dag = objwang.go2dag if rels != rels_all else None
+        for goid in goids:
+            go2svalue = objsv.get_go2svalue(goid)
+            exp = _get_go2svalue_paths(godag[goid], objwang.w_e)
+            assert go2svalue.keys() == exp.keys(), goid
+            for go_anc, sval in exp.items():
+                assert np.isclose(go2svalue[go_anc], sval)
+            assert np.isclose(objsv.get_sv(goid), sum(exp.values()))
+            if go2dag is not None:
+                dag = go2dag[goid]
+                assert exp.keys() == dag.go2svalue.keys()
+                assert np.allclose([exp[go] for go in exp], [dag.go2svalue[go] for go in exp])
+        for go_a in goids[::3]:
+            for go_b in goids[::5]:
+                if go2dag is not None:
+                    assert np.isclose(objwang.get_sim(go_a, go_b),
+                                      _get_sim_daga(go2dag, go_a, go_b))
+
+
+def test_wang_svalues_lazy():
+    """Test that only the requested GO IDs and their ancestors are computed"""
+    godag = GODag(os.path.join(REPO, "tests/data/goslim_generic.obo"),
+                  optional_attrs={"relationship"}, prt=None)
+    goids = ["GO:0022618", "GO:0005739"]
+    objwang = SsWang(goids, godag, {"part_of"})
+    objsv = objwang.svalues
+    go2ancestors = get_go2ancestors({godag[go] for go in goids}, {"part_of"})
+    exp = set(goids).union(*go2ancestors.values())
+    assert set(o.item_id for o in godag.values() if o.item_id in objsv) == exp
+    assert objsv.svalues.getnnz(axis=1).astype(bool).sum() == len(exp)
+    assert objwang.get_sim(goids[0], "GO:0008150") is not None
+    assert objwang.get_sim(goids[0], "GO:0003674") is None
+
+
+def _get_go2svalue_paths(goterm, w_e):
+    """S-values: the highest product of edge weights on any path up to each ancestor"""
+    go2svalue = {goterm.item_id: 1.0}
+    uppers = [(p, w_e["is_a"]) for p in goterm.parents]
+    for rel, parents in getattr(goterm, "relationship", {}).items():
+        if rel in w_e:
+            uppers.extend((p, w_e[rel]) for p in parents)
+    for upper, weight in uppers:
+        for goid, sval in _get_go2svalue_paths(upper, w_e).items():
+            go2svalue[goid] = max(go2svalue.get(goid, 0.0), weight*sval)
+    return go2svalue
+
+
+def _get_sim_daga(go2dag, go_a, go_b):
+    """Wang's similarity using DagA"""
+    dag_a = go2dag[go_a]
+    dag_b = go2dag[go_b]
+    goids_ab = set(dag_a.goids).intersection(dag_b.goids)
+    s_ab = sum([*dag_a.get_svalues(goids_ab), *dag_b.get_svalues(goids_ab)])
+    return s_ab/(dag_a.get_sv() + dag_b.get_sv())
+
+
+if __name__ == "__main__":
+    test_wang_svalues()
+    test_wang_svalues_lazy()
+
+# Copyright (C) 2020-present, DV Klopfenstein. All rights reserved.
@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+"""Test TermCounts namespace views and annotation deltas against newly built TermCounts."""
+
+import os
+import random
+
+from goatools.obo_parser import GODag
+from goatools.semantic import TermCounts
+from goatools.semantic import get_info_content
+from goatools.godag.consts import NS2NAMESPACE
+
+__copyright__ = "Copyright (C) 2016-present, DV Klopfenstein, H Tang, All rights reserved."
+
+REPO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def test_termcounts_ns():
+    """Test TermCounts for one namespace, made from TermCounts for all namespaces"""
+    godag = GODag(os.path.join(REPO, "tests/data/goslim_generic.obo"),
+                  optional_attrs={"relationship"}, prt=None)
+    annots = _get_annots(godag, random.Random(3))
+    for relationships in [None, True]:
+        tcntobj = TermCounts(godag, annots, relationships)
+        for nspc in ["BP", "MF", "CC"]:
+            namespace = NS2NAMESPACE[nspc]
+            annots_ns = {g: set(go for go in gos if go in godag and
+                                godag[go].namespace == namespace)
+                         for g, gos in annots.items()}
+            annots_ns = {g: gos for g, gos in annots_ns.items() if gos}
+            _chk_tcnt(tcntobj.get_termcounts_ns(nspc), TermCounts(godag, annots_ns, relationships))
+
+
+def test_termcounts_update():
+    """Test adding and removing annotations"""
+    godag = GODag(os.path.join(REPO, "tests/data/goslim_generic.obo"),
+                  optional_attrs={"relationship"}, prt=None)
+    rng = random.Random(7)
+    goids = sorted(godag)
+    for relationships in [None, {"part_of"}]:
+        annots = _get_annots(godag, rng)
+        tcntobj = TermCounts(godag, annots, relationships)
+        for step in range(12):
+            if step % 3 == 0:
+                # Counts, frequencies and IC are updated in the GoSubDag
+                assert tcntobj.gosubdag
+            add = {}
+            remove = {}
+            for gene in rng.sample(sorted(annots), 5):
+                # Removing a GO ID removes its main GO ID, so keep alt GO IDs
+                gos = sorted(go for go in annots[gene] if godag[go].item_id == go and
+                             not godag[go].alt_ids.intersection(annots[gene]))
+                if gos:
+                    remove[gene] = {rng.choice(gos)}
+            # Adding GO IDs which are not in the GoSubDag creates a new GoSubDag when needed
+            for gene in ["gene{I}".format(I=rng.randrange(45)) for _ in range(5*(step % 2))]:
+                add[gene] = set(rng.sample(goids, 2))
+            goids_chg = tcntobj.update_annotations(add, remove)
+            for gene, gos in remove.items():
+                annots[gene] = annots[gene].difference(gos)
+            for gene, gos in add.items():
+                annots[gene] = annots.get(gene, set()).union(gos)
+            exp = TermCounts(godag, annots, relationships)
+            assert goids_chg.issuperset(
+                set(exp.goids).symmetric_difference(tcntobj.goids))
+            _chk_tcnt(tcntobj, exp)
+
+
+def _chk_tcnt(act, exp):
+    """Check that two TermCounts have the same counts and information content"""
+    assert act.annots == exp.annots
+    assert act.go2genes == exp.go2genes
+    assert act.gene2gos == exp.gene2gos
+    assert act.goids == exp.goids
+    assert act.gocnts == exp.gocnts
+    assert act.aspect_counts == exp.aspect_counts
+    for goid in act.go2obj:
+        assert get_info_content(goid, act) == get_info_content(goid, exp), goid
+        assert act.get_term_freq(goid) == exp.get_term_freq(goid)
+
+
+def _get_annots(godag, rng):
+    """Get random annotations, including alternate GO IDs"""
+    goids = sorted(godag)
+    annots = {"gene{I}".format(I=i): set(rng.sample(goids, rng.randrange(1, 5)))
+              for i in range(40)}
+    annots["gene_alt"] = {go for go, o in sorted(godag.items()) if go != o.item_id}
+    return annots
+
+
+if __name__ == "__main__":
+    test_termcounts_ns()
+    test_termcounts_update()
+
+# Copyright (C) 2016-present, DV Klopfenstein, H Tang, All rights reserved.
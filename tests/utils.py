@@ -16,7 +16,10 @@ from os.path import abspath
 from datetime import timedelta
 from goatools.base import get_godag as base_get_godag
 from goatools.associations import dnld_annotation
+from goatools.associations import read_associations
 from goatools.anno.factory import get_objanno as get_objanno_factory
+from goatools.go_enrichment import GOEnrichmentStudy
+from goatools.obo_parser import GODag
 
 from goatools.semantic import TermCounts
 
@@ -63,4 +66,30 @@ def get_termcounts(fin_anno, godag, namespace="all", **kws):
     return TermCounts(godag, id2gos)
 
 
+def get_ids(fin):
+    """Read one ID per line, given a local file name from repo dir root"""
+    with open(join(REPO, fin), encoding="utf-8") as ifstrm:
+        return [line.rstrip() for line in ifstrm]
+
+
+def get_goea_data(**kws_godag):
+    """Get the local GOEA test data: GODag, association (gene2gos) and population IDs"""
+    godag = GODag(join(REPO, "tests/data/goslim_generic.obo"), prt=None, **kws_godag)
+    return (godag,) + _get_assc_pop()
+
+
+def get_goeaobj(methods=("bonferroni", "holm"), godag=None, **kws):
+    """Create a GOEnrichmentStudy with local test data (default GODag: goslim_generic)"""
+    if godag is None:
+        godag = GODag(join(REPO, "tests/data/goslim_generic.obo"), prt=None)
+    assoc, pop = _get_assc_pop()
+    return GOEnrichmentStudy(pop, assoc, godag, methods=list(methods), log=None, **kws)
+
+
+def _get_assc_pop():
+    """Get the local test association (gene2gos) and population IDs"""
+    assoc = read_associations(join(REPO, "tests/data/small_association"), "id2gos", no_top=True)
+    return assoc, get_ids("tests/data/small_population")
+
+
 # Copyright (C) 2019-present, DV Klopfenstein, et al. All rights reserved.